@@ -1,187 +1,515 @@
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-import time
-import json
-import os
-import random
-import pandas as pd
-from fake_useragent import UserAgent
-from datetime import date
-
-# ================== 配置区 ==================
-COOKIES_PATH = "cookies.json"
-CPUS = ["i7-920", "i7-930", "i7-950", "i7-960", "i7-980X", "i5-750", "i5-760", 
-"i3-530", "i3-540", "i3-2100", "i3-2120", "i3-2100T", "i5-2300", "i5-2400", "i5-2500K", 
-"i5-2550K", "i7-2600", "i7-2600K", "i7-2700K", "i3-3220", "i3-3240T", "i5-3470", 
-"i5-3570K", "i5-3550", "i7-3770", "i7-3770K", "i7-3820", "i3-4130", "i3-4330", "i5-4440", 
-"i5-4690K", "i7-4770", "i7-4790K", "i5-4590", "i3-4360", "i7-5775C", "i5-5675C", 
-"i7-6700K", "i7-6700", "i5-6600K", "i5-6600", "i5-6500", "i5-6400", "i3-6100", 
-"i7-7700K", "i7-7700", "i5-7600K", "i5-7600", "i5-7500", "i5-7400", "i3-7350K", 
-"i3-7300", "i3-7100", "i7-7700T", "i5-7600T", "i5-7500T", "i7-8700K", "i7-8700", 
-"i7-8700T", "i5-8600K", "i5-8600", "i5-8500", "i5-8400", "i5-8400T", "i3-8350K", 
-"i3-8300", "i3-8100"]       # 要搜索的CPU型号列表
-PRICE_CSS_SELECTOR = "span[class^='number--']"  # 类名前缀匹配
-SCROLL_TIMES = 3                                # 滚动次数
-HEADLESS_MODE = False                           # 调试时关闭无头模式
-
-# ================== 工具函数 ==================
-def save_cookies(driver):
-    """保存Cookies到文件"""
-    driver.get("https://www.goofish.com")
-    with open(COOKIES_PATH, 'w') as f:
-        json.dump(driver.get_cookies(), f)
-    print(f"[Cookies] 已保存至 {COOKIES_PATH}")
-
-def load_cookies(driver):
-    """加载Cookies并适配域名"""
-    if not os.path.exists(COOKIES_PATH):
-        return False
-    
-    driver.get("https://www.goofish.com")
-    time.sleep(2)
-    
-    with open(COOKIES_PATH, 'r') as f:
-        cookies = json.load(f)
-    
-    # 修正Cookie格式
-    for cookie in cookies:
-        if 'domain' in cookie and cookie['domain'].startswith('.'):
-            cookie['domain'] = cookie['domain'][1:]
-        try:
-            driver.add_cookie(cookie)
-        except Exception as e:
-            print(f"跳过无效Cookie: {cookie.get('name')}, 原因: {str(e)}")
-    print("[Cookies] 加载完成")
-    return True
-
-def init_browser():
-    """初始化浏览器（绕过检测）"""
-    ua = UserAgent()
-    options = webdriver.ChromeOptions()
-    
-    # 反爬配置
-    options.add_argument(f"user-agent={ua.random}")
-    options.add_argument("--disable-blink-features=AutomationControlled")
-    options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    options.add_argument("--ignore-certificate-errors")
-    
-    if HEADLESS_MODE:
-        options.add_argument("--headless=new")
-        options.add_argument("--disable-gpu")
-        options.add_argument("--no-sandbox")
-    
-    driver = webdriver.Chrome(options=options)
-    
-    # 隐藏自动化特征
-    driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {
-        "source": """
-        Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
-        """
-    })
-    return driver
-
-# ================== 核心逻辑 ==================
-def scroll_to_bottom(driver):
-    """模拟人类滚动行为"""
-    current_height = 0
-    for _ in range(SCROLL_TIMES):
-        # 随机滚动距离（800-1200像素）
-        scroll_pixels = random.randint(800, 1200)
-        new_height = current_height + scroll_pixels
-        driver.execute_script(f"window.scrollTo(0, {new_height});")
-        current_height = new_height
-        
-        # 随机等待（1.5-3.5秒）
-        time.sleep(random.uniform(1.5, 3.5))
-        
-        # 动态加载检测（可选）
-        try:
-            WebDriverWait(driver, 5).until(
-                lambda d: d.execute_script("return document.body.scrollHeight") > current_height
-            )
-        except:
-            pass
-
-def get_prices(driver):
-    """获取价格数据（带重试机制）"""
-    try:
-        WebDriverWait(driver, 15).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, PRICE_CSS_SELECTOR))
-        )
-        elements = driver.find_elements(By.CSS_SELECTOR, PRICE_CSS_SELECTOR)
-        return [e.text for e in elements if e.text.strip()]
-    except Exception as e:
-        print(f"[错误] 价格获取失败: {str(e)}")
-        return []
-
-# ================== 主流程 ==================
-def main():
-    driver = init_browser()
-    try:
-        # 1. 登录与Cookies处理
-        if not os.path.exists(COOKIES_PATH):
-            driver.get("https://www.goofish.com")
-            input("请手动登录后按回车保存Cookies...")
-            save_cookies(driver)
-        else:
-            driver.get("https://www.goofish.com")
-            load_cookies(driver)
-        
-        # 2. 遍历所有CPU型号
-        result = {
-            "date": pd.Timestamp.now().strftime("%Y-%m-%d"),
-            "time": pd.Timestamp.now().strftime("%H:%M:%S")
-        }
-        
-        for cpu in CPUS:
-            # 构造目标URL
-            target_url = f"https://www.goofish.com/search?q={cpu}"
-            driver.get(target_url)
-            print(f"当前页面标题（{cpu}）:", driver.title)
-            
-            # 3. 滚动加载数据
-            all_prices = []
-            for attempt in range(2):  # 最多重试2次
-                scroll_to_bottom(driver)
-                prices = get_prices(driver)
-                if prices:
-                    all_prices.extend(prices)
-                    break
-                elif attempt == 0:
-                    print(f"[重试] {cpu} 首次获取失败，尝试重新加载...")
-                    driver.refresh()
-                    time.sleep(3)
-            
-            # 4. 数据处理（取最低价）
-            if all_prices:
-                try:
-                    # 清洗价格（移除¥符号并转为数字）
-                    clean_prices = [float(p.replace("¥", "").strip()) for p in all_prices]
-                    result[cpu] = clean_prices
-                except ValueError:
-                    print(f"[错误] {cpu} 价格格式异常: {all_prices}")
-                    result[cpu] = None
-            else:
-                result[cpu] = None
-                print(f"[警告] {cpu} 未获取到价格")
-        
-        # 5. 保存结果（确保列顺序）
-        save_dir = "./data"
-        os.makedirs(save_dir, exist_ok=True)
-        today = date.today().strftime("%Y-%m-%d")
-        filename = os.path.join(save_dir, f"{today}_input.csv")
-        df = pd.DataFrame([result]).reindex(columns=["date", "time"] + CPUS)
-        df.to_csv(filename, mode='a', header=not os.path.exists(filename), index=False)
-        print("数据保存完成，最新记录：")
-        print(df)
-            
-    except Exception as e:
-        print(f"[主流程异常] {str(e)}")
-    finally:
-        driver.quit()
-        print("浏览器已关闭")
-
-if __name__ == "__main__":
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+import time
+import json
+import os
+import random
+import argparse
+import itertools
+from functools import partial
+import pandas as pd
+from fake_useragent import UserAgent
+from datetime import date, datetime, timedelta
+from fetch import BASE_URL, Backend, HttpBackend, FallbackBackend, parse_price
+from scheduler import CrawlScheduler
+from price_log import PriceLog, log_path, read_log
+from stream_clean import StreamCleaner, stream_od_path
+from metrics import RunMetrics
+from snapshot import SNAPSHOT_DIR, SnapshotStore
+from dedupe import ListingDeduper
+
+# ================== 配置区 ==================
+COOKIES_PATH = "cookies.json"
+CPUS = ["i7-920", "i7-930", "i7-950", "i7-960", "i7-980X", "i5-750", "i5-760", 
+"i3-530", "i3-540", "i3-2100", "i3-2120", "i3-2100T", "i5-2300", "i5-2400", "i5-2500K", 
+"i5-2550K", "i7-2600", "i7-2600K", "i7-2700K", "i3-3220", "i3-3240T", "i5-3470", 
+"i5-3570K", "i5-3550", "i7-3770", "i7-3770K", "i7-3820", "i3-4130", "i3-4330", "i5-4440", 
+"i5-4690K", "i7-4770", "i7-4790K", "i5-4590", "i3-4360", "i7-5775C", "i5-5675C", 
+"i7-6700K", "i7-6700", "i5-6600K", "i5-6600", "i5-6500", "i5-6400", "i3-6100", 
+"i7-7700K", "i7-7700", "i5-7600K", "i5-7600", "i5-7500", "i5-7400", "i3-7350K", 
+"i3-7300", "i3-7100", "i7-7700T", "i5-7600T", "i5-7500T", "i7-8700K", "i7-8700", 
+"i7-8700T", "i5-8600K", "i5-8600", "i5-8500", "i5-8400", "i5-8400T", "i3-8350K", 
+"i3-8300", "i3-8100"]       # 要搜索的CPU型号列表
+PRICE_CSS_SELECTOR = "span[class^='number--']"  # 类名前缀匹配
+TITLE_CSS_SELECTOR = "[class^='main-title--']"  # 商品卡片内的标题
+SCROLL_TIMES = 3                                # 滚动次数
+HEADLESS_MODE = False                           # 调试时关闭无头模式
+WORKERS = 1                                     # 并发浏览器数量（1 即单浏览器顺序抓取）
+SCROLL_DELAY = (1.5, 3.5)                       # 每个浏览器每次滚动后的随机等待（秒）
+WORKER_START_DELAY = (2, 6)                     # 各浏览器错峰启动的随机间隔（秒）
+FETCH_BACKEND = "selenium"                      # selenium: 浏览器渲染; http: 直接请求（无结果时回退到浏览器）
+RATE_LIMIT = 0.5                                # 全部会话共享的初始请求速率（次/秒），随结果自适应调整
+RATE_BURST = 2                                  # 令牌桶容量
+MAX_ATTEMPTS = 3                                # 每个型号最多抓取次数
+BACKOFF_BASE = 5                                # 指数退避基数（秒）
+BACKOFF_MAX = 120                               # 单次退避上限（秒）
+SAVE_DIR = "./data"                             # 原始数据与断点文件目录
+STREAM_CLEAN = True                             # 抓取时在线剔除异常价格，结束时写出 result/{日期}_stream_od.csv
+FAST_CRAWL = False                              # 快速模式：持久化Chrome用户目录 + 屏蔽图片/字体/媒体 + 价格就绪即抓取
+PROFILE_DIR = "./chrome_profile"                # 快速模式的Chrome用户数据目录（每个浏览器一个子目录，保存登录状态）
+BLOCKED_URLS = ["*.jpg*", "*.jpeg*", "*.png*", "*.gif*", "*.webp*", "*.svg*", "*.ico*",
+                "*.woff*", "*.ttf*", "*.otf*", "*.mp4*", "*.webm*", "*.mp3*", "*.m3u8*"]   # 快速模式屏蔽的请求
+READY_TIMEOUT = 15                              # 快速模式等待价格元素出现的上限（秒）
+READY_SETTLE = 1.0                              # 快速模式滚动后价格数在该时间内不再增加即视为加载完成（秒）
+SAVE_SNAPSHOTS = False                          # 保存每个型号的搜索结果页快照（snapshots/），可用 snapshot.py 离线重新解析
+
+# ================== 工具函数 ==================
+def save_cookies(driver):
+    """保存Cookies到文件"""
+    driver.get(BASE_URL)
+    with open(COOKIES_PATH, 'w') as f:
+        json.dump(driver.get_cookies(), f)
+    print(f"[Cookies] 已保存至 {COOKIES_PATH}")
+
+def load_cookies(driver, base_url=BASE_URL):
+    """加载Cookies并适配域名"""
+    if not os.path.exists(COOKIES_PATH):
+        return False
+    
+    driver.get(base_url)
+    time.sleep(2)
+    
+    with open(COOKIES_PATH, 'r') as f:
+        cookies = json.load(f)
+    
+    # 修正Cookie格式
+    for cookie in cookies:
+        if 'domain' in cookie and cookie['domain'].startswith('.'):
+            cookie['domain'] = cookie['domain'][1:]
+        try:
+            driver.add_cookie(cookie)
+        except Exception as e:
+            print(f"跳过无效Cookie: {cookie.get('name')}, 原因: {str(e)}")
+    print("[Cookies] 加载完成")
+    return True
+
+def profile_dir(slot, root=PROFILE_DIR):
+    """第slot个浏览器的用户数据目录（同一目录不能被两个Chrome同时使用）"""
+    return os.path.join(root, f"worker{slot}")
+
+def profile_user_agent(profile):
+    """持久化目录固定使用首次生成的UA，避免同一登录状态每次换UA"""
+    path = os.path.join(profile, "user_agent.txt")
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read().strip()
+    ua = UserAgent().random
+    os.makedirs(profile, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(ua)
+    return ua
+
+def init_browser(profile=None, block_assets=False):
+    """
+    初始化浏览器（绕过检测）
+    :param profile: 持久化的Chrome用户数据目录，登录状态随之保存，无需每次加载cookies.json
+    :param block_assets: 屏蔽图片/字体/媒体请求，driver.get在DOM就绪后即返回（由价格元素就绪判定代替整页加载）
+    """
+    ua = profile_user_agent(profile) if profile else UserAgent().random
+    options = webdriver.ChromeOptions()
+    
+    # 反爬配置
+    options.add_argument(f"user-agent={ua}")
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    options.add_argument("--ignore-certificate-errors")
+    
+    if HEADLESS_MODE:
+        options.add_argument("--headless=new")
+        options.add_argument("--disable-gpu")
+        options.add_argument("--no-sandbox")
+    if profile:
+        options.add_argument(f"--user-data-dir={os.path.abspath(profile)}")
+    if block_assets:
+        options.page_load_strategy = "eager"
+    # 性能日志用于统计每个页面实际接收的字节数
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    
+    driver = webdriver.Chrome(options=options)
+    
+    # 隐藏自动化特征
+    driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {
+        "source": """
+        Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
+        """
+    })
+    if block_assets:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URLS})
+    return driver
+
+# ================== 核心逻辑 ==================
+def scroll_to_bottom(driver):
+    """模拟人类滚动行为"""
+    current_height = 0
+    for _ in range(SCROLL_TIMES):
+        # 随机滚动距离（800-1200像素）
+        scroll_pixels = random.randint(800, 1200)
+        new_height = current_height + scroll_pixels
+        driver.execute_script(f"window.scrollTo(0, {new_height});")
+        current_height = new_height
+        
+        # 随机等待（每个浏览器独立计时）
+        time.sleep(random.uniform(*SCROLL_DELAY))
+        
+        # 动态加载检测（可选）
+        try:
+            WebDriverWait(driver, 5).until(
+                lambda d: d.execute_script("return document.body.scrollHeight") > current_height
+            )
+        except:
+            pass
+
+def wait_for_prices(driver, timeout=READY_TIMEOUT, settle=READY_SETTLE):
+    """
+    快速模式的就绪判定（代替固定的随机滚动等待）：价格元素出现后滚动到底部，
+    价格数在settle秒内不再增加即视为加载完成，最多滚动SCROLL_TIMES次
+    请求间隔由调度器的令牌桶控制，去掉滚动等待不会提高请求速率
+    :return: 价格元素是否出现
+    """
+    count_js = f"return document.querySelectorAll({json.dumps(PRICE_CSS_SELECTOR)}).length"
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.1).until(lambda d: d.execute_script(count_js) > 0)
+    except TimeoutException:
+        return False
+    count = driver.execute_script(count_js)
+    for _ in range(SCROLL_TIMES):
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        try:
+            WebDriverWait(driver, settle, poll_frequency=0.1).until(lambda d: d.execute_script(count_js) > count)
+        except TimeoutException:
+            break
+        count = driver.execute_script(count_js)
+    return True
+
+def transferred_kb(driver):
+    """
+    上次读取性能日志以来浏览器实际接收的数据量（KB），由 Network.loadingFinished 累加（含跨域资源）
+    被屏蔽的请求不产生该事件
+    """
+    total = 0
+    for entry in driver.get_log("performance"):
+        message = entry["message"]
+        if "Network.loadingFinished" in message:
+            total += json.loads(message)["message"]["params"].get("encodedDataLength", 0)
+    return total / 1024
+
+# 在页面内一次取回全部商品：每个价格元素 -> [商品ID, 标题, 价格文本]
+# 价格文本为价格元素及其后紧跟的小数部分、“万”（部分页面拆成多个span显示）
+EXTRACT_LISTINGS_JS = """
+const [priceSelector, titleSelector] = arguments;
+const items = [];
+for (const span of document.querySelectorAll(priceSelector)) {
+    let price = span.textContent.trim();
+    if (!price) continue;
+    for (let next = span.nextElementSibling; next && /^[\\s.\\d万]+$/.test(next.textContent);
+         next = next.nextElementSibling) {
+        price += next.textContent.trim();
+    }
+    const card = span.closest('a');
+    const id = card ? (card.href.match(/[?&]id=(\\d+)/) || [])[1] : undefined;
+    const title = card ? card.querySelector(titleSelector) : null;
+    items.push([id || null, title ? title.textContent.trim() : null, price]);
+}
+return items;
+"""
+
+def get_listings(driver):
+    """
+    获取页面上全部商品（一次脚本调用，耗时与商品数基本无关）
+    :return: [{"id": 商品ID, "title": 标题, "price": 价格文本}]，失败返回空列表
+    """
+    try:
+        WebDriverWait(driver, 15).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, PRICE_CSS_SELECTOR))
+        )
+        rows = driver.execute_script(EXTRACT_LISTINGS_JS, PRICE_CSS_SELECTOR, TITLE_CSS_SELECTOR)
+        return [{"id": i, "title": t, "price": p} for i, t, p in rows]
+    except Exception as e:
+        print(f"[错误] 价格获取失败: {str(e)}")
+        return []
+
+_profile_slots = itertools.count()
+
+class SeleniumBackend(Backend):
+    """
+    浏览器渲染后端：加载搜索页并滚动（重试由调度器负责）
+    - 默认：每次启动全新的Chrome并加载cookies.json，完整加载页面后按固定随机间隔滚动
+    - 快速模式：复用持久化用户目录（新目录首次由cookies.json导入登录状态），
+      屏蔽图片/字体/媒体，价格元素就绪即抓取
+    page_stats 为最近一次抓取的页面耗时、价格提取耗时与接收字节数，listings 为最近一次抓取的商品列表
+    :param fast: 是否使用快速模式，None时取FAST_CRAWL
+    :param profile: 快速模式的用户数据目录，缺省按创建顺序使用 PROFILE_DIR 下的子目录
+    :param on_page: 页面就绪后的回调 on_page(型号, 渲染后的HTML, URL)，如保存快照
+    """
+    name = "selenium"
+
+    def __init__(self, base_url=BASE_URL, fast=None, profile=None, on_page=None):
+        self.base_url = base_url
+        self.on_page = on_page
+        self.fast = FAST_CRAWL if fast is None else fast
+        self.page_stats = None
+        self.listings = []
+        if self.fast:
+            profile = profile or profile_dir(next(_profile_slots))
+            new_profile = not os.path.isdir(profile)
+            self.driver = init_browser(profile, block_assets=True)
+            if new_profile:
+                load_cookies(self.driver, base_url)
+        else:
+            self.driver = init_browser()
+            load_cookies(self.driver, base_url)
+
+    def fetch(self, cpu):
+        self.page_stats = None
+        self.listings = []
+        transferred_kb(self.driver)     # 清空之前（首页、Cookies加载）的性能日志
+        start = time.perf_counter()
+        # 构造目标URL
+        self.driver.get(f"{self.base_url}/search?q={cpu}")
+        print(f"当前页面标题（{cpu}）:", self.driver.title)
+        
+        if not self.fast:
+            # 滚动加载数据
+            scroll_to_bottom(self.driver)
+            ready = True
+        else:
+            ready = wait_for_prices(self.driver)
+            if not ready:
+                print(f"[错误] {cpu} 价格元素未在{READY_TIMEOUT}秒内出现")
+        if self.on_page is not None:
+            self.page_loaded(cpu, self.driver.page_source, self.driver.current_url)
+        extract_start = time.perf_counter()
+        if ready:
+            self.listings = get_listings(self.driver)
+        self.page_stats = {"page_seconds": time.perf_counter() - start,
+                           "extract_seconds": time.perf_counter() - extract_start,
+                           "page_kb": transferred_kb(self.driver)}
+        return self.listings
+
+    def close(self):
+        self.driver.quit()
+
+def make_backend(on_page=None):
+    """
+    按FETCH_BACKEND创建抓取后端
+    :param on_page: 取得页面后的回调（保存快照），传给主后端与备用后端
+    """
+    if FETCH_BACKEND == "http":
+        return FallbackBackend(HttpBackend(COOKIES_PATH, on_page=on_page), partial(SeleniumBackend, on_page=on_page))
+    return SeleniumBackend(on_page=on_page)
+
+def clean_prices(cpu, listings):
+    """
+    把商品的价格文本逐条转为数字（支持区间、“万”与小数），无法识别的单条价格跳过
+    :param listings: 去重后的商品列表（含商品标识key）
+    :return: (价格列表, 对应的商品标识)，没有商品或全部无法识别时为 (None, None)
+    """
+    if not listings:
+        print(f"[警告] {cpu} 未获取到价格")
+        return None, None
+    prices, keys, skipped = [], [], []
+    for listing in listings:
+        value = parse_price(listing["price"])
+        if value is None:
+            skipped.append(listing["price"])
+        else:
+            prices.append(value)
+            keys.append(listing.get("key", 0))
+    if skipped:
+        print(f"[警告] {cpu} 跳过 {len(skipped)} 条无法识别的价格: {skipped[:5]}")
+    return (prices, keys) if prices else (None, None)
+
+# ================== 断点续抓 ==================
+def checkpoint_path(day):
+    return os.path.join(SAVE_DIR, f"{day}_checkpoint.jsonl")
+
+def read_checkpoints(days):
+    """读取若干天的断点记录（每行一个型号）"""
+    records = []
+    for day in days:
+        path = checkpoint_path(day)
+        if not os.path.exists(path):
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    pass  # 崩溃时写了一半的行
+    return records
+
+def collected_models(resume, max_age_hours, now):
+    """
+    找出无需重新抓取的型号
+    :param resume: 跳过今天已抓到价格的型号
+    :param max_age_hours: 跳过最近一次有效样本不超过该小时数的型号（可跨天）
+    :return: ({型号: 断点记录}, 续用的会话时间或None)
+    """
+    today = now.strftime("%Y-%m-%d")
+    if max_age_hours is not None:
+        since = now - timedelta(hours=max_age_hours)
+        days = pd.date_range(since.date(), now.date()).strftime("%Y-%m-%d")
+    elif resume:
+        since, days = None, [today]
+    else:
+        return {}, None
+
+    fresh, session = {}, None
+    for rec in read_checkpoints(days):
+        if rec["prices"] is None:
+            continue
+        if since is not None and datetime.strptime(rec["time"], "%Y-%m-%d %H:%M:%S") < since:
+            continue
+        fresh[rec["model"]] = rec
+        if rec["time"].startswith(today):
+            session = rec["session"]
+    return fresh, session
+
+class Checkpoint:
+    """每抓完一个型号立即追加一行到当天的断点文件"""
+    def __init__(self, day, session):
+        os.makedirs(SAVE_DIR, exist_ok=True)
+        self.path = checkpoint_path(day)
+        self.session = session
+
+    def write(self, cpu, prices, listings=None):
+        record = {
+            "session": self.session,
+            "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "model": cpu,
+            "prices": prices,
+            "listings": listings,
+        }
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+def save_row(result, filename):
+    """追加当次抓取结果行；续抓时替换同一会话之前写入的行"""
+    df = pd.DataFrame([result]).reindex(columns=["date", "time"] + CPUS)
+    if os.path.exists(filename):
+        old = pd.read_csv(filename, dtype=str)
+        old = old[~((old["date"] == result["date"]) & (old["time"] == result["time"]))]
+        df = pd.concat([old, df], ignore_index=True)
+    df.to_csv(filename, index=False)
+    return df.tail(1)
+
+# ================== 主流程 ==================
+def main():
+    parser = argparse.ArgumentParser(description="闲鱼CPU价格抓取")
+    parser.add_argument("--resume", action="store_true", help="跳过今天已抓到价格的型号")
+    parser.add_argument("--max-age", type=float, default=None, metavar="HOURS",
+                        help="只重新抓取最近一次样本早于HOURS小时的型号")
+    args = parser.parse_args()
+
+    # 运行指标：各阶段用时与每个型号的抓取耗时/次数/价格数，结束时写入 metrics/
+    metrics = RunMetrics("crawl", date.today().strftime("%Y-%m-%d"))
+
+    # 1. 登录与Cookies处理（所有浏览器共用同一份cookies.json；快速模式下登录状态保存在第一个用户目录中，
+    #    cookies.json 只用于导入其它新建的用户目录）
+    if FAST_CRAWL:
+        need_login = not os.path.isdir(profile_dir(0)) and not os.path.exists(COOKIES_PATH)
+    else:
+        need_login = not os.path.exists(COOKIES_PATH)
+    if need_login:
+        driver = init_browser(profile_dir(0) if FAST_CRAWL else None)
+        try:
+            driver.get(BASE_URL)
+            input("请手动登录后按回车保存Cookies...")
+            save_cookies(driver)
+        finally:
+            driver.quit()
+    
+    try:
+        # 2. 读取断点，确定本次需要抓取的型号
+        now = datetime.now()
+        today = now.strftime("%Y-%m-%d")
+        fresh, session = collected_models(args.resume, args.max_age, now)
+        session = session or now.strftime("%H:%M:%S")
+        result = {"date": today, "time": session}
+        result.update({cpu: fresh[cpu]["prices"] for cpu in CPUS if cpu in fresh})
+        todo = [cpu for cpu in CPUS if cpu not in fresh]
+        
+        # 长格式价格日志：今天之前的样本沿用时补写到今天的日志中
+        price_log = PriceLog(log_path(today, SAVE_DIR), CPUS)
+        for cpu, rec in fresh.items():
+            if not rec["time"].startswith(today):
+                price_log.append(today, session, cpu, rec["prices"], rec.get("listings"))
+        if fresh:
+            print(f"[续抓] 跳过 {len(CPUS) - len(todo)} 个已有样本的型号，剩余 {len(todo)} 个")
+        if not todo:
+            print("所有型号均已有有效样本，无需抓取")
+            return
+        
+        # 今天日志中已有的样本（续抓或同一天的其它批次）先补入在线清洗；去重只在本次抓取的同一型号内进行
+        logged, _ = read_log(price_log.path)
+        deduper = ListingDeduper()
+        cleaner = None
+        if STREAM_CLEAN:
+            cleaner = StreamCleaner.for_day(today)
+            for cpu, group in logged.groupby("model", sort=False):
+                cleaner.update(cpu, group["price"].tolist())
+        
+        # 3. 由调度器把剩余型号分发给各浏览器并发抓取，每个型号完成即写入断点
+        checkpoint = Checkpoint(today, session)
+        def on_result(cpu, listings):
+            kept = deduper.filter(cpu, listings)
+            if len(kept) < len(listings):
+                print(f"[去重] {cpu}: 去掉 {len(listings) - len(kept)} 个重复出现的商品")
+            result[cpu], keys = clean_prices(cpu, kept)
+            checkpoint.write(cpu, result[cpu], keys)
+            price_log.append(today, session, cpu, result[cpu], keys)
+            if cleaner is not None and result[cpu]:
+                _, dropped = cleaner.update(cpu, result[cpu])
+                if dropped:
+                    print(f"[异常价格] {cpu}: {dropped}")
+        
+        on_page = SnapshotStore(SNAPSHOT_DIR).recorder(today, session) if SAVE_SNAPSHOTS else None
+        scheduler = CrawlScheduler(
+            partial(make_backend, on_page=on_page), workers=WORKERS, rate=RATE_LIMIT, burst=RATE_BURST,
+            max_attempts=MAX_ATTEMPTS, backoff_base=BACKOFF_BASE, backoff_max=BACKOFF_MAX,
+            start_delay=WORKER_START_DELAY, on_result=on_result
+        )
+        print(f"启动 {WORKERS} 个浏览器，共 {len(todo)} 个型号")
+        with metrics.stage("抓取") as stage:
+            try:
+                scheduler.crawl(todo)
+            finally:
+                stage["models"] = len(todo)
+                metrics.info.update(scheduler.stats)
+                metrics.info["duplicates"] = deduper.summary()["duplicates"]
+                for cpu, stats in scheduler.model_stats.items():
+                    metrics.model(cpu, attempts=stats["attempts"], retries=stats["attempts"] - 1,
+                                  prices=len(result.get(cpu) or []), duplicates=deduper.duplicates.get(cpu, 0),
+                                  **{k: v for k, v in stats.items() if k != "attempts"})
+        print(f"抓取统计: {scheduler.stats}，去重: {deduper.summary()}")
+        if cleaner is not None:
+            with metrics.stage("在线清洗输出"):
+                cleaner.write_od(stream_od_path(today), today, CPUS)
+            for cpu, state in cleaner.models.items():
+                metrics.model(cpu, stream_kept=state.kept, stream_dropped=state.dropped)
+            print(f"在线清洗: {cleaner.summary()}，当日价格已保存至 {stream_od_path(today)}")
+        
+        # 4. 保存结果（确保列顺序，未抓到的型号留空）
+        with metrics.stage("保存") as stage:
+            filename = os.path.join(SAVE_DIR, f"{today}_input.csv")
+            df = save_row(result, filename)
+            stage["models"] = sum(1 for cpu in CPUS if result.get(cpu))
+        print("数据保存完成，最新记录：")
+        print(df)
+            
+    except Exception as e:
+        print(f"[主流程异常] {str(e)}")
+    finally:
+        if metrics.stages:
+            json_path, _ = metrics.write()
+            print(f"运行指标已保存至 {json_path}")
+            print(metrics.summary(slowest="fetch_seconds"))
+
+if __name__ == "__main__":
     main()
\ No newline at end of file
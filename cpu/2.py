@@ -1,66 +1,119 @@
-import pandas as pd
-from ast import literal_eval
-import re
-from datetime import date
-import os
-def process_cpu_data():
-    try:
-        today = date.today().strftime("%Y-%m-%d")
-        inputname=f"data\{today}_input.csv"
-        # 1. 读取数据并清理列名
-        df = pd.read_csv(inputname)
-        # 列名清洗：移除首尾空格 + 过滤非ASCII字符
-        df.columns = [re.sub(r'[^\x00-\x7F]', '', col.strip()) for col in df.columns]
-        
-        # 2. 动态识别CPU型号列（匹配i3/i5/i7/i9开头，型号格式为数字+可选字母后缀）
-        cpu_pattern = r'^i[3579]-\d+[A-Z]*$'
-        cpu_columns = [col for col in df.columns if re.match(cpu_pattern, col)]
-        
-        if not cpu_columns:
-            raise ValueError("未检测到有效的CPU型号列，请确认列名格式类似 'i7-8700K'")
-
-        # 3. 转换数据为列表（带异常处理）
-        for col in cpu_columns:
-            try:
-                df[col] = df[col].apply(lambda x: literal_eval(x) if pd.notna(x) else [])
-            except (SyntaxError, ValueError) as e:
-                raise ValueError(f"列 '{col}' 包含无效数据: {str(e)}")
-
-        # 4. 验证并修复列表长度一致性
-        def uniform_length(row):
-            """确保同一行所有CPU价格列表长度一致"""
-            max_len = max(len(row[col]) for col in cpu_columns)
-            return {
-                col: (row[col] + [None]*(max_len - len(row[col])))[:max_len]
-                for col in cpu_columns
-            }
-
-        # 拆分处理保证数据完整性
-        original_columns = df.drop(columns=cpu_columns).copy()
-        fixed_data = df.apply(uniform_length, axis=1, result_type='expand')
-        
-        # 重建DataFrame
-        df = pd.concat([
-            original_columns.reset_index(drop=True),
-            fixed_data.reset_index(drop=True)
-        ], axis=1)
-
-        # 5. 展开数据
-        df = df.explode(cpu_columns, ignore_index=True)
-        df=df.iloc[:,2:]
-        df=df.dropna()
-        # 6. 保存结果
-        save_dir = "./data"
-        os.makedirs(save_dir, exist_ok=True)
-        outputname=os.path.join(save_dir, f"{today}_output.csv")
-        df.to_csv(outputname, index=False)
-        print(f"数据处理完成，已保存至 {outputname}")
-        return True
-
-    except Exception as e:
-        print(f"处理失败: {str(e)}")
-        return False
-
-# 执行处理
-if __name__ == "__main__":
-    process_cpu_data()
+import numpy as np
+import pandas as pd
+import re
+import warnings
+from datetime import date
+import os
+from price_log import log_path
+from samples import DaySamples
+
+def parse_price_lists(cells):
+    """
+    批量解析价格列表字符串（如 "[25.0, 30.0]"）
+    :param cells: 二维字符串数组（行 × 型号），空值为NaN
+    :return: (扁平float64价格数组, 每格价格个数的二维int数组, 每格在扁平数组中的起始偏移)
+    """
+    flat_cells = pd.Series(cells.ravel(), dtype=object).fillna("[]")
+    bodies = flat_cells.str.strip().str[1:-1].str.strip()
+    lengths = np.where(bodies == "", 0, bodies.str.count(",") + 1)
+    joined = ",".join(bodies[lengths > 0])
+    prices = _parse_floats(joined, int(lengths.sum()))
+    offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    return prices, lengths.reshape(cells.shape), offsets.reshape(cells.shape)
+
+def _parse_floats(joined, count):
+    """
+    解析逗号分隔的数字：先用numpy的C解析器（不生成逐个数字的字符串对象，内存峰值低），
+    个数对不上（含无法解析的内容）时改用逐个 float 转换，保持原有的 ValueError
+    """
+    if not joined:
+        return np.array([], dtype=np.float64)
+    try:
+        with warnings.catch_warnings():
+            # 旧版numpy遇到无法解析的内容时只警告并截断
+            warnings.simplefilter("ignore", DeprecationWarning)
+            prices = np.fromstring(joined, dtype=np.float64, sep=",")
+        if len(prices) == count:
+            return prices
+    except ValueError:
+        pass
+    return np.array(joined.split(","), dtype=np.float64)
+
+def load_input_csv(inputname):
+    """读取1.py写出的宽表（每格为价格列表的字符串），展开为输出格式"""
+    return load_input_samples(inputname).frame()
+
+def load_input_samples(inputname):
+    """读取1.py写出的宽表，展开为按型号连续存放的 DaySamples"""
+    # 1. 读取数据并清理列名
+    df = pd.read_csv(inputname, dtype=str)
+    # 列名清洗：移除首尾空格 + 过滤非ASCII字符
+    df.columns = [re.sub(r'[^\x00-\x7F]', '', col.strip()) for col in df.columns]
+    
+    # 2. 动态识别CPU型号列（匹配i3/i5/i7/i9开头，型号格式为数字+可选字母后缀）
+    cpu_pattern = r'^i[3579]-\d+[A-Z]*$'
+    cpu_columns = [col for col in df.columns if re.match(cpu_pattern, col)]
+    
+    if not cpu_columns:
+        raise ValueError("未检测到有效的CPU型号列，请确认列名格式类似 'i7-8700K'")
+
+    # 3. 一次性解析所有价格列表为扁平数组 + 偏移
+    cells = df[cpu_columns].to_numpy(dtype=object)
+    try:
+        prices, lengths, offsets = parse_price_lists(cells)
+    except ValueError:
+        # 定位出错的列，保持原有报错信息
+        for j, col in enumerate(cpu_columns):
+            try:
+                parse_price_lists(cells[:, j:j + 1])
+            except ValueError as e:
+                raise ValueError(f"列 '{col}' 包含无效数据: {str(e)}")
+        raise
+
+    # 4. 每次抓取只保留所有型号都有值的前 min(长度) 个位置（等价于补齐后 explode + dropna）
+    keep = lengths.min(axis=1)
+    rows = np.repeat(np.arange(len(keep)), keep)
+    pos = np.arange(keep.sum()) - np.repeat(np.cumsum(keep) - keep, keep)
+    # 直接按 型号 × 样本 取出，每个型号的样本连续存放
+    by_model = prices[(offsets[rows] + pos[:, None]).T]
+    return DaySamples.from_matrix(by_model.T, cpu_columns)
+
+def load_day_samples(today, save_dir="./data"):
+    """
+    读取某天的原始抓取数据为 DaySamples
+    优先使用长格式日志，其次 {日期}_input.csv；都没有时读入已展开的 {日期}_output.csv（只保留了展开结果的旧日期）
+    """
+    logname = log_path(today, save_dir)
+    if os.path.exists(logname):
+        # 长格式日志：按抓取批次与位置直接排列，无需逐格解析与补齐
+        return DaySamples.from_log(logname)
+    inputname = os.path.join(save_dir, f"{today}_input.csv")
+    outputname = os.path.join(save_dir, f"{today}_output.csv")
+    if not os.path.exists(inputname) and os.path.exists(outputname):
+        return DaySamples.from_frame(pd.read_csv(outputname))
+    return load_input_samples(inputname)
+
+def load_day(today, save_dir="./data"):
+    """读取某天的原始抓取数据并展开为输出格式（优先使用长格式日志）"""
+    return load_day_samples(today, save_dir).frame()
+
+def process_cpu_data():
+    try:
+        today = date.today().strftime("%Y-%m-%d")
+        save_dir = "./data"
+        df = load_day(today, save_dir)
+
+        # 保存结果
+        os.makedirs(save_dir, exist_ok=True)
+        outputname=os.path.join(save_dir, f"{today}_output.csv")
+        df.to_csv(outputname, index=False)
+        print(f"数据处理完成，已保存至 {outputname}")
+        return True
+
+    except Exception as e:
+        print(f"处理失败: {str(e)}")
+        return False
+
+# 执行处理
+if __name__ == "__main__":
+    process_cpu_data()
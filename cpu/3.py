@@ -1,94 +1,142 @@
-import numpy as np
-import pandas as pd
-from sklearn.preprocessing import StandardScaler
-import os
-from datetime import date
-
-def iqr_column_cleaner(df, multiplier=1.5):
-    """
-    对DataFrame的每列进行IQR异常值清洗，返回统计结果和清洗后的DataFrame
-    :param df: 输入DataFrame
-    :param multiplier: IQR范围乘数，默认1.5
-    :return: (统计结果DataFrame, 清洗后的DataFrame)
-    """
-    results = []
-    cleaned_df = df.copy()  # 创建副本用于存储清洗后的数据
-    
-    for col in df.columns:
-        # 跳过非数值列
-        if not pd.api.types.is_numeric_dtype(df[col]):
-            print(f"Skipping non-numeric column: {col}")
-            continue
-            
-        data = df[col].values.reshape(-1, 1)
-        non_nan_mask = ~np.isnan(data).flatten()  # 非空值掩码
-        
-        # 计算IQR范围（仅使用非空值）
-        if np.sum(non_nan_mask) > 0:
-            q1 = np.percentile(data[non_nan_mask], 25)
-            q3 = np.percentile(data[non_nan_mask], 75)
-            iqr = q3 - q1
-            lower_bound = q1 - multiplier * iqr
-            upper_bound = q3 + multiplier * iqr
-            
-            # 标记异常值（仅非空值参与计算）
-            valid_values = data[non_nan_mask]
-            is_outlier = (valid_values < lower_bound) | (valid_values > upper_bound)
-            noise_count = np.sum(is_outlier)
-            
-            # 将异常值设为NaN
-            outlier_indices = np.where(non_nan_mask)[0][is_outlier.flatten()]
-            cleaned_df.loc[outlier_indices, col] = np.nan
-        else:
-            # 全列为空的情况处理
-            lower_bound = upper_bound = np.nan
-            noise_count = 0
-        
-        # 计算清洗后的均值
-        mean_cleaned = cleaned_df[col].mean()
-        
-        # 计算分布质量评分
-        cleaned_values = cleaned_df[col].dropna().values
-        if len(cleaned_values) > 0:
-            scaler = StandardScaler()
-            scaled_data = scaler.fit_transform(cleaned_values.reshape(-1, 1))
-            normality_score = np.mean(np.abs(scaled_data) < 2)
-        else:
-            normality_score = np.nan
-        
-        results.append({
-            'Column': col,
-            'Lower_Bound': lower_bound,
-            'Upper_Bound': upper_bound,
-            'Mean_Cleaned': mean_cleaned,
-            'Noise_Count': noise_count,
-            'Normality_Score': normality_score
-        })
-    
-    return pd.DataFrame(results), cleaned_df
-
-# 示例使用
-if __name__ == "__main__":
-    # 读取数据
-    today = date.today().strftime("%Y-%m-%d")
-    filename = fr"data\{today}_output.csv"
-    df = pd.read_csv(filename)
-    
-    # 执行清洗
-    save_dir = "./ana"
-    os.makedirs(save_dir, exist_ok=True)
-    
-    # 获取结果
-    stats_df, cleaned_df = iqr_column_cleaner(df, multiplier=1.5)
-    
-    # 保存统计结果
-    stats_filename = os.path.join(save_dir, f"{today}_iqr_stats.csv")
-    stats_df.to_csv(stats_filename, index=False)
-    
-    # 保存清洗后的数据（异常值显示为NaN）
-    cleaned_filename = os.path.join(save_dir, f"{today}_iqr.csv")
-    cleaned_df.to_csv(cleaned_filename, index=False)
-    
-    print("统计结果:")
-    print(stats_df)
+import numpy as np
+import pandas as pd
+import os
+from datetime import date
+from samples import DaySamples
+
+def column_quantiles(values, quantiles):
+    """
+    按列计算忽略NaN的分位数（线性插值），结果与逐列 np.percentile 一致
+    np.nanpercentile 在含NaN时会逐列循环，这里排序后按每列有效个数统一插值
+    :param quantiles: 0~1 之间的分位点列表
+    :return: 形状为 (分位点数, 列数) 的数组，全空列为NaN
+    """
+    ordered = np.sort(values, axis=0)  # NaN 排在每列末尾
+    counts = (~np.isnan(values)).sum(axis=0)
+    cols = np.arange(values.shape[1])
+    last = np.maximum(counts - 1, 0)
+    result = []
+    for q in quantiles:
+        # 与numpy线性插值相同的虚拟下标与插值公式
+        virtual = counts * q + (1 + q * -1) - 1
+        prev = np.clip(np.floor(virtual).astype(np.int64), 0, last)
+        nxt = np.clip(prev + 1, 0, last)
+        gamma = virtual - np.floor(virtual)
+        a = ordered[prev, cols] if len(ordered) else np.full(len(cols), np.nan)
+        b = ordered[nxt, cols] if len(ordered) else np.full(len(cols), np.nan)
+        diff = b - a
+        value = np.where(gamma >= 0.5, b - diff * (1 - gamma), a + diff * gamma)
+        result.append(np.where(counts > 0, value, np.nan))
+    return np.array(result).reshape(len(quantiles), values.shape[1])
+
+def column_means(values):
+    """按列求非空均值（逐列连续存放后求和，与 Series.mean 的累加顺序一致）"""
+    columns = np.ascontiguousarray(values.T)
+    valid = ~np.isnan(columns)
+    counts = valid.sum(axis=1)
+    sums = np.where(valid, columns, 0.0).sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, sums / np.maximum(counts, 1), np.nan), columns, valid, counts
+
+def normality_scores(columns, valid, counts, means):
+    """
+    各列标准化后 |z| < 2 的比例（与 StandardScaler 的均值/方差算法一致，常数列缩放系数取1）
+    :param columns: 形状为 (列数, 行数) 的数组
+    """
+    n = counts.astype(np.float64)
+    centered = np.where(valid, columns - means[:, None], 0.0)
+    correction = centered.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        var = ((centered ** 2).sum(axis=1) - correction ** 2 / n) / n
+        eps = np.finfo(np.float64).eps
+        constant = var <= n * eps * var + (n * means * eps) ** 2
+        scale = np.where(constant, 1.0, np.sqrt(var))
+        z = np.abs(centered / scale[:, None])
+        scores = ((z < 2) & valid).sum(axis=1) / n
+    return np.where(counts > 0, scores, np.nan)
+
+def iqr_column_cleaner(df, multiplier=1.5):
+    """
+    对DataFrame的每列进行IQR异常值清洗，返回统计结果和清洗后的DataFrame
+    所有数值列组成一个矩阵一次性计算分位数、异常值掩码与统计量
+    :param df: 输入DataFrame，或2.py读入的 DaySamples（直接使用其价格数组，不经过DataFrame）
+    :param multiplier: IQR范围乘数，默认1.5
+    :return: (统计结果DataFrame, 清洗后的DataFrame)
+    """
+    if isinstance(df, DaySamples):
+        numeric_columns = df.models
+        values = df.matrix(np.float64)
+        index, columns, all_float = pd.RangeIndex(len(values)), pd.Index(numeric_columns), True
+    else:
+        numeric_columns = []
+        for col, dtype in df.dtypes.items():
+            # 跳过非数值列
+            if not pd.api.types.is_numeric_dtype(dtype):
+                print(f"Skipping non-numeric column: {col}")
+                continue
+            numeric_columns.append(col)
+        values = df[numeric_columns].to_numpy(dtype=np.float64)
+        index, columns = df.index, df.columns
+        all_float = len(numeric_columns) == df.shape[1] and all(dtype == np.float64 for dtype in df.dtypes)
+    
+    # 计算IQR范围（仅使用非空值，全列为空时为NaN）
+    q1, q3 = column_quantiles(values, [0.25, 0.75])
+    iqr = q3 - q1
+    lower_bound = q1 - multiplier * iqr
+    upper_bound = q3 + multiplier * iqr
+    
+    # 标记异常值并置为NaN（NaN与边界比较结果为False，不会被计为异常）
+    is_outlier = (values < lower_bound) | (values > upper_bound)
+    noise_count = is_outlier.sum(axis=0)
+    cleaned_values = np.where(is_outlier, np.nan, values)
+    
+    # 一次性组装清洗后的数据：含异常值的列取清洗结果，其余列保持原值与原类型
+    if all_float:
+        cleaned_df = pd.DataFrame(cleaned_values, index=index, columns=columns)
+    else:
+        changed = dict(zip(numeric_columns, noise_count > 0))
+        position = {col: j for j, col in enumerate(numeric_columns)}
+        cleaned_df = pd.DataFrame({
+            col: cleaned_values[:, position[col]] if changed.get(col) else df[col].to_numpy()
+            for col in df.columns
+        }, index=df.index)
+    
+    # 清洗后的均值与分布质量评分
+    mean_cleaned, columns, valid, counts = column_means(cleaned_values)
+    normality_score = normality_scores(columns, valid, counts, mean_cleaned)
+    
+    stats_df = pd.DataFrame({
+        'Column': numeric_columns,
+        'Lower_Bound': lower_bound,
+        'Upper_Bound': upper_bound,
+        'Mean_Cleaned': mean_cleaned,
+        'Noise_Count': noise_count,
+        'Normality_Score': normality_score
+    })
+    return stats_df, cleaned_df
+
+# 示例使用
+if __name__ == "__main__":
+    # 读取数据
+    today = date.today().strftime("%Y-%m-%d")
+    filename = os.path.join("data", f"{today}_output.csv")
+    df = pd.read_csv(filename)
+    
+    # 执行清洗
+    save_dir = "./ana"
+    os.makedirs(save_dir, exist_ok=True)
+    
+    # 获取结果
+    stats_df, cleaned_df = iqr_column_cleaner(df, multiplier=1.5)
+    
+    # 保存统计结果
+    stats_filename = os.path.join(save_dir, f"{today}_iqr_stats.csv")
+    stats_df.to_csv(stats_filename, index=False)
+    
+    # 保存清洗后的数据（异常值显示为NaN）
+    cleaned_filename = os.path.join(save_dir, f"{today}_iqr.csv")
+    cleaned_df.to_csv(cleaned_filename, index=False)
+    
+    print("统计结果:")
+    print(stats_df)
     print("\n清洗后的数据已保存至:", cleaned_filename)
\ No newline at end of file
@@ -1,169 +1,425 @@
-import pandas as pd
-import numpy as np
-from sklearn.cluster import DBSCAN
-from sklearn.neighbors import NearestNeighbors
-from sklearn.preprocessing import StandardScaler
-from datetime import date
-import os
-import logging
-from typing import Dict, Tuple, Optional
-
-CONFIG = {
-    "DATA_DIR": "./ana",
-    "MIN_SAMPLES_FACTOR": 0.1,
-    "QUANTILE_THRESHOLD": 0.95,
-    "MAX_EPS_RATIO": 1.5,
-    "MIN_DATA_SIZE": 20
-}
-
-os.makedirs(CONFIG["DATA_DIR"], exist_ok=True)
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
-logger = logging.getLogger(__name__)
-
-def dynamic_min_samples(n_samples: int) -> int:
-    """动态计算最小样本量"""
-    return max(5, int(CONFIG["MIN_SAMPLES_FACTOR"] * np.log(n_samples + 1)))
-
-def calculate_eps(data: np.ndarray) -> Optional[float]:
-    """动态计算eps值（结合拐点检测和分位数）"""
-    try:
-        n_samples = data.shape[0]
-        min_samples = dynamic_min_samples(n_samples)
-        
-        # 计算k-distance
-        neighbors = NearestNeighbors(n_neighbors=min_samples)
-        neighbors.fit(data)
-        distances, _ = neighbors.kneighbors(data)
-        k_distances = np.sort(distances[:, -1])
-        
-        # 拐点检测逻辑
-        eps_auto = k_distances[-1]  # 默认使用最大值
-        if n_samples >= CONFIG["MIN_DATA_SIZE"]:
-            try:
-                # 计算二阶差分
-                gradients = np.gradient(k_distances)
-                second_derivatives = np.gradient(gradients)
-                
-                # 寻找正二阶导数的拐点
-                candidate_indices = np.where(second_derivatives > 0)[0]
-                if len(candidate_indices) > 0:
-                    eps_auto = k_distances[candidate_indices[-1]]
-            except Exception as e:
-                logger.debug(f"拐点检测失败: {str(e)}，使用备用方法")
-        
-        # 计算分位数阈值
-        eps_quantile = np.quantile(k_distances, CONFIG["QUANTILE_THRESHOLD"])
-        
-        # 确定最终eps（取最小值并限制最大倍数）
-        eps = min(eps_auto, eps_quantile, CONFIG["MAX_EPS_RATIO"] * eps_auto)
-        
-        # 安全校验
-        if eps <= 0 or eps > np.max(k_distances) * 1.2:
-            return np.quantile(k_distances, 0.9)
-        return eps
-    except Exception as e:
-        logger.error(f"EPS计算失败: {str(e)}")
-        return None
-
-def process_column(data: pd.Series) -> Tuple[pd.Series, Dict]:
-    """处理单个数据列"""
-    col_name = data.name
-    original_data = data.copy()
-    stats = {
-        "error": None,
-        "eps": None,
-        "noise_ratio": 0.0,
-        "n_clusters": 0,
-        "cleaned_mean": None,
-        "scaled_var": None
-    }
-
-    # 预处理数据
-    valid_data = data.dropna()
-    if len(valid_data) < 5:
-        stats["error"] = "insufficient_data"
-        return original_data, stats
-
-    try:
-        # 数据标准化
-        scaler = StandardScaler()
-        scaled = scaler.fit_transform(valid_data.values.reshape(-1, 1))
-        
-        # 动态计算参数
-        eps = calculate_eps(scaled)
-        if eps is None or eps <= 0:
-            stats["error"] = "invalid_eps"
-            return original_data, stats
-        
-        min_samples = dynamic_min_samples(len(valid_data))
-        
-        # 执行DBSCAN聚类
-        labels = DBSCAN(eps=eps, min_samples=min_samples).fit_predict(scaled)
-        
-        # 标记噪声点
-        noise_mask = labels == -1
-        cleaned_idx = valid_data.index[~noise_mask]
-        
-        # 计算标准化方差
-        if len(cleaned_idx) > 1:
-            cleaned_scaled = scaled[~noise_mask]
-            stats["scaled_var"] = round(float(np.var(cleaned_scaled)), 4)
-        
-        # 生成清洗后数据
-        cleaned_data = valid_data.copy()
-        cleaned_data.iloc[noise_mask] = np.nan
-        
-        # 更新统计信息
-        cleaned_mean = cleaned_data.mean() if not cleaned_data.dropna().empty else None
-        
-        stats.update({
-            "eps": round(eps, 4),
-            "noise_ratio": round(noise_mask.mean(), 4),
-            "n_clusters": len(np.unique(labels)) - (1 if -1 in labels else 0),
-            "cleaned_mean": round(cleaned_mean, 4) if cleaned_mean else None
-        })
-
-        # 应用清洗结果
-        result = original_data.copy()
-        result.loc[cleaned_data.index] = cleaned_data
-        return result, stats
-        
-    except Exception as e:
-        logger.error(f"列 {col_name} 处理异常: {str(e)}")
-        stats["error"] = "processing_error"
-        return original_data, stats
-
-def main():
-    today = date.today().strftime("%Y-%m-%d")
-    input_path = os.path.join(CONFIG["DATA_DIR"], f"{today}_iqr.csv")
-    
-    try:
-        df = pd.read_csv(input_path)
-        cleaned_df = pd.DataFrame(index=df.index)
-        stats_data = []
-        
-        for col in df.columns:
-            logger.info(f"正在处理列: {col}")
-            cleaned_series, stats = process_column(df[col])
-            cleaned_df[col] = cleaned_series
-            stats["column"] = col
-            stats_data.append(stats)
-        
-        # 保存结果
-        cleaned_df.to_csv(
-            os.path.join(CONFIG["DATA_DIR"], f"{today}_dbscan.csv"), 
-            index=False
-        )
-        pd.DataFrame(stats_data).set_index("column").to_csv(
-            os.path.join(CONFIG["DATA_DIR"], f"{today}_dbscan_stats.csv")
-        )
-        logger.info(f"处理完成，有效处理 {len(stats_data)} 列数据")
-        
-    except Exception as e:
-        logger.error(f"主流程失败: {str(e)}")
-
-if __name__ == "__main__":
+import pandas as pd
+import numpy as np
+from datetime import date
+import json
+import os
+import time
+import logging
+from typing import Dict, Tuple, Optional
+from parallel import parallel_map
+
+CONFIG = {
+    "DATA_DIR": "./ana",
+    "MIN_SAMPLES_FACTOR": 0.1,
+    "QUANTILE_THRESHOLD": 0.95,
+    "MAX_EPS_RATIO": 1.5,
+    "MIN_DATA_SIZE": 20,
+    "N_JOBS": 1,         # 并行进程数，1为串行，<=0使用全部核心
+    "ENGINE": "1d",      # 1d: 一维精确快速实现; sklearn: NearestNeighbors + DBSCAN（仅此时及极小样本时才导入sklearn）
+    "PARAM_CACHE": None,      # DATA_DIR下的eps参数缓存文件（如 "dbscan_params.json"），None则每天重新计算
+    "DRIFT_MEAN_TOL": 0.05,   # 均值漂移上限（以缓存时的标准差为单位）
+    "DRIFT_SCALE_TOL": 0.05,  # 标准差相对变化上限
+    "DRIFT_SIZE_RATIO": 2.0   # 样本数变化倍数上限
+}
+
+os.makedirs(CONFIG["DATA_DIR"], exist_ok=True)
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+def dynamic_min_samples(n_samples: int) -> int:
+    """动态计算最小样本量"""
+    return max(5, int(CONFIG["MIN_SAMPLES_FACTOR"] * np.log(n_samples + 1)))
+
+def standardize(values: np.ndarray) -> Tuple[np.ndarray, float, float]:
+    """
+    一维数据的z-score标准化，结果与 sklearn StandardScaler().fit_transform 逐位一致：
+    均值为 和/n，方差用校正的两遍算法，近似常数的数据缩放系数取1
+    :return: (n×1 的标准化数组, 均值, 缩放系数)
+    """
+    x = np.asarray(values, dtype=np.float64).reshape(-1, 1)
+    n = x.shape[0]
+    mean = x.sum(axis=0) / n
+    centered = x - mean
+    correction = centered.sum(axis=0)
+    var = ((centered ** 2).sum(axis=0) - correction ** 2 / n) / n
+    eps = np.finfo(np.float64).eps
+    constant = var <= n * eps * var + (n * mean * eps) ** 2
+    scale = np.where(constant, 1.0, np.sqrt(var))
+    return centered / scale, float(mean[0]), float(scale[0])
+
+def _within_eps_bounds(xs: np.ndarray, eps: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    升序数组中每个点eps邻域（含边界）的下标范围 [lo, hi)
+    按 (xj - xi)^2 <= eps^2 判断，与sklearn树结构的半径查询判定方式一致
+    """
+    n = len(xs)
+    eps2 = eps * eps
+    idx = np.arange(n)
+    lo = np.searchsorted(xs, xs - eps, side="left")
+    hi = np.searchsorted(xs, xs + eps, side="right")
+    # searchsorted 基于 xi±eps 的舍入结果，边界处逐步修正为精确判定
+    while True:
+        grow = (lo > 0) & ((xs[np.maximum(lo - 1, 0)] - xs) ** 2 <= eps2)
+        shrink = (lo < idx) & ((xs[lo] - xs) ** 2 > eps2)
+        if not (grow.any() or shrink.any()):
+            break
+        lo = lo - grow + shrink
+    while True:
+        grow = (hi < n) & ((xs[np.minimum(hi, n - 1)] - xs) ** 2 <= eps2)
+        shrink = (hi - 1 > idx) & ((xs[hi - 1] - xs) ** 2 > eps2)
+        if not (grow.any() or shrink.any()):
+            break
+        hi = hi + grow - shrink
+    return lo, hi
+
+def kdistance_1d(values: np.ndarray, k: int) -> np.ndarray:
+    """
+    一维数据到第k近邻（含自身）的距离，等价于
+    NearestNeighbors(n_neighbors=k).fit(X).kneighbors(X)[0][:, -1]
+    排序后k个最近邻必为包含该点的连续k个点，取所有候选窗口中最远端距离的最小值，O(n log n + nk)
+    """
+    x = np.asarray(values, dtype=np.float64).ravel()
+    n = len(x)
+    if k > n:
+        raise ValueError(f"n_neighbors={k} 大于样本数 {n}")
+    order = np.argsort(x, kind="stable")
+    xs = x[order]
+    idx = np.arange(n)
+    best = np.full(n, np.inf)
+    for offset in range(k):
+        start = idx - offset
+        valid = (start >= 0) & (start + k - 1 < n)
+        i, j = idx[valid], start[valid]
+        best[i] = np.minimum(best[i], np.maximum(xs[i] - xs[j], xs[j + k - 1] - xs[i]))
+    result = np.empty(n)
+    result[order] = best
+    return result
+
+def dbscan_1d(values: np.ndarray, eps: float, min_samples: int) -> np.ndarray:
+    """
+    一维数据的DBSCAN，标签（含簇编号顺序与边界点归属）与sklearn.cluster.DBSCAN一致
+    - 核心点：eps邻域（含自身）点数 >= min_samples
+    - 排序后相邻核心点间距 <= eps 即属同一簇
+    - 簇编号按簇内核心点的最小原始下标排序（sklearn按下标顺序扩展簇）
+    - 边界点归属于左右最近核心点中编号较小（先被扩展到）的簇
+    """
+    x = np.asarray(values, dtype=np.float64).ravel()
+    n = len(x)
+    labels = np.full(n, -1, dtype=np.int64)
+    if n == 0:
+        return labels
+    order = np.argsort(x, kind="stable")
+    xs = x[order]
+    eps2 = eps * eps
+
+    lo, hi = _within_eps_bounds(xs, eps)
+    is_core = (hi - lo) >= min_samples
+    core_pos = np.flatnonzero(is_core)
+    if len(core_pos) == 0:
+        return labels
+
+    # 核心点连通分量，按最小原始下标编号
+    new_cluster = np.concatenate(([True], np.diff(xs[core_pos]) ** 2 > eps2))
+    component = np.cumsum(new_cluster) - 1
+    first_index = np.full(component[-1] + 1, n)
+    np.minimum.at(first_index, component, order[core_pos])
+    rank = np.empty_like(first_index)
+    rank[np.argsort(first_index, kind="stable")] = np.arange(len(first_index))
+    sorted_labels = np.full(n, -1, dtype=np.int64)
+    sorted_labels[core_pos] = rank[component]
+
+    # 边界点：取左右最近核心点中可达且编号最小的簇
+    border = np.flatnonzero(~is_core)
+    right = np.searchsorted(core_pos, border)
+    left = right - 1
+    candidates = np.full(len(border), np.iinfo(np.int64).max)
+    has_left = left >= 0
+    reach_left = np.zeros(len(border), dtype=bool)
+    reach_left[has_left] = (xs[border[has_left]] - xs[core_pos[left[has_left]]]) ** 2 <= eps2
+    candidates[reach_left] = sorted_labels[core_pos[left[reach_left]]]
+    has_right = right < len(core_pos)
+    reach_right = np.zeros(len(border), dtype=bool)
+    reach_right[has_right] = (xs[core_pos[right[has_right]]] - xs[border[has_right]]) ** 2 <= eps2
+    candidates[reach_right] = np.minimum(candidates[reach_right], sorted_labels[core_pos[right[reach_right]]])
+    reached = reach_left | reach_right
+    sorted_labels[border[reached]] = candidates[reached]
+
+    labels[order] = sorted_labels
+    return labels
+
+def _use_1d(data: np.ndarray, n_neighbors: int) -> bool:
+    """
+    一维数据走快速路径；样本数 <= 2*n_neighbors+1 时sklearn改用brute算法，
+    其距离由展开式计算带有舍入误差，此时直接调用sklearn以保证结果一致（数据量极小，开销可忽略）
+    """
+    return CONFIG["ENGINE"] == "1d" and data.shape[1] == 1 and n_neighbors < data.shape[0] // 2
+
+def kdistance(data: np.ndarray, k: int) -> np.ndarray:
+    """第k近邻距离（一维数据走快速路径）"""
+    if _use_1d(data, k):
+        return kdistance_1d(data, k)
+    from sklearn.neighbors import NearestNeighbors
+    neighbors = NearestNeighbors(n_neighbors=k)
+    neighbors.fit(data)
+    distances, _ = neighbors.kneighbors(data)
+    return distances[:, -1]
+
+def cluster(data: np.ndarray, eps: float, min_samples: int) -> np.ndarray:
+    """DBSCAN聚类标签（一维数据走快速路径）"""
+    # DBSCAN内部的NearestNeighbors使用默认 n_neighbors=5 选择算法
+    if _use_1d(data, 5):
+        return dbscan_1d(data, eps, min_samples)
+    from sklearn.cluster import DBSCAN
+    return DBSCAN(eps=eps, min_samples=min_samples).fit_predict(data)
+
+def calculate_eps(data: np.ndarray) -> Optional[float]:
+    """动态计算eps值（结合拐点检测和分位数）"""
+    try:
+        n_samples = data.shape[0]
+        min_samples = dynamic_min_samples(n_samples)
+        
+        # 计算k-distance
+        k_distances = np.sort(kdistance(data, min_samples))
+        
+        # 拐点检测逻辑
+        eps_auto = k_distances[-1]  # 默认使用最大值
+        if n_samples >= CONFIG["MIN_DATA_SIZE"]:
+            try:
+                # 计算二阶差分
+                gradients = np.gradient(k_distances)
+                second_derivatives = np.gradient(gradients)
+                
+                # 寻找正二阶导数的拐点
+                candidate_indices = np.where(second_derivatives > 0)[0]
+                if len(candidate_indices) > 0:
+                    eps_auto = k_distances[candidate_indices[-1]]
+            except Exception as e:
+                logger.debug(f"拐点检测失败: {str(e)}，使用备用方法")
+        
+        # 计算分位数阈值
+        eps_quantile = np.quantile(k_distances, CONFIG["QUANTILE_THRESHOLD"])
+        
+        # 确定最终eps（取最小值并限制最大倍数）
+        eps = min(eps_auto, eps_quantile, CONFIG["MAX_EPS_RATIO"] * eps_auto)
+        
+        # 安全校验
+        if eps <= 0 or eps > np.max(k_distances) * 1.2:
+            return np.quantile(k_distances, 0.9)
+        return eps
+    except Exception as e:
+        logger.error(f"EPS计算失败: {str(e)}")
+        return None
+
+# ================== 参数缓存 ==================
+class ParamCache:
+    """
+    按型号保存上次完整计算时的标准化参数与eps（JSON文件）
+    命中时沿用缓存的eps（换算到当天的标准化尺度），不再计算k-distance曲线；
+    命中不更新缓存，漂移始终相对上次完整计算时的分布判断，避免逐日累积
+    """
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.params: Dict[str, Dict] = {}
+        self.hits = 0
+        self.misses = {"new": 0, "drift": 0}
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.params = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"参数缓存 {path} 读取失败，将重新计算: {str(e)}")
+
+    def get(self, model: str) -> Optional[Dict]:
+        return self.params.get(str(model))
+
+    def record(self, model: str, source: Optional[str], params: Optional[Dict]):
+        """记录一列的结果：source 为 hit / new / drift（None表示数据不足未参与）"""
+        if source == "hit":
+            self.hits += 1
+        elif source is not None:
+            self.misses[source] += 1
+        if params is not None:
+            self.params[str(model)] = params
+
+    def metrics(self) -> Dict:
+        total = self.hits + sum(self.misses.values())
+        return {"hits": self.hits, "misses": sum(self.misses.values()), "miss_new": self.misses["new"],
+                "miss_drift": self.misses["drift"], "hit_ratio": round(self.hits / total, 4) if total else None}
+
+    def save(self):
+        if not self.path:
+            return
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.params, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, self.path)
+
+def default_param_cache() -> ParamCache:
+    """CONFIG 指定的参数缓存，未启用时返回不读写文件的空缓存"""
+    name = CONFIG["PARAM_CACHE"]
+    return ParamCache(os.path.join(CONFIG["DATA_DIR"], name) if name else None)
+
+def params_still_valid(cached: Dict, mean: float, scale: float, n_samples: int) -> bool:
+    """
+    漂移检验：当天数据与缓存参数对应的分布是否一致
+    - 均值偏移不超过 DRIFT_MEAN_TOL 个（缓存时的）标准差
+    - 标准差相对变化不超过 DRIFT_SCALE_TOL
+    - 样本数变化不超过 DRIFT_SIZE_RATIO 倍，且是否做拐点检测（样本数 >= MIN_DATA_SIZE）不变
+    """
+    if cached["scale"] <= 0 or scale <= 0:
+        return False
+    if abs(mean - cached["mean"]) > CONFIG["DRIFT_MEAN_TOL"] * cached["scale"]:
+        return False
+    if abs(scale / cached["scale"] - 1) > CONFIG["DRIFT_SCALE_TOL"]:
+        return False
+    ratio = n_samples / cached["n"]
+    if not 1 / CONFIG["DRIFT_SIZE_RATIO"] <= ratio <= CONFIG["DRIFT_SIZE_RATIO"]:
+        return False
+    return (n_samples >= CONFIG["MIN_DATA_SIZE"]) == (cached["n"] >= CONFIG["MIN_DATA_SIZE"])
+
+# ================== 逐列清洗 ==================
+def process_column(data: pd.Series, cached: Optional[Dict] = None) -> Tuple[pd.Series, Dict, Optional[str], Optional[Dict]]:
+    """
+    处理单个数据列
+    :param cached: 该型号缓存的参数，漂移检验通过时沿用其eps
+    :return: (清洗后数据, 统计信息, 参数来源 hit/new/drift, 需要写入缓存的新参数)
+    """
+    col_name = data.name
+    logger.info(f"正在处理列: {col_name}")
+    original_data = data.copy()
+    stats = {
+        "error": None,
+        "eps": None,
+        "noise_ratio": 0.0,
+        "n_clusters": 0,
+        "cleaned_mean": None,
+        "scaled_var": None
+    }
+
+    # 预处理数据
+    valid_data = data.dropna()
+    if len(valid_data) < 5:
+        stats["error"] = "insufficient_data"
+        return original_data, stats, None, None
+
+    source, params = None, None
+    try:
+        # 数据标准化
+        scaled, mean, scale = standardize(valid_data.values)
+        
+        # 动态计算参数：分布未漂移时沿用缓存的eps（按标准差换算到当天的尺度）
+        if cached is not None and params_still_valid(cached, mean, scale, len(valid_data)):
+            source = "hit"
+            eps = cached["eps"] * cached["scale"] / scale
+        else:
+            source = "new" if cached is None else "drift"
+            eps = calculate_eps(scaled)
+            if eps is not None and eps > 0:
+                params = {"mean": mean, "scale": scale, "eps": float(eps), "n": len(valid_data)}
+        if eps is None or eps <= 0:
+            stats["error"] = "invalid_eps"
+            return original_data, stats, source, None
+        
+        min_samples = dynamic_min_samples(len(valid_data))
+        
+        # 执行DBSCAN聚类
+        labels = cluster(scaled, eps, min_samples)
+        
+        # 标记噪声点
+        noise_mask = labels == -1
+        cleaned_idx = valid_data.index[~noise_mask]
+        
+        # 计算标准化方差
+        if len(cleaned_idx) > 1:
+            cleaned_scaled = scaled[~noise_mask]
+            stats["scaled_var"] = round(float(np.var(cleaned_scaled)), 4)
+        
+        # 生成清洗后数据
+        cleaned_data = valid_data.copy()
+        cleaned_data.iloc[noise_mask] = np.nan
+        
+        # 更新统计信息
+        cleaned_mean = cleaned_data.mean() if not cleaned_data.dropna().empty else None
+        
+        stats.update({
+            "eps": round(eps, 4),
+            "noise_ratio": round(noise_mask.mean(), 4),
+            "n_clusters": len(np.unique(labels)) - (1 if -1 in labels else 0),
+            "cleaned_mean": round(cleaned_mean, 4) if cleaned_mean else None
+        })
+
+        # 应用清洗结果
+        result = original_data.copy()
+        result.loc[cleaned_data.index] = cleaned_data
+        return result, stats, source, params
+        
+    except Exception as e:
+        logger.error(f"列 {col_name} 处理异常: {str(e)}")
+        stats["error"] = "processing_error"
+        return original_data, stats, source, None
+
+def _process_item(item: Tuple[pd.Series, Optional[Dict]]):
+    """在工作进程中处理一列，并附上该列的CPU耗时"""
+    start = time.process_time()
+    outputs = process_column(*item)
+    return outputs + (time.process_time() - start,)
+
+def dbscan_clean(df: pd.DataFrame, n_jobs: Optional[int] = None,
+                 param_cache: Optional[ParamCache] = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    逐列执行DBSCAN清洗（各列相互独立，可并行）
+    :param param_cache: eps参数缓存，缺省按 CONFIG["PARAM_CACHE"] 读写文件
+    :return: (清洗后数据, 以列名为索引的统计表)，缓存命中情况见统计表的 attrs["param_cache"]，
+             各列的CPU耗时见 attrs["seconds"]
+    """
+    n_jobs = CONFIG["N_JOBS"] if n_jobs is None else n_jobs
+    cache = default_param_cache() if param_cache is None else param_cache
+    items = [(df[col], cache.get(col)) for col in df.columns]
+    outputs = parallel_map(_process_item, items, n_jobs=n_jobs)
+    
+    cleaned = {}
+    stats_data = []
+    seconds = {}
+    for col, (cleaned_series, stats, source, params, elapsed) in zip(df.columns, outputs):
+        cleaned[col] = cleaned_series
+        seconds[col] = elapsed
+        stats["column"] = col
+        stats_data.append(stats)
+        cache.record(col, source, params)
+    cleaned_df = pd.DataFrame(cleaned, index=df.index, columns=df.columns)
+    cache.save()
+
+    stats_df = pd.DataFrame(stats_data).set_index("column")
+    stats_df.attrs["seconds"] = seconds
+    stats_df.attrs["param_cache"] = metrics = cache.metrics()
+    if metrics["hits"] or metrics["misses"]:
+        logger.info(f"参数缓存: 命中 {metrics['hits']}，重新计算 {metrics['misses']}"
+                    f"（新型号 {metrics['miss_new']}，分布漂移 {metrics['miss_drift']}）")
+    return cleaned_df, stats_df
+
+def main():
+    today = date.today().strftime("%Y-%m-%d")
+    input_path = os.path.join(CONFIG["DATA_DIR"], f"{today}_iqr.csv")
+    
+    try:
+        df = pd.read_csv(input_path)
+        cleaned_df, stats_df = dbscan_clean(df)
+        
+        # 保存结果
+        cleaned_df.to_csv(
+            os.path.join(CONFIG["DATA_DIR"], f"{today}_dbscan.csv"), 
+            index=False
+        )
+        stats_df.to_csv(
+            os.path.join(CONFIG["DATA_DIR"], f"{today}_dbscan_stats.csv")
+        )
+        logger.info(f"处理完成，有效处理 {len(stats_df)} 列数据")
+        
+    except Exception as e:
+        logger.error(f"主流程失败: {str(e)}")
+
+if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,66 +1,145 @@
-import pandas as pd
-from datetime import date
-
-# 输入日期（注意保持文件名与日期格式一致）
-date_str = date.today().strftime("%Y-%m-%d")  # 重命名变量避免与date模块冲突
-
-# 读取文件
-dbscan_path = f"ana/{date_str}_dbscan.csv"
-stats_path = f"ana/{date_str}_dbscan_stats.csv"
-
-# 读取第一个文件并提取型号
-df_dbscan = pd.read_csv(dbscan_path)
-models = df_dbscan.columns.tolist()
-
-# 读取第二个文件并建立型号索引
-df_stats = pd.read_csv(stats_path).set_index("column")
-
-# 第一阶段：处理众数和均值逻辑（强制转换为整数）
-results = []
-for model in models:
-    data = df_dbscan[model]
-    counts = data.value_counts()
-    filtered_counts = counts[counts >= 5]
-    
-    if not filtered_counts.empty:
-        max_count = filtered_counts.max()
-        candidates = filtered_counts[filtered_counts == max_count].index
-        mode = min(candidates)
-        results.append(int(mode))  # 确保众数为整数
-    else:
-        if model in df_stats.index:
-            record = df_stats.loc[model]
-            if record["scaled_var"] < 0.8:
-                # 均值四舍五入后转整数
-                cleaned_mean = record["cleaned_mean"]
-                results.append(int(round(cleaned_mean)))  # 关键修改点
-            else:
-                results.append(None)
-        else:
-            results.append(None)
-
-# 第二阶段：填充剩余空值为最小值（强制为整数）
-for i in range(len(results)):
-    if results[i] is None:
-        model = models[i]
-        numeric_series = pd.to_numeric(df_dbscan[model], errors='coerce')
-        valid_values = numeric_series.dropna()
-        
-        if not valid_values.empty:
-            # 取最小值后四舍五入并转整数
-            min_val = valid_values.min()
-            results[i] = int(round(min_val))  # 关键修改点
-        else:
-            print(f"警告: 型号 {model} 无有效数值数据")
-
-# 创建结果DataFrame（列名动态化）
-result_df = pd.DataFrame({
-    "name": models,          # 第一列固定为name
-    date_str: results        # 第二列名为当天日期
-})
-
-# 保存结果
-output_path = f"result/{date_str}_od.csv"
-result_df.to_csv(output_path, index=False)
-
-print(f"处理完成，结果已保存至：{output_path}")
\ No newline at end of file
+import os
+import numpy as np
+import pandas as pd
+from datetime import date
+
+MODE_MIN_COUNT = 5        # 众数至少出现的次数
+MAX_SCALED_VAR = 0.8      # 使用清洗后均值时标准化方差的上限
+
+def _run_starts(*arrays):
+    """已排序数组中每段相同取值的起始位置"""
+    change = np.ones(len(arrays[0]), dtype=bool)
+    if len(change) > 1:
+        change[1:] = np.logical_or.reduce([a[1:] != a[:-1] for a in arrays])
+    return np.flatnonzero(change)
+
+def stack_days(frames):
+    """
+    把多天的DBSCAN清洗结果（宽表）拼成长表
+    :param frames: {日期: 宽表}
+    :return: 长表 (date, model, price)，包含NaN
+    """
+    days, models, prices = [], [], []
+    for day, df in frames.items():
+        n_rows, n_cols = df.shape
+        if not all(pd.api.types.is_numeric_dtype(t) for t in df.dtypes):
+            df = df.apply(pd.to_numeric, errors="coerce")
+        days.append(np.full(n_rows * n_cols, day, dtype=object))
+        models.append(np.tile(np.asarray(df.columns, dtype=object), n_rows))
+        prices.append(df.to_numpy(dtype=np.float64).ravel())
+    if not prices:
+        return pd.DataFrame({"date": [], "model": [], "price": []})
+    # 日期/型号取值重复度很高，用分类类型减少内存并加速后续分组
+    return pd.DataFrame({
+        "date": pd.Categorical(np.concatenate(days)),
+        "model": pd.Categorical(np.concatenate(models)),
+        "price": np.concatenate(prices),
+    })
+
+def aggregate_long(long_df, stats_df, keys=None):
+    """
+    批量计算多个日期、多个型号的当日价格
+    1. 出现次数 >= 5 的众数（并列取最小值，截断为整数）
+    2. 否则 scaled_var < 0.8 时取清洗后均值（四舍五入）
+    3. 否则取最小值（四舍五入），仍无有效数据则为NaN
+    :param long_df: 长表 (date, model, price)，price 可为NaN
+    :param stats_df: 长表 (date, model, scaled_var, cleaned_mean)
+    :param keys: 需要输出的 (date, model) 表，缺省为 long_df 中出现过的组合
+    :return: DataFrame(date, model, price)，行顺序与 keys 一致
+    """
+    if keys is None:
+        keys = long_df[["date", "model"]].drop_duplicates()
+    keys = keys[["date", "model"]].reset_index(drop=True)
+    index = pd.MultiIndex.from_frame(keys)
+    n_keys = len(keys)
+
+    # 每条样本映射到整数分组号，丢弃空值与不在 keys 中的样本
+    group = index.get_indexer(pd.MultiIndex.from_frame(long_df[["date", "model"]]))
+    price = pd.to_numeric(long_df["price"], errors="coerce").to_numpy(dtype=np.float64)
+    valid = (group >= 0) & ~np.isnan(price)
+    group, price = group[valid], price[valid]
+
+    # 按 (分组, 价格) 排序后做游程编码，得到每个分组内各价格的出现次数
+    order = np.lexsort((price, group))
+    group, price = group[order], price[order]
+    starts = _run_starts(group, price)
+    run_group, run_price = group[starts], price[starts]
+    run_count = np.diff(np.append(starts, len(group)))
+
+    # 最小值：每个分组排序后的第一条
+    minimum = np.full(n_keys, np.nan)
+    first = _run_starts(run_group)
+    minimum[run_group[first]] = run_price[first]
+
+    # 众数：次数达标的游程中，按 (分组, 次数降序, 价格升序) 取每组第一条
+    ok = run_count >= MODE_MIN_COUNT
+    run_group, run_price, run_count = run_group[ok], run_price[ok], run_count[ok]
+    order = np.lexsort((run_price, -run_count, run_group))
+    run_group, run_price = run_group[order], run_price[order]
+    first = _run_starts(run_group)
+    result = np.full(n_keys, np.nan)
+    result[run_group[first]] = np.trunc(run_price[first])
+
+    # 均值备选：scaled_var < 0.8 的清洗后均值
+    stats = stats_df.reset_index(drop=True)
+    position = index.get_indexer(pd.MultiIndex.from_frame(stats[["date", "model"]]))
+    scaled_var = pd.to_numeric(stats["scaled_var"], errors="coerce").to_numpy(dtype=np.float64)
+    cleaned_mean = pd.to_numeric(stats["cleaned_mean"], errors="coerce").to_numpy(dtype=np.float64)
+    usable = (position >= 0) & (scaled_var < MAX_SCALED_VAR)
+    mean = np.full(n_keys, np.nan)
+    mean[position[usable]] = cleaned_mean[usable]
+
+    for fallback in (mean, minimum):
+        missing = np.isnan(result)
+        result[missing] = np.round(fallback[missing])
+    return keys.assign(price=result)
+
+def daily_price(df_dbscan, df_stats, date_str):
+    """
+    由DBSCAN清洗结果计算每个型号的当日价格
+    :param df_dbscan: 清洗后的数据（每列一个型号）
+    :param df_stats: 以型号为索引的DBSCAN统计表
+    :param date_str: 结果列名（当天日期）
+    :return: 两列DataFrame（name, 日期）
+    """
+    models = df_dbscan.columns.tolist()
+    long_df = stack_days({date_str: df_dbscan})
+    stats_df = df_stats.rename_axis("model").reset_index().assign(date=date_str)
+    keys = pd.DataFrame({"date": date_str, "model": models})
+    prices = aggregate_long(long_df, stats_df, keys)["price"].to_numpy()
+
+    for model in np.array(models, dtype=object)[np.isnan(prices)]:
+        print(f"警告: 型号 {model} 无有效数值数据")
+
+    # 与逐个追加 int/None 后建表的类型一致：有缺失时为浮点，否则为整数
+    results = prices if np.isnan(prices).any() else prices.astype(np.int64)
+    return pd.DataFrame({
+        "name": models,          # 第一列固定为name
+        date_str: results        # 第二列名为当天日期
+    })
+
+def main():
+    # 输入日期（注意保持文件名与日期格式一致）
+    date_str = date.today().strftime("%Y-%m-%d")  # 重命名变量避免与date模块冲突
+
+    # 读取文件
+    dbscan_path = f"ana/{date_str}_dbscan.csv"
+    stats_path = f"ana/{date_str}_dbscan_stats.csv"
+
+    # 读取第一个文件并提取型号
+    df_dbscan = pd.read_csv(dbscan_path)
+
+    # 读取第二个文件并建立型号索引
+    df_stats = pd.read_csv(stats_path).set_index("column")
+
+    result_df = daily_price(df_dbscan, df_stats, date_str)
+
+    # 保存结果
+    os.makedirs("result", exist_ok=True)
+    output_path = f"result/{date_str}_od.csv"
+    result_df.to_csv(output_path, index=False)
+
+    print(f"处理完成，结果已保存至：{output_path}")
+
+if __name__ == "__main__":
+    main()
@@ -1,40 +1,35 @@
-import csv
-from datetime import date 
-def append_column(input_file, output_file):
-    # 读取输入文件的第二列
-    new_column = []
-    with open(input_file, 'r', newline='') as f_in:
-        reader = csv.reader(f_in)
-        for row in reader:
-            new_column.append(row[1] if len(row) >= 2 else '')
-    
-    # 读取目标文件现有数据
-    existing_data = []
-    try:
-        with open(output_file, 'r', newline='') as f_out:
-            reader = csv.reader(f_out)
-            existing_data = list(reader)
-    except FileNotFoundError:
-        pass
-    
-    # 计算最大行数以兼容不同行数
-    max_rows = max(len(existing_data), len(new_column))
-    
-    # 合并数据
-    merged_data = []
-    for i in range(max_rows):
-        # 获取现有行或创建新行
-        row = existing_data[i].copy() if i < len(existing_data) else []
-        # 追加新列值或空字符串
-        row.append(new_column[i] if i < len(new_column) else '')
-        merged_data.append(row)
-    
-    # 写入目标文件
-    with open(output_file, 'w', newline='') as f_out:
-        writer = csv.writer(f_out)
-        writer.writerows(merged_data)
-
-# 使用示例
-today = date.today().strftime("%Y-%m-%d")
-filename = fr"result\{today}_od.csv"
-append_column(filename, 'cpu_sale.csv')
\ No newline at end of file
+import os
+from datetime import date
+
+import pandas as pd
+
+import rolling
+from history import export_sale_csv, open_history
+
+def append_column(input_file, output_file):
+    """把当日结果CSV（name, 日期 两列）追加到总表"""
+    append_frame(pd.read_csv(input_file, dtype={0: str}), output_file)
+
+def append_frame(df, output_file):
+    """
+    把当日结果（name, 日期 两列）按型号名写入历史库，并更新滚动统计，耗时与历史天数无关
+    总表CSV不在这里改写，由 pipeline.py / 8.py 最后通过 history.export_sale_csv 从历史库导出
+    """
+    day = df.columns[1]
+    prices = pd.Series(df[day].to_numpy(), index=df[df.columns[0]].astype(str))
+    with open_history(output_file) as store:
+        store.append(day, prices)
+        rolling.update(store, day, prices)
+
+def remove_day(day, output_file):
+    """从历史库中删除一天（如8.py检测到当天全部为空）"""
+    with open_history(output_file) as store:
+        return store.remove_dates([day])
+
+# 使用示例
+if __name__ == "__main__":
+    today = date.today().strftime("%Y-%m-%d")
+    filename = os.path.join("result", f"{today}_od.csv")
+    append_column(filename, 'cpu_sale.csv')
+    # 单独运行各脚本时也保持总表CSV与历史库一致
+    export_sale_csv('cpu_sale.csv')
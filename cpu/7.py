@@ -1,37 +1,61 @@
-import pandas as pd
-from datetime import date
-def process_csv(input_file):
-    today = date.today().strftime("%Y-%m-%d")  # 重命名变量避免与date模块冲突
-    # 读取CSV文件并保留原始数据格式[5](@ref)
-    try:
-        input_file=fr"data\{today}_output.csv"
-        df = pd.read_csv(input_file, dtype=str, keep_default_na=False)
-    except Exception as e:
-        print(f"文件读取失败：{str(e)}")
-        return
-
-    # 格式检测与修正
-    total_rows = len(df)
-    error_count = 0
-    
-    # 第一列强制转换为文本类型[9](@ref)
-    df.iloc[:, 0] = df.iloc[:, 0].astype(str)
-    
-    # 处理其他数值列
-    for col in df.columns[1:]:
-        # 尝试转换为整数，失败则置为0[6,9](@ref)
-        converted = pd.to_numeric(df[col], errors='coerce')
-        error_count += converted.isna().sum()
-        df[col] = converted.fillna(0).astype('int64')
-
-    # 输出结果
-    print(f"CSV文件总行数：{total_rows}")
-    print(f"格式错误字段数：{error_count}")
-    
-    # 保存修正后的文件[5](@ref)
-    df.to_csv(input_file, index=False)
-    return df
-
-# 使用示例
-if __name__ == "__main__":
+import os
+import numpy as np
+import pandas as pd
+from datetime import date
+def process_csv(input_file):
+    today = date.today().strftime("%Y-%m-%d")  # 重命名变量避免与date模块冲突
+    # 读取CSV文件并保留原始数据格式[5](@ref)
+    try:
+        input_file=os.path.join("data", f"{today}_output.csv")
+        df = pd.read_csv(input_file, dtype=str, keep_default_na=False)
+    except Exception as e:
+        print(f"文件读取失败：{str(e)}")
+        return
+
+    df = check_output(df)
+    
+    # 保存修正后的文件[5](@ref)
+    df.to_csv(input_file, index=False)
+    return df
+
+def check_output(df):
+    """检测并修正简单清洗后的数据：第一列为文本，其余列为整数（无法转换的置0）"""
+    # 格式检测与修正
+    total_rows = len(df)
+    error_count = 0
+    
+    # 第一列强制转换为文本类型[9](@ref)
+    df.iloc[:, 0] = df.iloc[:, 0].astype(str)
+    
+    # 处理其他数值列
+    for col in df.columns[1:]:
+        # 尝试转换为整数，失败则置为0[6,9](@ref)
+        converted = pd.to_numeric(df[col], errors='coerce')
+        error_count += converted.isna().sum()
+        df[col] = converted.fillna(0).astype('int64')
+
+    # 输出结果
+    print(f"CSV文件总行数：{total_rows}")
+    print(f"格式错误字段数：{error_count}")
+    return df
+
+def check_samples(samples):
+    """
+    与 check_output(samples.frame().astype(str)) 结果相同，但直接在价格数组上检测，不经过字符串转换
+    :param samples: 2.py读入的 DaySamples
+    """
+    values = samples.matrix(np.float64)
+    invalid = ~np.isfinite(values)
+    error_count = int(invalid[:, 1:].sum())
+    df = pd.DataFrame(np.where(invalid, 0, values).astype("int64"), columns=samples.models)
+    if samples.n_models:
+        # check_output 把第一列当作文本列保留（浮点数的字符串形式）
+        df[df.columns[0]] = [str(v) for v in values[:, 0].tolist()]
+
+    print(f"CSV文件总行数：{len(df)}")
+    print(f"格式错误字段数：{error_count}")
+    return df
+
+# 使用示例
+if __name__ == "__main__":
     process_csv('input.csv')
\ No newline at end of file
@@ -0,0 +1,178 @@
+import argparse
+import io
+import logging
+import os
+import re
+import sys
+from contextlib import redirect_stdout
+
+import pandas as pd
+
+import pipeline
+from history import export_sale_csv, open_history
+from metrics import METRICS_DIR, RunMetrics, write_prometheus
+from parallel import parallel_map
+from query import normalize_date
+
+# ================== 配置区 ==================
+DATA_DIR = pipeline.DATA_DIR
+RESULT_DIR = pipeline.RESULT_DIR
+SALE_FILE = pipeline.SALE_FILE
+DAY_FILE = re.compile(r"^(\d{4}-\d{2}-\d{2})_(?:input\.csv|output\.csv|prices\.bin)$")
+
+# ================== 查找日期 ==================
+def discover_days(start=None, end=None, data_dir=DATA_DIR):
+    """
+    data/ 下有抓取数据（价格日志、input.csv 或 output.csv）的日期
+    :param start: 起始日期（含），None则不限
+    :param end: 结束日期（含），None则不限
+    :return: 升序的日期列表（YYYY-MM-DD）
+    """
+    if not os.path.isdir(data_dir):
+        return []
+    start = normalize_date(start) if start else None
+    end = normalize_date(end) if end else None
+    days = set()
+    for name in os.listdir(data_dir):
+        match = DAY_FILE.match(name)
+        if match:
+            day = match.group(1)
+            if (start is None or day >= start) and (end is None or day <= end):
+                days.add(day)
+    return sorted(days)
+
+# ================== 逐天处理 ==================
+def process_day(day, data_dir=DATA_DIR, metrics_dir=METRICS_DIR, resume=False):
+    """
+    在工作进程中处理一天（阶段2~5），覆盖写出 ana/ 与 result/ 下当天的文件
+    各阶段的输出收集到 log 中，避免多个进程的输出交错；运行指标只写当天的JSON，textfile由主进程合并写出
+    :param data_dir: 抓取数据目录
+    :param resume: 为True且 result/{日期}_od.csv 已存在时不重新计算，直接读入
+    :return: {"day", "od"（5.py的当日结果，失败时为None）, "rows", "seconds", "stages", "reused", "error", "log"}
+    """
+    od_file = os.path.join(RESULT_DIR, f"{day}_od.csv")
+    result = {"day": day, "od": None, "rows": 0, "seconds": 0.0, "stages": [], "reused": False, "error": None,
+              "log": ""}
+    if resume and os.path.exists(od_file):
+        result["od"] = pd.read_csv(od_file, dtype={0: str})
+        result["reused"] = True
+        return result
+
+    # 4.py 逐列的INFO日志在并行时过多，只保留警告
+    logging.getLogger("4").setLevel(logging.WARNING)
+    metrics = RunMetrics("backfill", day)
+    output = io.StringIO()
+    try:
+        with redirect_stdout(output):
+            samples = pipeline.load_samples(metrics, day, data_dir)
+            result["rows"] = samples.n_rows
+            result["od"] = pipeline.analyse_day(metrics, day, samples, save_intermediate=True)
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        if metrics_dir:
+            metrics.write(metrics_dir, prometheus=False)
+    result["stages"] = metrics.stages
+    result["seconds"] = sum(s["wall_seconds"] for s in metrics.stages)
+    result["log"] = output.getvalue()
+    return result
+
+# ================== 合并总表 ==================
+def merge_history(results, sale_file=SALE_FILE):
+    """
+    按日期顺序把各天的当日价格写入历史库（阶段6；总表CSV由 backfill 最后从历史库导出）
+    - 总表中已有同一天（格式可能不同，如 2025/5/6）时写入该列，不会多出重复的列
+    - 写入后按日期重新排列列顺序，补跑的旧日期排在较新日期之前
+    :param results: process_day 的结果，失败的日期跳过
+    :return: 写入的天数
+    """
+    results = sorted((r for r in results if r["od"] is not None), key=lambda r: r["day"])
+    with open_history(sale_file) as store:
+        labels = {}
+        for label in store.dates():
+            # 同一天有多个格式时，查询以靠后的列为准，写入该列
+            labels[normalize_date(label)] = label
+        for r in results:
+            od_df, day = r["od"], r["day"]
+            prices = pd.Series(od_df[day].to_numpy(), index=od_df[od_df.columns[0]].astype(str))
+            store.append(labels.get(day, day), prices)
+        store.sort_dates(normalize_date)
+    return len(results)
+
+# ================== 主流程 ==================
+def backfill(start=None, end=None, n_jobs=None, sale_file=SALE_FILE, metrics_dir=METRICS_DIR, resume=False,
+             data_dir=DATA_DIR):
+    """
+    补跑/重跑一段日期：各天在进程池中并行执行2~5，结果写入 ana/ 与 result/，最后在主进程按日期顺序合并到总表
+    同一段日期重复执行得到相同的文件与总表（DBSCAN参数每天重新计算，不使用参数缓存）
+    :param n_jobs: 并行进程数，None或<=0使用全部核心
+    :param resume: 跳过 result/ 下已有当日结果的日期（仍合并到总表）
+    :return: process_day 的结果列表（按日期升序）
+    """
+    days = discover_days(start, end, data_dir)
+    if not days:
+        return []
+    metrics = RunMetrics("backfill", f"{days[0]}~{days[-1]}")
+    results = parallel_map(process_day, days, n_jobs=n_jobs, data_dir=data_dir, metrics_dir=metrics_dir,
+                           resume=resume)
+    merge_history(results, sale_file)
+    export_sale_csv(sale_file)
+    if metrics_dir:
+        write_prometheus(merge_metrics(metrics, results).report(), metrics_dir)
+    return results
+
+def merge_metrics(metrics, results):
+    """
+    把各天的阶段指标合并到主进程的 metrics：同名阶段的墙钟/CPU时间与行数求和、峰值内存取最大
+    """
+    stages = {}
+    for r in results:
+        for s in r["stages"]:
+            merged = stages.setdefault(s["stage"], {"stage": s["stage"], "status": "ok"})
+            for key, value in s.items():
+                if key in ("stage", "status", "error") or not isinstance(value, (int, float)):
+                    continue
+                if key == "peak_rss_mb":
+                    merged[key] = max(merged.get(key) or 0, value)
+                else:
+                    merged[key] = merged.get(key, 0) + value
+            if s["status"] != "ok":
+                merged["status"] = s["status"]
+    for s in stages.values():
+        s.setdefault("peak_rss_mb", None)
+    metrics.stages = list(stages.values())
+    metrics.info = {"days": len(results), "failed_days": sum(1 for r in results if r["error"]),
+                    "reused_days": sum(1 for r in results if r["reused"])}
+    return metrics
+
+def main():
+    parser = argparse.ArgumentParser(description="按日期区间并行补跑/重跑2~6的数据处理，并按日期顺序合并到总表")
+    parser.add_argument("--start", default=None, help="起始日期（含），默认最早的数据")
+    parser.add_argument("--end", default=None, help="结束日期（含），默认最新的数据")
+    parser.add_argument("--jobs", type=int, default=0, help="并行进程数，<=0使用全部核心")
+    parser.add_argument("--sale-file", default=SALE_FILE, help="总表路径")
+    parser.add_argument("--resume", action="store_true", help="跳过 result/ 下已有当日结果的日期，只合并")
+    parser.add_argument("--metrics-dir", default=METRICS_DIR, help="运行指标输出目录")
+    args = parser.parse_args()
+
+    days = discover_days(args.start, args.end)
+    if not days:
+        print(f"{DATA_DIR}/ 下没有 {args.start or '最早'} ~ {args.end or '最新'} 的数据")
+        return
+    print(f"补跑 {len(days)} 天：{days[0]} ~ {days[-1]}")
+    results = backfill(args.start, args.end, args.jobs, args.sale_file, args.metrics_dir, args.resume)
+    failed = [r for r in results if r["error"]]
+    for r in results:
+        if r["error"]:
+            print(f"  {r['day']}  失败：{r['error']}")
+            print("\n".join("      " + line for line in r["log"].splitlines()[-10:]))
+        elif r["reused"]:
+            print(f"  {r['day']}  沿用已有结果")
+        else:
+            print(f"  {r['day']}  {r['rows']} 行  用时 {r['seconds']:.2f}s")
+    print(f"已合并 {len(results) - len(failed)} 天至 {args.sale_file}" + (f"，失败 {len(failed)} 天" if failed else ""))
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1023 @@
+import argparse
+import copy
+import importlib
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from ast import literal_eval
+
+from stub_server import start_stub_server, synthetic_page
+
+# ================== 工具函数 ==================
+def tree_rss_mb():
+    """当前进程及其子进程（如Chrome）的常驻内存总和，未安装psutil时返回None"""
+    try:
+        import psutil
+    except ImportError:
+        return None
+    proc = psutil.Process()
+    total = 0
+    for p in [proc] + proc.children(recursive=True):
+        try:
+            total += p.memory_info().rss
+        except psutil.Error:
+            pass
+    return total / 2**20
+
+def measure(func, *args, **kwargs):
+    """执行func两次：一次计时，一次用tracemalloc统计Python堆峰值（MB），返回 (结果, 耗时秒, 峰值MB)"""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    try:
+        func(*args, **kwargs)
+        peak = tracemalloc.get_traced_memory()[1] / 2**20
+    finally:
+        tracemalloc.stop()
+    return result, elapsed, peak
+
+def report(title, rows):
+    """打印对齐的结果表"""
+    print(f"\n== {title} ==")
+    if not rows:
+        return
+    keys = list(rows[0].keys())
+    print("  ".join(f"{k:>14}" for k in keys))
+    for row in rows:
+        print("  ".join(f"{v:>14.4g}" if isinstance(v, float) else f"{str(v):>14}" for v in row.values()))
+
+# ================== 基准项目 ==================
+def bench_fetch(args):
+    """
+    对比各抓取后端在本地桩服务器上的单型号延迟、接收数据量与内存
+    selenium-fast 为1.py的快速模式（临时用户目录，屏蔽图片等资源，价格就绪即抓取）
+    """
+    from fetch import HttpBackend
+    crawler = importlib.import_module("1")
+    server, base_url = start_stub_server(args.pages, n_listings=args.listings)
+    profile = tempfile.TemporaryDirectory()
+    factories = {
+        "http": lambda: HttpBackend(cookies_path=crawler.COOKIES_PATH, base_url=base_url),
+        "selenium": lambda: crawler.SeleniumBackend(base_url=base_url, fast=False),
+        "selenium-fast": lambda: crawler.SeleniumBackend(
+            base_url=base_url, fast=True, profile=os.path.join(profile.name, "worker0")),
+    }
+    cpus = crawler.CPUS[:args.models]
+    rows = []
+    try:
+        for name in args.backends.split(","):
+            rss_before = tree_rss_mb()
+            with factories[name]() as backend:
+                latencies = []
+                found = 0
+                page_kb, extract = [], []
+                for cpu in cpus:
+                    start = time.perf_counter()
+                    found += len(backend.fetch(cpu))
+                    latencies.append(time.perf_counter() - start)
+                    if backend.page_stats is not None:
+                        page_kb.append(backend.page_stats["page_kb"])
+                        extract.append(backend.page_stats["extract_seconds"])
+                rss_after = tree_rss_mb()
+            latencies.sort()
+            rows.append({
+                "backend": name,
+                "models": len(cpus),
+                "prices": found,
+                "mean_s": sum(latencies) / len(latencies),
+                "p95_s": latencies[int(0.95 * (len(latencies) - 1))],
+                "kb_per_model": sum(page_kb) / len(page_kb) if page_kb else "n/a",
+                "extract_s": sum(extract) / len(extract) if extract else "n/a",
+                "rss_mb": rss_after if rss_after is not None else "n/a",
+                "rss_delta_mb": rss_after - rss_before if rss_after is not None else "n/a",
+            })
+    finally:
+        server.shutdown()
+        profile.cleanup()
+    report("抓取后端", rows)
+    return rows
+
+def legacy_load_input_csv(inputname):
+    """2.py 原实现（逐格 literal_eval + 逐行补齐 + explode），作为对照基线"""
+    import pandas as pd
+    df = pd.read_csv(inputname)
+    df.columns = [re.sub(r'[^\x00-\x7F]', '', col.strip()) for col in df.columns]
+    cpu_columns = [col for col in df.columns if re.match(r'^i[3579]-\d+[A-Z]*$', col)]
+    for col in cpu_columns:
+        df[col] = df[col].apply(lambda x: literal_eval(x) if pd.notna(x) else [])
+
+    def uniform_length(row):
+        max_len = max(len(row[col]) for col in cpu_columns)
+        return {col: (row[col] + [None]*(max_len - len(row[col])))[:max_len] for col in cpu_columns}
+
+    original_columns = df.drop(columns=cpu_columns).copy()
+    fixed_data = df.apply(uniform_length, axis=1, result_type='expand')
+    df = pd.concat([original_columns.reset_index(drop=True), fixed_data.reset_index(drop=True)], axis=1)
+    df = df.explode(cpu_columns, ignore_index=True)
+    return df.iloc[:, 2:].dropna()
+
+def write_synthetic_input(path, n_rows, n_models, n_prices=30, seed=0):
+    """生成与 {today}_input.csv 同格式的合成数据（n_rows 次抓取 × n_models 个型号）"""
+    import numpy as np
+    import pandas as pd
+    rng = np.random.default_rng(seed)
+    models = [f"i{3 + 2 * (j % 3)}-{1000 + j}K" for j in range(n_models)]
+    data = {"date": ["2025-05-08"] * n_rows, "time": [f"{i % 24:02d}:00:00" for i in range(n_rows)]}
+    for model in models:
+        lengths = rng.integers(n_prices // 2, n_prices * 3 // 2, size=n_rows)
+        data[model] = [str(np.round(rng.lognormal(5, 0.6, size=n), 0).tolist()) for n in lengths]
+    pd.DataFrame(data).to_csv(path, index=False)
+    return models
+
+def bench_ingest(args):
+    """对比2.py新旧解析路径的吞吐与内存（规模为当前日数据的倍数）"""
+    ingest = importlib.import_module("2")
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in map(int, args.scales.split(",")):
+            path = os.path.join(tmp, f"input_{scale}.csv")
+            write_synthetic_input(path, n_rows=scale, n_models=args.models)
+            paths = {"legacy": legacy_load_input_csv, "vectorized": ingest.load_input_csv}
+            for name, func in paths.items():
+                if name == "legacy" and scale > args.legacy_max:
+                    continue
+                df, elapsed, peak = measure(func, path)
+                rows.append({
+                    "path": name,
+                    "scale": scale,
+                    "out_rows": len(df),
+                    "rows_per_s": len(df) / elapsed,
+                    "seconds": elapsed,
+                    "peak_mb": peak,
+                })
+    report("2.py 数据展开", rows)
+    return rows
+
+def synthetic_wide(n_models, n_rows=30, seed=0):
+    """生成与 {today}_output.csv 同格式的宽表（对数正态价格 + 少量异常低价/高价）"""
+    import numpy as np
+    import pandas as pd
+    rng = np.random.default_rng(seed)
+    base = rng.lognormal(5, 1, size=n_models)
+    values = np.round(base * rng.lognormal(0, 0.25, size=(n_rows, n_models)))
+    outliers = rng.random((n_rows, n_models)) < 0.08
+    values[outliers] = np.round(base[np.nonzero(outliers)[1]] * rng.choice([0.05, 4.0], size=outliers.sum()))
+    return pd.DataFrame(values, columns=[f"m{j}" for j in range(n_models)])
+
+def legacy_iqr_column_cleaner(df, multiplier=1.5):
+    """3.py 原实现（逐列 percentile + .loc 回写 + StandardScaler），作为对照基线"""
+    import numpy as np
+    import pandas as pd
+    from sklearn.preprocessing import StandardScaler
+    results = []
+    cleaned_df = df.copy()
+    for col in df.columns:
+        data = df[col].values.reshape(-1, 1)
+        non_nan_mask = ~np.isnan(data).flatten()
+        if np.sum(non_nan_mask) > 0:
+            q1 = np.percentile(data[non_nan_mask], 25)
+            q3 = np.percentile(data[non_nan_mask], 75)
+            lower_bound = q1 - multiplier * (q3 - q1)
+            upper_bound = q3 + multiplier * (q3 - q1)
+            valid_values = data[non_nan_mask]
+            is_outlier = (valid_values < lower_bound) | (valid_values > upper_bound)
+            noise_count = np.sum(is_outlier)
+            cleaned_df.loc[np.where(non_nan_mask)[0][is_outlier.flatten()], col] = np.nan
+        else:
+            lower_bound = upper_bound = np.nan
+            noise_count = 0
+        cleaned_values = cleaned_df[col].dropna().values
+        if len(cleaned_values) > 0:
+            scaled = StandardScaler().fit_transform(cleaned_values.reshape(-1, 1))
+            normality_score = np.mean(np.abs(scaled) < 2)
+        else:
+            normality_score = np.nan
+        results.append({'Column': col, 'Lower_Bound': lower_bound, 'Upper_Bound': upper_bound,
+                        'Mean_Cleaned': cleaned_df[col].mean(), 'Noise_Count': noise_count,
+                        'Normality_Score': normality_score})
+    return pd.DataFrame(results), cleaned_df
+
+def bench_iqr(args):
+    """3.py 矩阵化IQR与逐列实现对比（统计表逐字节比对）"""
+    iqr = importlib.import_module("3")
+    rows = []
+    for n_models in map(int, args.columns.split(",")):
+        df = synthetic_wide(n_models, args.rows)
+        for name, func in (("legacy", legacy_iqr_column_cleaner), ("matrix", iqr.iqr_column_cleaner)):
+            (stats_df, _), elapsed, peak = measure(func, df)
+            if name == "legacy":
+                expected = stats_df.to_csv(index=False)
+            else:
+                assert stats_df.to_csv(index=False) == expected, "统计表不一致"
+            rows.append({"path": name, "columns": n_models, "ms": elapsed * 1000, "peak_mb": peak})
+    report("IQR清洗", rows)
+    return rows
+
+def legacy_daily_price(df_dbscan, df_stats, date_str):
+    """5.py 原实现（逐型号 value_counts + 第二轮最小值），作为对照基线"""
+    import pandas as pd
+    models = df_dbscan.columns.tolist()
+    results = []
+    for model in models:
+        counts = df_dbscan[model].value_counts()
+        filtered_counts = counts[counts >= 5]
+        if not filtered_counts.empty:
+            results.append(int(min(filtered_counts[filtered_counts == filtered_counts.max()].index)))
+        elif model in df_stats.index and df_stats.loc[model]["scaled_var"] < 0.8:
+            results.append(int(round(df_stats.loc[model]["cleaned_mean"])))
+        else:
+            results.append(None)
+    for i in range(len(results)):
+        if results[i] is None:
+            valid_values = pd.to_numeric(df_dbscan[models[i]], errors='coerce').dropna()
+            if not valid_values.empty:
+                results[i] = int(round(valid_values.min()))
+    return pd.DataFrame({"name": models, date_str: results})
+
+def synthetic_day_stats(df, seed=0):
+    """为宽表生成与 {date}_dbscan_stats.csv 同结构的统计表"""
+    import numpy as np
+    import pandas as pd
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "column": df.columns,
+        "cleaned_mean": df.mean().to_numpy(),
+        "scaled_var": rng.uniform(0, 1.2, size=df.shape[1]),
+    }).set_index("column")
+
+def bench_daily(args):
+    """5.py 当日价格：逐日逐型号循环 vs 多日批量聚合（结果逐一比对）"""
+    import numpy as np
+    import pandas as pd
+    od = importlib.import_module("5")
+    rows = []
+    for n_models in map(int, args.columns.split(",")):
+        days = [f"2025-01-{d + 1:02d}" for d in range(args.days)]
+        frames = {day: synthetic_wide(n_models, args.rows, seed=i).round(-1) for i, day in enumerate(days)}
+        stats = {day: synthetic_day_stats(df, seed=i) for i, (day, df) in enumerate(frames.items())}
+
+        start = time.perf_counter()
+        expected = [legacy_daily_price(frames[day], stats[day], day)[day].to_numpy(dtype=float) for day in days]
+        legacy = time.perf_counter() - start
+
+        start = time.perf_counter()
+        long_df = od.stack_days(frames)
+        stats_df = pd.concat([st.rename_axis("model").reset_index().assign(date=day)
+                              for day, st in stats.items()], ignore_index=True)
+        result = od.aggregate_long(long_df, stats_df)
+        batch = time.perf_counter() - start
+        assert np.array_equal(result["price"].to_numpy(), np.concatenate(expected), equal_nan=True), "结果不一致"
+
+        for name, elapsed in (("legacy", legacy), ("batch", batch)):
+            rows.append({"path": name, "models": n_models, "days": args.days,
+                         "seconds": elapsed, "models_per_s": n_models * args.days / elapsed})
+    report("5.py 当日价格", rows)
+    return rows
+
+def bench_columns(args):
+    """4.py 逐列DBSCAN清洗的并行扩展性（结果与串行逐一比对）"""
+    import pandas as pd
+    dbscan = importlib.import_module("4")
+    dbscan.logger.setLevel("WARNING")
+    stages = {
+        "dbscan": lambda df, n: dbscan.dbscan_clean(df, n_jobs=n, param_cache=dbscan.ParamCache()),
+    }
+    rows = []
+    for n_models in map(int, args.columns.split(",")):
+        df = synthetic_wide(n_models, args.rows)
+        for stage, func in stages.items():
+            baseline = None
+            for n_jobs in map(int, args.jobs.split(",")):
+                start = time.perf_counter()
+                out = func(df, n_jobs)
+                elapsed = time.perf_counter() - start
+                if baseline is None:
+                    baseline, serial = out, elapsed
+                else:
+                    for a, b in zip(baseline, out):
+                        pd.testing.assert_frame_equal(a, b)
+                rows.append({
+                    "stage": stage,
+                    "columns": n_models,
+                    "jobs": n_jobs,
+                    "seconds": elapsed,
+                    "speedup": serial / elapsed,
+                })
+    report("逐列DBSCAN并行扩展性", rows)
+    return rows
+
+def steady_days(n_models, n_rows, n_days, churn=0.1, seed=0):
+    """生成连续几天的宽表：每天只有churn比例的挂牌被替换，其余与前一天相同（价格平稳）"""
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    df = synthetic_wide(n_models, n_rows, seed)
+    days = [df]
+    for day in range(1, n_days):
+        fresh = synthetic_wide(n_models, n_rows, seed).sample(frac=1, random_state=seed + day).reset_index(drop=True)
+        replaced = rng.random(df.shape) < churn
+        df = df.mask(replaced, fresh)
+        days.append(df)
+    return days
+
+def bench_params(args):
+    """4.py eps参数缓存：逐日冷启动（每天重新计算）与沿用缓存的CPU时间、命中率及结果差异"""
+    import numpy as np
+    dbscan = importlib.import_module("4")
+    dbscan.logger.setLevel("WARNING")
+    rows = []
+    for n_rows in map(int, args.rows.split(",")):
+        days = steady_days(args.models, n_rows, args.days)
+        cache = dbscan.ParamCache()
+        for day, df in enumerate(days):
+            cold, warm = float("inf"), float("inf")
+            for _ in range(args.repeat):
+                start = time.process_time()
+                cold_df, _ = dbscan.dbscan_clean(df, n_jobs=1, param_cache=dbscan.ParamCache())
+                cold = min(cold, time.process_time() - start)
+                # 每次重复都从前一天的缓存开始
+                trial = copy.deepcopy(cache)
+                start = time.process_time()
+                warm_df, warm_stats = dbscan.dbscan_clean(df, n_jobs=1, param_cache=trial)
+                warm = min(warm, time.process_time() - start)
+            cache = trial
+            metrics = warm_stats.attrs["param_cache"]
+            changed = (cold_df.isna() != warm_df.isna()).any().sum()
+            rows.append({"rows": n_rows, "day": day, "cold_cpu_s": cold, "warm_cpu_s": warm,
+                         "saving": 1 - warm / cold, "hit_ratio": metrics["hit_ratio"],
+                         "labels_changed": f"{changed}/{df.shape[1]}"})
+    report("DBSCAN参数缓存（平稳数据）", rows)
+    return rows
+
+def bench_dbscan1d(args):
+    """4.py 一维快速路径与sklearn路径对比（k-distance + DBSCAN，结果逐一比对）"""
+    import numpy as np
+    dbscan = importlib.import_module("4")
+    rng = np.random.default_rng(0)
+    engine = dbscan.CONFIG["ENGINE"]
+    rows = []
+    try:
+        for exp in range(args.min_exp, args.max_exp + 1):
+            n = 10 ** exp
+            prices = np.round(rng.lognormal(5, 0.4, size=n), 2)
+            data = ((prices - prices.mean()) / prices.std()).reshape(-1, 1)
+            k = dbscan.dynamic_min_samples(n)
+            results = {}
+            for name in ("1d", "sklearn"):
+                if name == "sklearn" and n > args.sklearn_max:
+                    continue
+                dbscan.CONFIG["ENGINE"] = name
+                start = time.perf_counter()
+                k_dist = dbscan.kdistance(data, k)
+                eps = float(np.quantile(k_dist, dbscan.CONFIG["QUANTILE_THRESHOLD"]))
+                labels = dbscan.cluster(data, eps, k)
+                elapsed = time.perf_counter() - start
+                results[name] = (k_dist, labels)
+                rows.append({"engine": name, "n": n, "seconds": elapsed, "samples_per_s": n / elapsed})
+            if len(results) == 2:
+                assert np.array_equal(results["1d"][0], results["sklearn"][0]), "k-distance 不一致"
+                assert np.array_equal(results["1d"][1], results["sklearn"][1]), "DBSCAN 标签不一致"
+    finally:
+        dbscan.CONFIG["ENGINE"] = engine
+    report("一维DBSCAN", rows)
+    return rows
+
+def legacy_merge_column(new_column, output_file):
+    """6.py 原实现（读入整个总表、按行号追加一列后整体重写），作为对照基线"""
+    import csv
+    existing_data = []
+    try:
+        with open(output_file, 'r', newline='') as f_out:
+            existing_data = list(csv.reader(f_out))
+    except FileNotFoundError:
+        pass
+    max_rows = max(len(existing_data), len(new_column))
+    merged_data = []
+    for i in range(max_rows):
+        row = existing_data[i].copy() if i < len(existing_data) else []
+        row.append(new_column[i] if i < len(new_column) else '')
+        merged_data.append(row)
+    with open(output_file, 'w', newline='') as f_out:
+        csv.writer(f_out).writerows(merged_data)
+
+def bench_history(args):
+    """6.py 追加一天：整表重写 vs 历史库按 (型号, 日期) 写入"""
+    import numpy as np
+    import pandas as pd
+    from history import HistoryStore, export_sale_csv, history_path
+    bond = importlib.import_module("6")
+    rows = []
+    models = [f"m{j}" for j in range(args.models)]
+    rng = np.random.default_rng(0)
+    for n_days in map(int, args.days.split(",")):
+        days = [f"d{i:05d}" for i in range(n_days + 1)]
+        wide = pd.DataFrame(rng.integers(1, 1000, size=(args.models, n_days)), columns=days[:-1])
+        wide.insert(0, "name", models)
+        today = pd.DataFrame({"name": models, days[-1]: rng.integers(1, 1000, size=args.models)})
+        today = today.sample(frac=1, random_state=0)     # 当日型号顺序与总表不同
+        with tempfile.TemporaryDirectory() as tmp:
+            legacy_file = os.path.join(tmp, "legacy.csv")
+            wide.to_csv(legacy_file, index=False)
+            sale_file = os.path.join(tmp, "cpu_sale.csv")
+            with HistoryStore(history_path(sale_file)) as store:
+                start = time.perf_counter()
+                store.import_wide(wide)
+                imported = time.perf_counter() - start
+                store.export_csv(sale_file)
+
+            start = time.perf_counter()
+            legacy_merge_column([days[-1]] + today.sort_index()[days[-1]].astype(str).tolist(), legacy_file)
+            legacy = time.perf_counter() - start
+
+            start = time.perf_counter()
+            bond.append_frame(today, sale_file)
+            append = time.perf_counter() - start
+
+            start = time.perf_counter()
+            export_sale_csv(sale_file)
+            export = time.perf_counter() - start
+            assert pd.read_csv(sale_file).equals(pd.read_csv(legacy_file)), "结果不一致"
+        for name, elapsed in (("legacy_rewrite", legacy), ("append_frame", append),
+                              ("store_import", imported), ("store_export", export)):
+            rows.append({"path": name, "models": args.models, "days": n_days, "seconds": elapsed})
+    report("6.py 追加一天", rows)
+    return rows
+
+def bench_query(args):
+    """query.py 历史价格查询延迟（总表CSV全表扫描作为对照）"""
+    import numpy as np
+    import pandas as pd
+    from history import HistoryStore
+    from query import PriceHistory, cache_dir, refresh_cache
+    bond = importlib.import_module("6")
+    rows = []
+    models = [f"m{j}" for j in range(args.models)]
+    rng = np.random.default_rng(0)
+
+    def latency(func):
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            func()
+        return (time.perf_counter() - start) / args.repeat
+
+    for years in map(int, args.years.split(",")):
+        # 前半段使用 2025/5/6 格式的列名，与现有总表一致
+        days = pd.date_range("2015-01-01", periods=365 * years, freq="D")
+        names = [f"{d.year}/{d.month}/{d.day}" if i < len(days) // 2 else d.strftime("%Y-%m-%d")
+                 for i, d in enumerate(days)]
+        values = np.round(rng.lognormal(5, 1, size=(args.models, 1)) * rng.lognormal(0, 0.1, size=(args.models, len(days))))
+        values[rng.random(values.shape) < 0.05] = np.nan
+        wide = pd.DataFrame(values, columns=names)
+        wide.insert(0, "name", models)
+        with tempfile.TemporaryDirectory() as tmp:
+            sale_file = os.path.join(tmp, "cpu_sale.csv")
+            db_path = os.path.join(tmp, "cpu_sale.db")
+            with HistoryStore(db_path) as store:
+                store.import_wide(wide)
+                store.export_csv(sale_file)
+
+            start = time.perf_counter()
+            refresh_cache(db_path)
+            build = time.perf_counter() - start
+            next_day = (days[-1] + pd.Timedelta(days=1)).strftime("%Y-%m-%d")
+            bond.append_frame(pd.DataFrame({"name": models, next_day: values[:, -1]}), sale_file)
+            start = time.perf_counter()
+            refresh_cache(db_path)
+            incremental = time.perf_counter() - start
+            start = time.perf_counter()
+            history = PriceHistory(db_path)
+            opened = time.perf_counter() - start
+
+            # 增量更新的缓存与整体重建一致
+            rebuilt = os.path.join(tmp, "rebuilt")
+            refresh_cache(db_path, rebuilt)
+            assert np.array_equal(np.load(os.path.join(cache_dir(db_path), "prices.npy")),
+                                  np.load(os.path.join(rebuilt, "prices.npy")), equal_nan=True), "缓存不一致"
+
+            picks = rng.choice(models, size=args.repeat)
+            it = iter(np.tile(picks, 8))
+            model = models[len(models) // 2]
+            expected = wide.set_index("name").loc[model].to_numpy()[-90:]
+            assert np.array_equal(history.trend(model, 90, days[-1].strftime("%Y-%m-%d")).to_numpy(),
+                                  expected[~np.isnan(expected)]), "查询结果不一致"
+            results = {
+                "open": opened,
+                "build_cache": build,
+                "refresh_1day": incremental,
+                "trend_90d": latency(lambda: history.trend(next(it), 90)),
+                "latest": latency(lambda: history.latest(next(it))),
+                "latest_all": latency(lambda: history.latest_prices()),
+                "slice_20x365": latency(lambda: history.slice(picks[:20], days[-365].strftime("%Y-%m-%d"))),
+                "legacy_csv_trend": latency(lambda: pd.read_csv(sale_file).set_index("name").loc[model].iloc[-90:])
+                if args.legacy else float("nan"),
+            }
+        for name, elapsed in results.items():
+            rows.append({"query": name, "years": years, "models": args.models, "ms": elapsed * 1000})
+    report("query.py 历史价格查询", rows)
+    return rows
+
+def bench_stream(args):
+    """stream_clean.py 在线清洗：与批处理 3~5.py 当日价格的一致性，以及逐样本耗时与每型号内存"""
+    import numpy as np
+    import pandas as pd
+    import stream_clean
+    ingest = importlib.import_module("2")
+    rows = []
+    # 录制数据：以前一天的IQR边界为初始值，结果与 result/{day}_od.csv 对比
+    for day in args.days.split(","):
+        wide = ingest.load_day(day, "data")
+        cleaner = stream_clean.StreamCleaner.for_day(day, "ana")
+        start = time.perf_counter()
+        for model in wide.columns:
+            cleaner.update(model, wide[model].dropna().tolist())
+        cleaner.finish()
+        elapsed = time.perf_counter() - start
+        stream = cleaner.daily_prices(wide.columns).to_numpy()
+        batch = pd.read_csv(os.path.join("result", f"{day}_od.csv"))[day].to_numpy(dtype=float)
+        both = ~np.isnan(stream) & ~np.isnan(batch)
+        rel = np.abs(stream[both] - batch[both]) / np.maximum(batch[both], 1)
+        rows.append({"data": day, "models": len(stream), "samples": int(wide.notna().sum().sum()),
+                     "us_per_sample": elapsed / max(1, wide.notna().sum().sum()) * 1e6,
+                     "exact": float(np.mean(stream[both] == batch[both])), "within_10pct": float(np.mean(rel <= 0.1)),
+                     "dropped": cleaner.summary()["dropped"], "state_kb": float("nan")})
+    # 合成数据：单个型号的状态大小不随样本数增长
+    for n_samples in map(int, args.samples.split(",")):
+        df = synthetic_wide(1, n_samples, seed=n_samples)
+        cleaner = stream_clean.StreamCleaner()
+        tracemalloc.start()
+        start = time.perf_counter()
+        cleaner.update("m0", df["m0"].tolist())
+        cleaner.finish()
+        elapsed = time.perf_counter() - start
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        rows.append({"data": "synthetic", "models": 1, "samples": n_samples,
+                     "us_per_sample": elapsed / n_samples * 1e6, "exact": float("nan"), "within_10pct": float("nan"),
+                     "dropped": cleaner.summary()["dropped"], "state_kb": current / 1024})
+    report("stream_clean.py 在线清洗", rows)
+    return rows
+
+def bench_samples(args):
+    """2.py→3.py→7.py：宽表DataFrame（7.py经字符串转换）与 DaySamples 紧凑存储的耗时与内存峰值"""
+    import numpy as np
+    import synthetic
+    ingest, iqr, check = (importlib.import_module(name) for name in ("2", "3", "7"))
+    paths = {
+        "frame": (ingest.load_input_csv, lambda df: iqr.iqr_column_cleaner(df),
+                  lambda df: check.check_output(df.astype(str))),
+        "samples": (ingest.load_input_samples, lambda s: iqr.iqr_column_cleaner(s),
+                    lambda s: check.check_samples(s)),
+    }
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_samples in map(int, args.samples.split(",")):
+            day = synthetic.day_names(1)[0]
+            df = synthetic.market(args.models, n_samples, 1)[day]
+            input_file = os.path.join(tmp, f"{n_samples}_input.csv")
+            synthetic.write_input_csv(input_file, df, day)
+            outputs = {}
+            for name, (load, clean, verify) in paths.items():
+                timings = {}
+                tracemalloc.start()
+                start = time.perf_counter()
+                data = load(input_file)
+                timings["load"] = time.perf_counter() - start
+                held = tracemalloc.get_traced_memory()[0] / 2**20
+                start = time.perf_counter()
+                _, cleaned = clean(data)
+                timings["iqr"] = time.perf_counter() - start
+                start = time.perf_counter()
+                checked = verify(data)
+                timings["check"] = time.perf_counter() - start
+                peak = tracemalloc.get_traced_memory()[1] / 2**20
+                tracemalloc.stop()
+                outputs[name] = (cleaned, checked)
+                rows.append({"path": name, "models": args.models, "samples": n_samples, **timings,
+                             "held_mb": held, "peak_mb": peak})
+            for a, b in zip(outputs["frame"], outputs["samples"]):
+                assert a.shape == b.shape and np.array_equal(a.to_numpy(dtype=str), b.to_numpy(dtype=str)), "结果不一致"
+    report("DaySamples 紧凑存储（load=2.py，iqr=3.py，check=7.py）", rows)
+    return rows
+
+def bench_snapshots(args):
+    """snapshot.py：快照库压缩率与离线重新解析的并行扩展性（合成搜索页，每个型号每天一页）"""
+    import synthetic
+    from snapshot import SnapshotStore, reparse_day
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_models in map(int, args.models.split(",")):
+            store = SnapshotStore(os.path.join(tmp, str(n_models)))
+            day = synthetic.day_names(1)[0]
+            on_page = store.recorder(day, "10:00:00")
+            raw = 0
+            for model in synthetic.model_names(n_models):
+                html = synthetic_page(model, args.listings)
+                raw += len(html.encode("utf-8"))
+                on_page(model, html, f"/search?q={model}")
+            stored = sum(os.path.getsize(os.path.join(d, f))
+                         for d, _, files in os.walk(os.path.join(store.root, "objects")) for f in files)
+            for n_jobs in map(int, args.jobs.split(",")):
+                start = time.perf_counter()
+                df, stats = reparse_day(day, store.root, n_jobs)
+                rows.append({"models": n_models, "jobs": n_jobs, "prices": stats["prices"],
+                             "seconds": time.perf_counter() - start,
+                             "raw_mb": raw / 2**20, "stored_mb": stored / 2**20})
+    report("快照离线重新解析", rows)
+    return rows
+
+def bench_backfill(args):
+    """backfill.py：按日期区间补跑（每天2~5）的并行扩展性，各并行度的总表与串行逐字节比对"""
+    import synthetic
+    from backfill import backfill
+    importlib.import_module("4").logger.setLevel("WARNING")
+    rows, cwd = [], os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        frames = synthetic.market(args.models, args.samples, args.days, ragged=False)
+        for day, df in frames.items():
+            synthetic.write_input_csv(os.path.join(tmp, "data", f"{day}_input.csv"), df, day)
+        baseline = None
+        try:
+            os.chdir(tmp)
+            for n_jobs in map(int, args.jobs.split(",")):
+                sale_file = f"sale_{n_jobs}.csv"
+                start = time.perf_counter()
+                results = backfill(n_jobs=n_jobs, sale_file=sale_file, metrics_dir=None)
+                seconds = time.perf_counter() - start
+                with open(sale_file, 'rb') as f:
+                    table = f.read()
+                baseline = table if baseline is None else baseline
+                rows.append({"days": len(results), "models": args.models, "jobs": n_jobs, "seconds": seconds,
+                             "days_per_s": len(results) / seconds, "same": table == baseline})
+        finally:
+            os.chdir(cwd)
+    report("按日期区间补跑", rows)
+    return rows
+
+def bench_rolling(args):
+    """rolling.py：追加一天时增量更新滚动统计 vs 在整个宽表上用pandas重新计算（结果逐一比对）"""
+    import numpy as np
+    import pandas as pd
+    from rolling import WINDOWS, RollingStats
+    rows = []
+    for n_days in map(int, args.days.split(",")):
+        rng = np.random.default_rng(0)
+        dates = pd.date_range("2015-01-01", periods=n_days)
+        values = rng.lognormal(5, 1, size=(n_days, args.models)).round()
+        values[rng.random(values.shape) < args.missing] = np.nan     # 5.py 输出的空价格
+        wide = pd.DataFrame(values, index=dates, columns=[f"m{j}" for j in range(args.models)])
+        rolling = RollingStats(wide.columns, WINDOWS)
+        for day, prices in wide.iloc[:-1].iterrows():
+            rolling.append(day.strftime("%Y-%m-%d"), prices)
+        last_day, last = wide.index[-1].strftime("%Y-%m-%d"), wide.iloc[-1]
+
+        start = time.perf_counter()
+        rolling.append(last_day, last)
+        incremental = time.perf_counter() - start
+        start = time.perf_counter()
+        expected = {f"ma{w}": wide.rolling(w, min_periods=1).mean().iloc[-1].to_numpy() for w in WINDOWS}
+        expected.update({f"std{w}": wide.rolling(w, min_periods=2).std().iloc[-1].to_numpy() for w in WINDOWS})
+        full = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            rolling.stat("ma7")
+        query = (time.perf_counter() - start) / args.repeat
+        error = max(np.nanmax(np.abs(rolling.stat(k) - v) / np.abs(v)) for k, v in expected.items())
+        rows.append({"days": n_days, "models": args.models, "update_ms": incremental * 1e3,
+                     "pandas_ms": full * 1e3, "query_us": query * 1e6, "max_rel_err": error})
+    report("滚动统计：增量更新与整表重算", rows)
+    return rows
+
+# ================== 启动耗时 ==================
+STARTUP_STAGES = ("2", "3", "4", "5")
+
+# 在全新的解释器中导入一个阶段并处理一次输入；eager模式下3.py、4.py先导入sklearn，模拟改为按需导入之前的行为
+STARTUP_CHILD = """
+import time
+start = time.perf_counter()
+import importlib, json, os, sys
+code_dir, stage, mode, tmp, day = sys.argv[1:6]
+sys.path.insert(0, code_dir)
+if mode == "eager" and stage in ("3", "4"):
+    import sklearn.cluster, sklearn.neighbors, sklearn.preprocessing
+module = importlib.import_module(stage)
+imported = time.perf_counter()
+import pandas as pd
+if stage == "2":
+    module.load_input_csv(os.path.join(tmp, "input.csv"))
+elif stage == "3":
+    module.iqr_column_cleaner(pd.read_csv(os.path.join(tmp, "output.csv")))
+elif stage == "4":
+    module.logger.setLevel("WARNING")
+    module.dbscan_clean(pd.read_csv(os.path.join(tmp, "iqr.csv")), n_jobs=1)
+elif stage == "5":
+    module.daily_price(pd.read_csv(os.path.join(tmp, "dbscan.csv")),
+                       pd.read_csv(os.path.join(tmp, "dbscan_stats.csv"), index_col=0), day)
+done = time.perf_counter()
+print(json.dumps({"import": imported - start, "first": done - imported,
+                  "sklearn": "sklearn" in sys.modules, "modules": len(sys.modules)}))
+"""
+
+def run_fresh(args, cwd):
+    """在新的Python进程中执行，返回 (墙钟秒, 标准输出)"""
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, *args], cwd=cwd, capture_output=True, text=True, check=True).stdout
+    return time.perf_counter() - start, out
+
+def bench_startup(args):
+    """
+    各阶段的启动耗时：新进程中 解释器启动 + 导入阶段模块 + 处理一次当天数据（time-to-first-result）
+    数据规模与每天的实际数据相当，此时导入开销往往大于计算本身
+    """
+    import synthetic
+    code_dir = os.path.dirname(os.path.abspath(__file__))
+    ingest, iqr, dbscan = (importlib.import_module(name) for name in ("2", "3", "4"))
+    dbscan.logger.setLevel("WARNING")
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        day = synthetic.day_names(1)[0]
+        df = synthetic.market(args.models, args.samples, 1)[day]
+        synthetic.write_input_csv(os.path.join(tmp, "input.csv"), df, day)
+        output_df = ingest.load_input_csv(os.path.join(tmp, "input.csv"))
+        output_df.to_csv(os.path.join(tmp, "output.csv"), index=False)
+        _, iqr_df = iqr.iqr_column_cleaner(output_df)
+        iqr_df.to_csv(os.path.join(tmp, "iqr.csv"), index=False)
+        dbscan_df, dbscan_stats = dbscan.dbscan_clean(iqr_df, n_jobs=1)
+        dbscan_df.to_csv(os.path.join(tmp, "dbscan.csv"), index=False)
+        dbscan_stats.to_csv(os.path.join(tmp, "dbscan_stats.csv"))
+
+        interpreter = min(run_fresh(["-c", "pass"], tmp)[0] for _ in range(args.repeat))
+        for stage in args.stages.split(","):
+            for mode in args.modes.split(","):
+                runs = []
+                for _ in range(args.repeat):
+                    wall, out = run_fresh(["-c", STARTUP_CHILD, code_dir, stage, mode, tmp, day], tmp)
+                    runs.append((wall, json.loads(out)))
+                wall, result = min(runs, key=lambda r: r[0])
+                rows.append({"stage": stage, "mode": mode, "python": interpreter, "import": result["import"],
+                             "first": result["first"], "total": wall, "sklearn": "是" if result["sklearn"] else "否",
+                             "modules": result["modules"]})
+    report(f"启动耗时（{args.models} 个型号 × {args.samples} 条，取{args.repeat}次最短）", rows)
+    return rows
+
+# ================== 回归基准 ==================
+RESULTS_FILE = os.path.join("bench", "results.jsonl")
+SUITE_STAGES = ("ingest", "iqr", "dbscan", "daily", "append")
+
+def git_revision():
+    """当前提交的短哈希与工作区是否有未提交的修改，不在git仓库中时为 (None, None)"""
+    import subprocess
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                                capture_output=True, text=True, check=True).stdout.strip()
+        status = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no", "--", "."],
+                                capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return commit, bool(status.strip())
+
+def environment():
+    """记录在结果中的运行环境，只比较同一台机器上的结果"""
+    import platform
+    import numpy as np
+    import pandas as pd
+    return {"host": platform.node(), "machine": platform.machine(), "cpus": os.cpu_count(),
+            "python": platform.python_version(), "numpy": np.__version__, "pandas": pd.__version__}
+
+def run_suite_once(frames, stages, tmp):
+    """
+    在合成数据上依次执行各阶段（与pipeline.py相同的调用），返回 {阶段: (墙钟秒, CPU秒)}
+    ingest: 2.py 解析 input.csv；iqr: 3.py；dbscan: 4.py 逐列清洗（串行、无参数缓存）；
+    daily: 5.py 当日价格；append: 6.py 追加到总表与历史库
+    """
+    import pandas as pd
+    import synthetic
+    modules = {name: importlib.import_module(name) for name in ("2", "3", "4", "5", "6")}
+    modules["4"].logger.setLevel("WARNING")
+    timings = {stage: [0.0, 0.0] for stage in stages}
+
+    def timed(stage, func, *args, **kwargs):
+        if stage not in timings:
+            return func(*args, **kwargs)
+        wall, cpu = time.perf_counter(), time.process_time()
+        result = func(*args, **kwargs)
+        timings[stage][0] += time.perf_counter() - wall
+        timings[stage][1] += time.process_time() - cpu
+        return result
+
+    sale_file = os.path.join(tmp, "cpu_sale.csv")
+    for day, df in frames.items():
+        input_file = os.path.join(tmp, f"{day}_input.csv")
+        synthetic.write_input_csv(input_file, df, day)
+        output_df = timed("ingest", modules["2"].load_input_csv, input_file)
+        _, iqr_df = timed("iqr", modules["3"].iqr_column_cleaner, output_df, multiplier=1.5)
+        dbscan_df, dbscan_stats = timed("dbscan", modules["4"].dbscan_clean, iqr_df, n_jobs=1,
+                                        param_cache=modules["4"].ParamCache())
+        od_df = timed("daily", modules["5"].daily_price, dbscan_df, dbscan_stats, day)
+        timed("append", modules["6"].append_frame, pd.DataFrame(od_df), sale_file)
+    return {stage: tuple(t) for stage, t in timings.items()}
+
+def parse_scale(text):
+    """型号数x每天样本数x天数，如 67x30x7"""
+    n_models, n_samples, n_days = map(int, text.lower().split("x"))
+    return n_models, n_samples, n_days
+
+def load_results(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def baseline_results(history, current, commit=None):
+    """
+    每个 (规模, 阶段) 的对照结果：同一台机器上最近一次其它运行（指定commit时为该提交的最近一次）
+    :return: {(规模, 阶段): 记录}
+    """
+    baseline = {}
+    for rec in history:
+        if rec["env"]["host"] != current["env"]["host"] or rec["run"] == current["run"]:
+            continue
+        if commit is not None and not str(rec["commit"]).startswith(commit):
+            continue
+        if commit is None and rec["commit"] == current["commit"] and rec["dirty"] == current["dirty"]:
+            continue
+        baseline[(rec["scale"], rec["stage"])] = rec
+    return baseline
+
+def bench_suite(args):
+    """
+    各阶段在多个规模的合成数据上的耗时，追加记录到 bench/results.jsonl（含git提交），
+    并与同一台机器上前一次（或 --baseline 指定提交的）结果对比
+    """
+    import datetime
+    import synthetic
+    stages = args.stages.split(",")
+    unknown = set(stages) - set(SUITE_STAGES)
+    if unknown:
+        raise SystemExit(f"未知阶段: {','.join(sorted(unknown))}，可选 {','.join(SUITE_STAGES)}")
+    commit, dirty = git_revision()
+    env = environment()
+    run_id = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    records = []
+    for scale in args.scales.split(","):
+        n_models, n_samples, n_days = parse_scale(scale)
+        frames = synthetic.market(n_models, n_samples, n_days, seed=args.seed)
+        best = {}
+        for _ in range(args.repeat):
+            with tempfile.TemporaryDirectory() as tmp:
+                for stage, (wall, cpu) in run_suite_once(frames, stages, tmp).items():
+                    if stage not in best or wall < best[stage][0]:
+                        best[stage] = (wall, cpu)
+        for stage in stages:
+            wall, cpu = best[stage]
+            records.append({"run": run_id, "commit": commit, "dirty": dirty, "env": env, "scale": scale,
+                            "models": n_models, "samples": n_samples, "days": n_days, "seed": args.seed,
+                            "repeat": args.repeat, "stage": stage, "seconds": wall, "cpu_seconds": cpu,
+                            "samples_per_s": n_models * n_samples * n_days / wall if wall else None})
+
+    history = load_results(args.results)
+    baseline = baseline_results(history, records[0], args.baseline) if records else {}
+    rows, regressions = [], []
+    for rec in records:
+        base = baseline.get((rec["scale"], rec["stage"]))
+        change = rec["seconds"] / base["seconds"] - 1 if base else float("nan")
+        if base and change > args.threshold:
+            regressions.append(rec)
+        rows.append({"scale": rec["scale"], "stage": rec["stage"], "seconds": rec["seconds"],
+                     "cpu_seconds": rec["cpu_seconds"], "baseline": base["commit"] if base else "-",
+                     "change": change, "flag": "回归" if base and change > args.threshold else ""})
+    report(f"回归基准（{commit or '无git'}{'+修改' if dirty else ''}）", rows)
+
+    if args.record:
+        os.makedirs(os.path.dirname(args.results) or ".", exist_ok=True)
+        with open(args.results, "a", encoding="utf-8") as f:
+            for rec in records:
+                f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        print(f"结果已追加到 {args.results}")
+    if regressions:
+        print(f"{len(regressions)} 项比对照慢 {args.threshold:.0%} 以上")
+        if args.fail_on_regression:
+            raise SystemExit(1)
+    return records
+
+BENCHMARKS = {
+    "fetch": bench_fetch,
+    "ingest": bench_ingest,
+    "iqr": bench_iqr,
+    "daily": bench_daily,
+    "columns": bench_columns,
+    "dbscan1d": bench_dbscan1d,
+    "params": bench_params,
+    "history": bench_history,
+    "query": bench_query,
+    "stream": bench_stream,
+    "samples": bench_samples,
+    "snapshots": bench_snapshots,
+    "backfill": bench_backfill,
+    "rolling": bench_rolling,
+    "startup": bench_startup,
+    "suite": bench_suite,
+}
+
+def main():
+    parser = argparse.ArgumentParser(description="cpu-get 性能基准测试")
+    sub = parser.add_subparsers(dest="bench", required=True)
+
+    p = sub.add_parser("fetch", help="抓取后端延迟与内存对比")
+    p.add_argument("--models", type=int, default=5, help="测试型号数量")
+    p.add_argument("--backends", default="http,selenium,selenium-fast", help="逗号分隔的后端列表")
+    p.add_argument("--pages", default=None, help="录制页目录（{型号}.html），缺省使用合成页")
+    p.add_argument("--listings", type=int, default=60, help="合成页每页的商品数（测试提取耗时与商品数的关系）")
+
+    p = sub.add_parser("ingest", help="2.py 新旧解析路径吞吐对比")
+    p.add_argument("--scales", default="10,100,1000", help="抓取次数倍数（当前每天约1次）")
+    p.add_argument("--models", type=int, default=67, help="型号数量")
+    p.add_argument("--legacy-max", type=int, default=1000, help="旧路径最大测试规模")
+
+    p = sub.add_parser("iqr", help="3.py 矩阵化IQR与逐列实现对比")
+    p.add_argument("--columns", default="67,500,5000", help="型号列数")
+    p.add_argument("--rows", type=int, default=30, help="每列样本数")
+
+    p = sub.add_parser("daily", help="5.py 逐型号循环与批量聚合对比")
+    p.add_argument("--columns", default="67,1000,5000", help="型号数")
+    p.add_argument("--days", type=int, default=10, help="天数")
+    p.add_argument("--rows", type=int, default=30, help="每个型号每天的样本数")
+
+    p = sub.add_parser("columns", help="4.py 逐列DBSCAN并行扩展性")
+    p.add_argument("--columns", default="67,500,5000", help="型号列数")
+    p.add_argument("--rows", type=int, default=30, help="每列样本数")
+    p.add_argument("--jobs", default=f"1,2,4,{os.cpu_count()}", help="并行进程数（第一个作为串行基线）")
+
+    p = sub.add_parser("dbscan1d", help="4.py 一维快速路径与sklearn对比")
+    p.add_argument("--min-exp", type=int, default=2, help="最小规模 10^min_exp")
+    p.add_argument("--max-exp", type=int, default=7, help="最大规模 10^max_exp")
+    p.add_argument("--sklearn-max", type=int, default=10**5, help="sklearn路径的最大规模（邻域表为O(n^2)内存）")
+
+    p = sub.add_parser("params", help="4.py eps参数缓存冷启动与命中对比")
+    p.add_argument("--models", type=int, default=1000, help="型号数量")
+    p.add_argument("--rows", default="30,300", help="每列样本数")
+    p.add_argument("--days", type=int, default=5, help="连续天数")
+    p.add_argument("--repeat", type=int, default=3, help="每天重复次数（取最短）")
+
+    p = sub.add_parser("history", help="6.py 整表重写与历史库追加对比")
+    p.add_argument("--days", default="30,365,3650", help="已有天数")
+    p.add_argument("--models", type=int, default=67, help="型号数量")
+
+    p = sub.add_parser("query", help="query.py 历史价格查询延迟")
+    p.add_argument("--years", default="1,10", help="历史年数")
+    p.add_argument("--models", type=int, default=1000, help="型号数量")
+    p.add_argument("--repeat", type=int, default=200, help="每种查询的重复次数")
+    p.add_argument("--no-legacy", dest="legacy", action="store_false", help="跳过总表CSV全表扫描对照")
+
+    p = sub.add_parser("stream", help="stream_clean.py 在线清洗与批处理对比")
+    p.add_argument("--days", default="2025-05-06,2025-05-07,2025-05-08", help="录制数据的日期（优先以前一天的IQR统计为初始边界）")
+    p.add_argument("--samples", default="100,10000,1000000", help="合成数据单个型号的样本数")
+
+    p = sub.add_parser("samples", help="DaySamples 紧凑存储与宽表DataFrame的耗时与内存对比")
+    p.add_argument("--models", type=int, default=67, help="型号数量")
+    p.add_argument("--samples", default="300,3000,30000", help="每个型号的样本数")
+
+    p = sub.add_parser("snapshots", help="快照库压缩率与离线重新解析的并行扩展性")
+    p.add_argument("--models", default="67,1000", help="型号数量（每个型号一页）")
+    p.add_argument("--listings", type=int, default=60, help="每页商品数")
+    p.add_argument("--jobs", default=f"1,{os.cpu_count()}", help="并行进程数")
+
+    p = sub.add_parser("backfill", help="按日期区间并行补跑的扩展性")
+    p.add_argument("--days", type=int, default=30, help="天数")
+    p.add_argument("--models", type=int, default=67, help="型号数量")
+    p.add_argument("--samples", type=int, default=30, help="每个型号每天的样本数")
+    p.add_argument("--jobs", default=f"1,{os.cpu_count()}", help="并行进程数（第一个作为串行基线）")
+
+    p = sub.add_parser("rolling", help="滚动统计增量更新与整表重算对比")
+    p.add_argument("--days", default="365,3650", help="历史天数")
+    p.add_argument("--models", type=int, default=1000, help="型号数量")
+    p.add_argument("--missing", type=float, default=0.1, help="空价格比例")
+    p.add_argument("--repeat", type=int, default=10000, help="查询重复次数")
+
+    p = sub.add_parser("startup", help="各阶段新进程启动到得到第一个结果的耗时")
+    p.add_argument("--stages", default=",".join(STARTUP_STAGES), help="要测试的阶段")
+    p.add_argument("--modes", default="lazy,eager", help="lazy: 按需导入；eager: 3.py、4.py先导入sklearn（旧行为）")
+    p.add_argument("--models", type=int, default=67, help="型号数量")
+    p.add_argument("--samples", type=int, default=30, help="每个型号的样本数")
+    p.add_argument("--repeat", type=int, default=5, help="重复次数（取最短）")
+
+    p = sub.add_parser("suite", help="各阶段在合成数据上的回归基准（结果记录到 bench/results.jsonl）")
+    p.add_argument("--scales", default="67x30x7,500x100x7,2000x300x3", help="型号数x每天样本数x天数，逗号分隔")
+    p.add_argument("--stages", default=",".join(SUITE_STAGES), help="要计时的阶段")
+    p.add_argument("--repeat", type=int, default=3, help="每个规模重复次数（取最短）")
+    p.add_argument("--seed", type=int, default=0, help="合成数据的随机种子")
+    p.add_argument("--results", default=RESULTS_FILE, help="结果文件（JSON Lines，追加写入）")
+    p.add_argument("--baseline", default=None, help="对照的提交（哈希前缀），缺省为前一次运行")
+    p.add_argument("--threshold", type=float, default=0.2, help="比对照慢多少视为回归")
+    p.add_argument("--no-record", dest="record", action="store_false", help="只对比，不追加结果")
+    p.add_argument("--fail-on-regression", action="store_true", help="有回归时以状态码1退出")
+
+    args = parser.parse_args()
+    BENCHMARKS[args.bench](args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import hashlib
+
+import numpy as np
+
+# ================== 商品标识 ==================
+def listing_key(listing):
+    """
+    商品ID的64位哈希；没有ID时返回0（不参与去重：标题与价格相同的也可能是不同卖家的挂牌，
+    合并后会减少5.py众数规则所依赖的计数）
+    :param listing: {"id": 商品ID, "title": 标题, "price": 价格文本}
+    """
+    if not listing.get("id"):
+        return 0
+    text = f"id:{listing['id']}"
+    key = int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+    return key or 1
+
+# ================== 抓取时去重 ==================
+class ListingDeduper:
+    """
+    抓取时的商品去重：一次抓取（会话）中，同一型号的每个商品只保留第一次出现
+    重复来源：同一页面重复渲染、滚动加载、重试
+    只在型号内去重：相邻型号的搜索结果互相重叠（如i5-8400T的结果里有i5-8400的商品）时各自保留，
+    否则后抓的型号可能被去空，读入时该批次整行被截断；每个型号只由一个线程抓取，多线程时结果也确定
+    """
+    def __init__(self):
+        self.seen = {}          # {型号: 已出现的商品标识}
+        self.duplicates = {}    # {型号: 去掉的重复商品数}
+
+    def filter(self, model, listings):
+        """
+        去掉该型号已出现过的商品，保留的商品写入标识 key
+        :return: 保留的商品列表
+        """
+        seen = self.seen.setdefault(model, set())
+        kept, dropped = [], 0
+        for listing in listings:
+            key = listing_key(listing)
+            if key and key in seen:
+                dropped += 1
+                continue
+            if key:
+                seen.add(key)
+            kept.append(dict(listing, key=key))
+        self.duplicates[model] = self.duplicates.get(model, 0) + dropped
+        return kept
+
+    def summary(self):
+        return {"listings": sum(len(keys) for keys in self.seen.values()),
+                "duplicates": sum(self.duplicates.values())}
+
+# ================== 读入时去重 ==================
+def duplicate_mask(keys, groups=None):
+    """
+    重复样本的掩码：标识非0且同一组内前面已出现过的样本为True（每组每个商品保留第一次出现）
+    :param keys: 每条样本的商品标识（uint64，0为未知）
+    :param groups: 每条样本的组号（如 抓取批次×型号），None则全部为一组
+    """
+    keys = np.asarray(keys, dtype=np.uint64)
+    if groups is None:
+        _, first = np.unique(keys, return_index=True)
+    else:
+        pairs = np.stack([np.asarray(groups, dtype=np.uint64), keys], axis=1)
+        _, first = np.unique(pairs, axis=0, return_index=True)
+    mask = keys != 0
+    mask[first] = False
+    return mask
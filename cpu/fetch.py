@@ -0,0 +1,229 @@
+import json
+import os
+import re
+from html.parser import HTMLParser
+
+import requests
+from requests.adapters import HTTPAdapter
+from fake_useragent import UserAgent
+
+# ================== 配置区 ==================
+BASE_URL = "https://www.goofish.com"
+PRICE_CLASS_PREFIX = "number--"                 # 与1.py中PRICE_CSS_SELECTOR保持一致
+TITLE_CLASS_PREFIX = "main-title--"             # 与1.py中TITLE_CSS_SELECTOR保持一致
+HTTP_TIMEOUT = 10                               # 单次请求超时（秒）
+HTTP_POOL_SIZE = 8                              # 连接池大小
+WAN = 10000                                     # “万”
+
+# 第一个价格（可带“万”），后面可跟区间上限，如 ¥1,299、12.5、1.2万、100-200、1~1.5万
+PRICE_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*(万)?(?:\s*[-~～至]\s*(\d+(?:\.\d+)?)\s*(万)?)?")
+
+# ================== 页面解析 ==================
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+SUFFIX_PATTERN = re.compile(r"[\s.\d万]+")    # 价格后紧跟的小数部分或“万”
+
+class ListingParser(HTMLParser):
+    """
+    提取商品列表，与1.py的 EXTRACT_LISTINGS_JS 规则相同：
+    - 每个 class 以 number-- 开头的 span（等价于 span[class^='number--']）为一个商品的价格，
+      紧随其后的兄弟元素只含数字、小数点或“万”时一并计入
+    - 商品ID取所在 <a> 链接的 id 参数，标题取其中 class 以 main-title-- 开头的元素的文字
+    """
+    def __init__(self):
+        super().__init__()
+        self.listings = []
+        self._link = None           # 当前所在的<a>：{"id", "title", "listings"}
+        self._capture = None        # 正在读取文字的元素：price / title / suffix
+        self._tag = None
+        self._depth = 0
+        self._buf = []
+        self._suffix_for = None     # 刚读完价格、等待后续兄弟元素的商品
+
+    def _begin(self, kind, tag):
+        self._capture, self._tag, self._depth, self._buf = kind, tag, 1, []
+
+    def handle_starttag(self, tag, attrs):
+        if self._capture:
+            if tag == self._tag:
+                self._depth += 1
+            return
+        attrs = dict(attrs)
+        cls = attrs.get("class") or ""
+        if tag == "a":
+            m = re.search(r"[?&]id=(\d+)", attrs.get("href") or "")
+            self._link = {"id": m.group(1) if m else None, "title": None, "listings": []}
+            self._suffix_for = None
+        elif tag == "span" and cls.startswith(PRICE_CLASS_PREFIX):
+            self._begin("price", tag)
+        elif tag in VOID_TAGS:
+            self._suffix_for = None
+        elif cls.startswith(TITLE_CLASS_PREFIX) and self._link is not None and self._link["title"] is None:
+            self._suffix_for = None
+            self._begin("title", tag)
+        elif self._suffix_for is not None:
+            self._begin("suffix", tag)
+
+    def handle_endtag(self, tag):
+        if not self._capture:
+            # 父元素结束：价格之后没有更多兄弟元素
+            self._suffix_for = None
+            if tag == "a":
+                self._link = None
+            return
+        if tag != self._tag:
+            return
+        self._depth -= 1
+        if self._depth:
+            return
+        kind, text = self._capture, "".join(self._buf)
+        self._capture = None
+        if kind == "price":
+            if text.strip():
+                link = self._link or {"id": None, "title": None, "listings": []}
+                listing = {"id": link["id"], "title": link["title"], "price": text.strip()}
+                link["listings"].append(listing)
+                self.listings.append(listing)
+                self._suffix_for = listing
+        elif kind == "suffix":
+            if SUFFIX_PATTERN.fullmatch(text):
+                self._suffix_for["price"] += text.strip()
+            else:
+                self._suffix_for = None
+        elif kind == "title":
+            self._link["title"] = text.strip()
+            for listing in self._link["listings"]:
+                listing["title"] = listing["title"] or self._link["title"]
+
+    def handle_data(self, data):
+        if self._capture:
+            self._buf.append(data)
+
+def parse_price(text):
+    """
+    把一个商品的价格文本转为数字，无法识别时返回None
+    - 忽略货币符号、千位分隔符与前后的其它文字（如“包邮”）
+    - “万”乘以10000；区间取下限（卖家标的起价）
+    - 下限不带单位时，只有乘上上限的“万”后仍不超过上限才一并作用（“1~1.5万”为10000），
+      否则按原样取下限（“5000-1.2万”为5000）
+    """
+    m = PRICE_PATTERN.search(re.sub(r"(?<=\d)[,，](?=\d)", "", str(text)))
+    if m is None:
+        return None
+    low, low_unit, high, high_unit = m.groups()
+    value = float(low) * (WAN if low_unit else 1)
+    if not low_unit and high_unit and float(low) <= float(high):
+        value *= WAN
+    return value
+
+def parse_listings(html):
+    """
+    从搜索结果页HTML中解析商品列表
+    :return: [{"id": 商品ID, "title": 标题, "price": 价格文本}]
+    """
+    parser = ListingParser()
+    parser.feed(html)
+    parser.close()
+    return parser.listings
+
+def parse_prices(html):
+    """从搜索结果页HTML中解析价格文本列表"""
+    return [listing["price"] for listing in parse_listings(html)]
+
+# ================== 抓取后端 ==================
+class Backend:
+    """
+    抓取后端统一接口：fetch(cpu) 返回商品列表 [{"id", "title", "price"}]（price为价格文本），失败返回空列表
+    page_stats 为最近一次抓取的页面指标（如 page_seconds / page_kb），不统计时为None
+    on_page(型号, 页面HTML, URL) 为取得页面后的回调（如保存快照），出错不影响抓取
+    """
+    name = "base"
+    page_stats = None
+    on_page = None
+
+    def page_loaded(self, cpu, html, url):
+        if self.on_page is None:
+            return
+        try:
+            self.on_page(cpu, html, url)
+        except Exception as e:
+            print(f"[快照错误] {cpu}: {str(e)}")
+
+    def fetch(self, cpu):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class HttpBackend(Backend):
+    """复用cookies.json中的登录会话，通过连接池直接请求搜索页（不启动浏览器）"""
+    name = "http"
+
+    def __init__(self, cookies_path="cookies.json", base_url=BASE_URL,
+                 timeout=HTTP_TIMEOUT, pool_size=HTTP_POOL_SIZE, on_page=None):
+        self.base_url = base_url.rstrip("/")
+        self.on_page = on_page
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["User-Agent"] = UserAgent().random
+        self.load_cookies(cookies_path)
+
+    def load_cookies(self, cookies_path):
+        """把Selenium保存的Cookies装入会话"""
+        if not os.path.exists(cookies_path):
+            return False
+        with open(cookies_path, 'r') as f:
+            cookies = json.load(f)
+        for cookie in cookies:
+            self.session.cookies.set(
+                cookie["name"], cookie["value"],
+                domain=cookie.get("domain", "").lstrip("."),
+                path=cookie.get("path", "/")
+            )
+        return True
+
+    def fetch(self, cpu):
+        try:
+            resp = self.session.get(f"{self.base_url}/search", params={"q": cpu}, timeout=self.timeout)
+            resp.raise_for_status()
+            self.page_loaded(cpu, resp.text, resp.url)
+            return parse_listings(resp.text)
+        except requests.RequestException as e:
+            print(f"[HTTP错误] {cpu}: {str(e)}")
+            return []
+
+    def close(self):
+        self.session.close()
+
+class FallbackBackend(Backend):
+    """优先使用主后端，取不到价格时改用备用后端（备用后端按需创建）"""
+    def __init__(self, primary, fallback_factory):
+        self.primary = primary
+        self.fallback_factory = fallback_factory
+        self.fallback = None
+        self.name = f"{primary.name}+fallback"
+
+    def fetch(self, cpu):
+        prices = self.primary.fetch(cpu)
+        self.page_stats = self.primary.page_stats
+        if prices:
+            return prices
+        if self.fallback is None:
+            print(f"[回退] {cpu} 主后端无结果，启用备用后端")
+            self.fallback = self.fallback_factory()
+        prices = self.fallback.fetch(cpu)
+        self.page_stats = self.fallback.page_stats
+        return prices
+
+    def close(self):
+        self.primary.close()
+        if self.fallback is not None:
+            self.fallback.close()
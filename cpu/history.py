@@ -0,0 +1,273 @@
+import argparse
+import csv
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS models (
+    id INTEGER PRIMARY KEY,
+    name TEXT UNIQUE NOT NULL
+);
+CREATE TABLE IF NOT EXISTS dates (
+    id INTEGER PRIMARY KEY,
+    day TEXT UNIQUE NOT NULL,
+    rev INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS prices (
+    model_id INTEGER NOT NULL REFERENCES models(id),
+    date_id INTEGER NOT NULL REFERENCES dates(id),
+    price REAL,
+    PRIMARY KEY (model_id, date_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS prices_by_date ON prices(date_id);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+def history_path(sale_file):
+    """总表对应的历史库路径：cpu_sale.csv -> cpu_sale.db"""
+    return os.path.splitext(sale_file)[0] + ".db"
+
+def format_prices(values):
+    """
+    把一天的价格格式化为CSV文本：整天都是整数时按整数写出，否则按浮点写出，空值为空串
+    :param values: 一维浮点数组
+    :return: 字符串列表
+    """
+    values = np.asarray(values, dtype=np.float64)
+    missing = np.isnan(values)
+    if np.array_equal(values[~missing], np.trunc(values[~missing])):
+        text = np.where(missing, 0, values).astype(np.int64).astype(str).astype(object)
+        text[missing] = ""
+        return text.tolist()
+    return ["" if m else repr(v) for m, v in zip(missing.tolist(), values.tolist())]
+
+class HistoryStore:
+    """
+    按 (型号, 日期) 存储的历史价格库（SQLite）
+    - 每天追加只写入当天各型号的记录，与已有天数无关
+    - 按型号名对齐，当日结果的型号顺序变化不会错行
+    - models / dates 表的id即首次出现的顺序，用于导出与原总表一致的宽表
+    :param path: 数据库文件路径
+    """
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+        # 旧版本的库没有修订号列
+        if "rev" not in [r[1] for r in self.conn.execute("PRAGMA table_info(dates)")]:
+            with self.conn:
+                self.conn.execute("ALTER TABLE dates ADD COLUMN rev INTEGER NOT NULL DEFAULT 0")
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM dates").fetchone()[0]
+
+    def models(self):
+        return [r[0] for r in self.conn.execute("SELECT name FROM models ORDER BY id")]
+
+    def dates(self):
+        return [r[0] for r in self.conn.execute("SELECT day FROM dates ORDER BY id")]
+
+    def revision(self):
+        """修订号：每次写入加1，用于判断查询缓存是否过期"""
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'revision'").fetchone()
+        return row[0] if row else 0
+
+    def meta(self, key):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key, value):
+        """记录一个整数元数据（不改变修订号）"""
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, int(value)))
+
+    def changed_dates(self, since):
+        """修订号大于since的日期 [(id, 日期)]"""
+        return self.conn.execute("SELECT id, day FROM dates WHERE rev > ? ORDER BY id", (since,)).fetchall()
+
+    def date_ids(self):
+        """全部日期 [(id, 日期)]，按首次出现顺序"""
+        return self.conn.execute("SELECT id, day FROM dates ORDER BY id").fetchall()
+
+    def columns(self, date_ids):
+        """
+        读取若干天的价格
+        :param date_ids: 日期id列表
+        :return: 形状为 (型号数, 日期数) 的浮点矩阵，行按型号id顺序
+        """
+        model_ids = [r[0] for r in self.conn.execute("SELECT id FROM models ORDER BY id")]
+        values = np.full((len(model_ids), len(date_ids)), np.nan)
+        for j, date_id in enumerate(date_ids):
+            rows = self.conn.execute("SELECT model_id, price FROM prices WHERE date_id = ? AND price IS NOT NULL",
+                                     (date_id,)).fetchall()
+            if rows:
+                model_id, price = np.array(rows, dtype=np.float64).T
+                values[np.searchsorted(model_ids, model_id), j] = price
+        return values
+
+    def _ids(self, table, column, names):
+        """取得（必要时登记）名称对应的id"""
+        self.conn.executemany(f"INSERT OR IGNORE INTO {table}({column}) VALUES (?)", [(n,) for n in names])
+        ids = dict(self.conn.execute(f"SELECT {column}, id FROM {table}"))
+        return [ids[n] for n in names]
+
+    def _write(self, models, days, values):
+        """
+        写入 型号 × 日期 的价格矩阵（已存在的 (型号, 日期) 覆盖）
+        :param models: 型号列表（行）
+        :param days: 日期列表（列）
+        :param values: 形状为 (型号数, 日期数) 的浮点矩阵，NaN表示无有效数据
+        """
+        values = np.asarray(values, dtype=np.float64).reshape(len(models), len(days))
+        with self.conn:
+            date_ids = self._ids("dates", "day", days)
+            model_ids = self._ids("models", "name", models)
+            cells = values.astype(object)
+            cells[np.isnan(values)] = None
+            rows = zip(np.repeat(model_ids, len(days)).tolist(),
+                       np.tile(date_ids, len(models)).tolist(),
+                       cells.ravel().tolist())
+            self.conn.executemany("INSERT OR REPLACE INTO prices VALUES (?, ?, ?)", rows)
+            rev = self.revision() + 1
+            self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('revision', ?)", (rev,))
+            self.conn.executemany("UPDATE dates SET rev = ? WHERE id = ?", [(rev, i) for i in date_ids])
+        return values.size
+
+    def append(self, day, prices):
+        """
+        写入一天的价格（同一天重复写入时覆盖）
+        :param day: 日期（列名）
+        :param prices: 以型号为索引的价格Series，空值表示当天无有效数据
+        :return: 写入的记录数
+        """
+        values = pd.to_numeric(pd.Series(prices), errors="coerce").to_numpy(dtype=np.float64)
+        return self._write([str(m) for m in prices.index], [str(day)], values)
+
+    def append_frame(self, df):
+        """写入 5.py 的当日结果（name, 日期 两列）"""
+        day = df.columns[1]
+        return self.append(day, pd.Series(df[day].to_numpy(), index=df[df.columns[0]]))
+
+    def import_wide(self, df):
+        """导入原总表格式的宽表（第一列型号，其余每列一天），整表一次事务写入"""
+        values = df[df.columns[1:]].apply(pd.to_numeric, errors="coerce")
+        return self._write(df[df.columns[0]].astype(str).tolist(), [str(d) for d in df.columns[1:]],
+                           values.to_numpy(dtype=np.float64))
+
+    def remove_dates(self, days):
+        """删除若干天（列）及其价格，修订号加1"""
+        with self.conn:
+            ids = [r[0] for r in self.conn.execute(
+                f"SELECT id FROM dates WHERE day IN ({','.join('?' * len(days))})", [str(d) for d in days])]
+            self.conn.executemany("DELETE FROM prices WHERE date_id = ?", [(i,) for i in ids])
+            self.conn.executemany("DELETE FROM dates WHERE id = ?", [(i,) for i in ids])
+            self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('revision', ?)", (self.revision() + 1,))
+        return len(ids)
+
+    def sort_dates(self, key):
+        """
+        按 key(日期) 重新排列日期的顺序（即总表的列顺序），key 相同的日期保持原有先后，
+        key 为 None 的排在最后；只改变日期id，价格不变，修订号加1（导出的CSV列顺序随之变化）
+        :return: 顺序是否有变化
+        """
+        rows = self.date_ids()
+        ranked = sorted(rows, key=lambda r: (key(r[1]) is None, key(r[1]) or ""))
+        if ranked == rows:
+            return False
+        ids = [i for i, _ in rows]
+        mapping = [(new, -old) for new, (old, _) in zip(ids, ranked)]
+        with self.conn:
+            # 先取负数避免与尚未改动的id冲突
+            self.conn.execute("UPDATE dates SET id = -id")
+            self.conn.execute("UPDATE prices SET date_id = -date_id")
+            self.conn.executemany("UPDATE dates SET id = ? WHERE id = ?", mapping)
+            self.conn.executemany("UPDATE prices SET date_id = ? WHERE date_id = ?", mapping)
+            self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('revision', ?)", (self.revision() + 1,))
+        return True
+
+    def matrix(self):
+        """
+        物化为 型号 × 日期 的价格矩阵，行列均按首次出现顺序
+        :return: (型号列表, 日期列表, 浮点矩阵)
+        """
+        models = self.conn.execute("SELECT id, name FROM models ORDER BY id").fetchall()
+        days = self.conn.execute("SELECT id, day FROM dates ORDER BY id").fetchall()
+        values = np.full((len(models), len(days)), np.nan)
+        rows = self.conn.execute("SELECT model_id, date_id, price FROM prices WHERE price IS NOT NULL").fetchall()
+        if rows:
+            model_id, date_id, price = np.array(rows, dtype=np.float64).T
+            rows_at = np.searchsorted([i for i, _ in models], model_id)
+            cols_at = np.searchsorted([i for i, _ in days], date_id)
+            values[rows_at, cols_at] = price
+        return [n for _, n in models], [d for _, d in days], values
+
+    def wide(self):
+        """物化为原总表格式的宽表DataFrame（name + 各日期列）"""
+        models, days, values = self.matrix()
+        wide = pd.DataFrame(values, columns=days)
+        wide.insert(0, "name", models)
+        return wide
+
+    def export_csv(self, output_file):
+        """整表导出到总表CSV（先写临时文件再替换）"""
+        models, days, values = self.matrix()
+        columns = [models] + [format_prices(values[:, j]) for j in range(len(days))]
+        tmp = f"{output_file}.{os.getpid()}.tmp"
+        with open(tmp, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(["name"] + days)
+            writer.writerows(zip(*columns))
+        os.replace(tmp, output_file)
+
+def open_history(sale_file):
+    """
+    打开总表对应的历史库；历史库为空而总表CSV已存在时，先导入原有数据
+    :param sale_file: 总表路径
+    """
+    store = HistoryStore(history_path(sale_file))
+    if not len(store) and os.path.exists(sale_file) and os.path.getsize(sale_file) > 0:
+        store.import_wide(pd.read_csv(sale_file, dtype={0: str}))
+    return store
+
+def export_sale_csv(sale_file, force=False):
+    """
+    按需由历史库导出总表CSV：每天的写入只进历史库（O(型号数)），需要CSV时再整表导出一次
+    历史库自上次导出后没有写入且CSV存在时跳过
+    :return: 是否导出
+    """
+    with open_history(sale_file) as store:
+        revision = store.revision()
+        if not force and os.path.exists(sale_file) and store.meta("exported") == revision:
+            return False
+        store.export_csv(sale_file)
+        store.set_meta("exported", revision)
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description="由历史库（cpu_sale.db）导出总表CSV")
+    parser.add_argument("--sale-file", default="cpu_sale.csv", help="总表路径（历史库与之同名）")
+    parser.add_argument("--force", action="store_true", help="历史库没有变化时也重新导出")
+    args = parser.parse_args()
+    if export_sale_csv(args.sale_file, args.force):
+        print(f"已导出至 {args.sale_file}")
+    else:
+        print(f"{args.sale_file} 已是最新，无需导出")
+
+if __name__ == "__main__":
+    main()
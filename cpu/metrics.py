@@ -0,0 +1,200 @@
+import json
+import math
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+METRICS_DIR = "metrics"
+PREFIX = "cpu_get"
+STAGE_FIELDS = ("stage", "status", "error", "wall_seconds", "cpu_seconds", "peak_rss_mb")
+
+# ================== 资源占用 ==================
+def cpu_seconds():
+    """本进程及已结束子进程（如4.py的进程池）的CPU时间（用户态+内核态）"""
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
+
+def peak_rss_mb():
+    """本进程启动以来的峰值常驻内存（MB），无法获取时返回None"""
+    try:
+        import resource
+    except ImportError:
+        resource = None
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux 单位为KB，macOS 为字节
+        return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+    try:
+        import psutil
+    except ImportError:
+        return None
+    info = psutil.Process().memory_info()
+    return getattr(info, "peak_wset", info.rss) / 2**20
+
+# ================== 运行记录 ==================
+class RunMetrics:
+    """
+    一次运行（抓取或数据处理）的指标：各阶段的墙钟/CPU时间、峰值内存、行列数，以及各型号的指标
+    结束时写出 JSON 报告（metrics/{日期}_{任务}.json）与 Prometheus textfile（metrics/cpu_get_{任务}.prom）
+    :param job: 任务名，如 crawl / pipeline
+    :param day: 处理日期
+    """
+    def __init__(self, job, day):
+        self.job = job
+        self.day = day
+        self.started = datetime.now()
+        self._start = time.perf_counter()
+        self.stages = []
+        self.models = {}
+        self.info = {}
+
+    @contextmanager
+    def stage(self, name):
+        """
+        记录一个阶段；可在with块内向返回的字典写入 rows / columns 等数值
+        阶段抛出异常时记录为失败并继续抛出
+        """
+        record = {"stage": name, "status": "ok"}
+        wall, cpu = time.perf_counter(), cpu_seconds()
+        try:
+            yield record
+        except BaseException as e:
+            record["status"] = "error"
+            record["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            record["wall_seconds"] = time.perf_counter() - wall
+            record["cpu_seconds"] = cpu_seconds() - cpu
+            record["peak_rss_mb"] = peak_rss_mb()
+            self.stages.append(record)
+
+    def model(self, name, **fields):
+        """合并一个型号的指标，如 model("i7-8700K", prices=30, noise_ratio=0.1)"""
+        self.models.setdefault(str(name), {}).update(fields)
+
+    def models_from_frame(self, df, **columns):
+        """
+        由以型号为索引的表批量写入型号指标
+        :param columns: {指标名: 列名}
+        """
+        for field, column in columns.items():
+            for name, value in df[column].items():
+                self.model(name, **{field: _plain(value)})
+
+    def report(self):
+        return {
+            "job": self.job,
+            "date": self.day,
+            "started": self.started.strftime("%Y-%m-%d %H:%M:%S"),
+            "wall_seconds": time.perf_counter() - self._start,
+            "status": "error" if any(s["status"] != "ok" for s in self.stages) else "ok",
+            "info": self.info,
+            "stages": self.stages,
+            "models": self.models,
+        }
+
+    def write(self, directory=METRICS_DIR, prometheus=True):
+        """
+        写出JSON报告与Prometheus textfile（均先写临时文件再替换）
+        :param prometheus: 为False时只写JSON（如多个进程各处理一天，textfile由主进程合并写出）
+        :return: (JSON路径, textfile路径或None)
+        """
+        report = self.report()
+        os.makedirs(directory, exist_ok=True)
+        json_path = os.path.join(directory, f"{self.day}_{self.job}.json")
+        _write_atomic(json_path, json.dumps(report, ensure_ascii=False, indent=1))
+        return json_path, write_prometheus(report, directory) if prometheus else None
+
+    def summary(self, slowest=None, top=5):
+        """
+        各阶段用时与资源占用，便于在命令行中查看
+        :param slowest: 型号指标名（如 dbscan_seconds），给出时附上该指标最大的top个型号
+        """
+        lines = []
+        total = sum(s["wall_seconds"] for s in self.stages) or 1
+        for s in self.stages:
+            rss = "" if s["peak_rss_mb"] is None else f"  峰值内存 {s['peak_rss_mb']:.0f}MB"
+            lines.append(f"  {s['stage']:<12} {s['wall_seconds']:8.3f}s  {s['wall_seconds'] / total:6.1%}"
+                         f"  CPU {s['cpu_seconds']:.3f}s{rss}" + ("" if s["status"] == "ok" else "  失败"))
+        lines.append(f"  {'合计':<12} {total:8.3f}s")
+        if slowest:
+            ranked = sorted(((m[slowest], name) for name, m in self.models.items()
+                             if isinstance(m.get(slowest), (int, float))), reverse=True)[:top]
+            if ranked:
+                lines.append(f"  {slowest} 最大的型号: " + "，".join(f"{name} {v:.3f}" for v, name in ranked))
+        return "\n".join(lines)
+
+def _plain(value):
+    """numpy标量转为JSON可写的Python数值，NaN转为None"""
+    if hasattr(value, "item"):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+def _write_atomic(path, text):
+    # 临时文件名按进程/线程区分，多个进程同时写同一文件时不会替换掉对方的临时文件
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+def write_prometheus(report, directory=METRICS_DIR):
+    """把报告写为 {目录}/cpu_get_{任务}.prom，返回路径"""
+    os.makedirs(directory, exist_ok=True)
+    prom_path = os.path.join(directory, f"{PREFIX}_{report['job']}.prom")
+    _write_atomic(prom_path, to_prometheus(report))
+    return prom_path
+
+# ================== Prometheus ==================
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def to_prometheus(report):
+    """
+    把报告转为Prometheus textfile格式（node_exporter textfile collector 可直接读取）
+    阶段指标以 stage 为标签，型号指标以 model 为标签，只导出数值字段
+    """
+    job = _label(report["job"])
+    lines = []
+
+    def gauge(name, help_text, samples):
+        samples = [(labels, v) for labels, v in samples
+                   if isinstance(v, (int, float)) and not isinstance(v, bool) and math.isfinite(v)]
+        if not samples:
+            return
+        lines.append(f"# HELP {PREFIX}_{name} {help_text}")
+        lines.append(f"# TYPE {PREFIX}_{name} gauge")
+        for labels, v in samples:
+            text = ",".join([f'job="{job}"'] + [f'{k}="{_label(x)}"' for k, x in labels.items()])
+            lines.append(f"{PREFIX}_{name}{{{text}}} {v!r}")
+
+    started = datetime.strptime(report["started"], "%Y-%m-%d %H:%M:%S")
+    gauge("run_timestamp_seconds", "Run start time (unix seconds)", [({}, started.timestamp())])
+    gauge("run_wall_seconds", "Total wall time of the run", [({}, report["wall_seconds"])])
+    gauge("run_success", "1 if every stage finished without error", [({}, int(report["status"] == "ok"))])
+
+    stages = report["stages"]
+    gauge("stage_wall_seconds", "Stage wall time", [({"stage": s["stage"]}, s["wall_seconds"]) for s in stages])
+    gauge("stage_cpu_seconds", "Stage CPU time including finished child processes",
+          [({"stage": s["stage"]}, s["cpu_seconds"]) for s in stages])
+    gauge("stage_peak_rss_bytes", "Process peak RSS at the end of the stage",
+          [({"stage": s["stage"]}, s["peak_rss_mb"] * 2**20 if s["peak_rss_mb"] is not None else None)
+           for s in stages])
+    gauge("stage_success", "1 if the stage finished without error",
+          [({"stage": s["stage"]}, int(s["status"] == "ok")) for s in stages])
+    # 阶段内写入的其它数值（rows / columns / models 等）
+    extra = sorted({k for s in stages for k in s} - set(STAGE_FIELDS))
+    for field in extra:
+        gauge(f"stage_{field}", f"Stage {field}", [({"stage": s["stage"]}, s.get(field)) for s in stages])
+
+    fields = sorted({k for m in report["models"].values() for k in m})
+    for field in fields:
+        gauge(f"model_{field}", f"Per-model {field}",
+              [({"model": name}, m.get(field)) for name, m in report["models"].items()])
+    for key, value in report["info"].items():
+        gauge(f"info_{key}", f"Run {key}", [({}, value)])
+    return "\n".join(lines) + "\n"
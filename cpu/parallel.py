@@ -0,0 +1,27 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+def resolve_jobs(n_jobs):
+    """n_jobs 为 None 或 <=0 时使用全部CPU核数"""
+    if n_jobs is None or n_jobs <= 0:
+        return os.cpu_count() or 1
+    return n_jobs
+
+def parallel_map(func, items, n_jobs=1, kind="process", **kwargs):
+    """
+    按输入顺序返回 func(item, **kwargs) 的结果列表
+    :param n_jobs: 并发数，1 时在当前进程串行执行
+    :param kind: process（进程池，适合纯计算）或 thread（线程池，适合释放GIL的计算）
+    """
+    items = list(items)
+    n_jobs = min(resolve_jobs(n_jobs), max(1, len(items)))
+    func = partial(func, **kwargs) if kwargs else func
+    if n_jobs == 1:
+        return [func(item) for item in items]
+
+    pool_cls = ProcessPoolExecutor if kind == "process" else ThreadPoolExecutor
+    # 每个任务打包若干列，减少进程间通信次数
+    chunksize = max(1, len(items) // (n_jobs * 4)) if kind == "process" else 1
+    with pool_cls(max_workers=n_jobs) as pool:
+        return list(pool.map(func, items, chunksize=chunksize))
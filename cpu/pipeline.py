@@ -0,0 +1,143 @@
+import argparse
+import importlib
+import os
+from contextlib import contextmanager
+from datetime import date
+
+from history import export_sale_csv
+from metrics import METRICS_DIR, RunMetrics
+
+# ================== 配置区 ==================
+DATA_DIR = "data"
+ANA_DIR = "ana"
+RESULT_DIR = "result"
+SALE_FILE = "cpu_sale.csv"
+
+# ================== 工具函数 ==================
+@contextmanager
+def timed(name, metrics):
+    """记录一个阶段的耗时、CPU时间与峰值内存（含该阶段模块的首次导入），返回可写入行列数的记录"""
+    print(f"[{name}] 开始")
+    with metrics.stage(name) as record:
+        yield record
+    print(f"[{name}] 完成，用时 {record['wall_seconds']:.3f}s")
+
+def save_csv(df, path, **kwargs):
+    """先写临时文件再替换：同一天重复处理时覆盖为完整的新文件，中途失败不留下写了一半的文件"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    df.to_csv(tmp, **kwargs)
+    os.replace(tmp, path)
+
+# ================== 主流程 ==================
+def run(day, save_intermediate=True, sale_file=SALE_FILE, n_jobs=1, param_cache=None, metrics_dir=METRICS_DIR):
+    """
+    在同一进程内依次执行2.py~8.py的处理，阶段之间直接传递DataFrame
+    :param day: 处理日期（YYYY-MM-DD）
+    :param save_intermediate: 是否写出 data/ ana/ result/ 下的中间文件（IQR统计、清洗结果、当日价格等），默认写出
+    :param sale_file: 总表路径
+    :param n_jobs: 4.py 逐列DBSCAN清洗的并行进程数
+    :param param_cache: 4.py 的eps参数缓存文件名（ana/下），None则每天重新计算
+    :param metrics_dir: 运行指标（JSON与Prometheus textfile）的输出目录，None则不写出
+    :return: [(阶段名, 耗时秒)]
+    """
+    metrics = RunMetrics("pipeline", day)
+    try:
+        _run_stages(metrics, day, save_intermediate, sale_file, n_jobs, param_cache)
+    finally:
+        if metrics_dir:
+            json_path, _ = metrics.write(metrics_dir)
+            print(f"\n运行指标已保存至 {json_path}")
+        print("\n各阶段用时:")
+        print(metrics.summary(slowest="dbscan_seconds"))
+    return [(s["stage"], s["wall_seconds"]) for s in metrics.stages]
+
+def _run_stages(metrics, day, save_intermediate, sale_file, n_jobs, param_cache):
+    samples = load_samples(metrics, day)
+    od_df = analyse_day(metrics, day, samples, save_intermediate, n_jobs, param_cache)
+
+    with timed("6 合并总表", metrics):
+        bond = importlib.import_module("6")
+        bond.append_frame(od_df, sale_file)
+
+    with timed("7 检测展开数据", metrics):
+        check = importlib.import_module("7")
+        checked_df = check.check_samples(samples)
+        if save_intermediate:
+            save_csv(checked_df, os.path.join(DATA_DIR, f"{day}_output.csv"), index=False)
+
+    with timed("8 检测总表", metrics):
+        # 只检测当天新增的一列，再由历史库导出总表CSV（历史库没有变化时跳过）
+        final = importlib.import_module("8")
+        if final.check_day(od_df):
+            bond.remove_day(day, sale_file)
+        export_sale_csv(sale_file)
+
+def load_samples(metrics, day, data_dir=DATA_DIR):
+    """阶段2：读入某天的抓取数据为 DaySamples"""
+    with timed("2 数据展开", metrics) as stage:
+        ingest = importlib.import_module("2")
+        samples = ingest.load_day_samples(day, data_dir)
+        stage["rows"], stage["columns"] = samples.n_rows, samples.n_models
+        stage["samples_mb"] = samples.nbytes / 2**20
+        stage["duplicates"] = samples.duplicates
+        metrics.models_from_frame(samples.counts().to_frame("n"), samples="n")
+        print(f"共 {samples.n_rows} 行 × {samples.n_models} 个型号"
+              + (f"（按商品去掉重复样本 {samples.duplicates} 条）" if samples.duplicates else ""))
+    return samples
+
+def analyse_day(metrics, day, samples, save_intermediate=False, n_jobs=1, param_cache=None):
+    """
+    阶段3~5：由一天的样本计算当日价格，save_intermediate 时写出 ana/ 与 result/ 下的文件；
+    IQR统计表总是写出，作为之后几天抓取时在线清洗（stream_clean.py）的初始边界
+    :return: 5.py 的当日结果（name, 日期 两列）
+    """
+    with timed("3 IQR清洗", metrics) as stage:
+        iqr = importlib.import_module("3")
+        iqr_stats, iqr_df = iqr.iqr_column_cleaner(samples, multiplier=1.5)
+        stage["rows"], stage["columns"] = iqr_df.shape
+        metrics.models_from_frame(iqr_df.notna().sum().to_frame("n"), iqr_kept="n")
+        save_csv(iqr_stats, os.path.join(ANA_DIR, f"{day}_iqr_stats.csv"), index=False)
+        if save_intermediate:
+            save_csv(iqr_df, os.path.join(ANA_DIR, f"{day}_iqr.csv"), index=False)
+
+    with timed("4 DBSCAN清洗", metrics) as stage:
+        dbscan = importlib.import_module("4")
+        cache = dbscan.ParamCache(os.path.join(ANA_DIR, param_cache) if param_cache else None)
+        dbscan_df, dbscan_stats = dbscan.dbscan_clean(iqr_df, n_jobs=n_jobs, param_cache=cache)
+        stage["rows"], stage["columns"] = dbscan_df.shape
+        metrics.models_from_frame(dbscan_stats, eps="eps", noise_ratio="noise_ratio")
+        for model, seconds in dbscan_stats.attrs["seconds"].items():
+            metrics.model(model, dbscan_seconds=seconds)
+        if param_cache:
+            metrics.info.update({f"param_cache_{k}": v for k, v in dbscan_stats.attrs["param_cache"].items()})
+        if save_intermediate:
+            save_csv(dbscan_df, os.path.join(ANA_DIR, f"{day}_dbscan.csv"), index=False)
+            save_csv(dbscan_stats, os.path.join(ANA_DIR, f"{day}_dbscan_stats.csv"))
+
+    with timed("5 当日价格", metrics) as stage:
+        od = importlib.import_module("5")
+        od_df = od.daily_price(dbscan_df, dbscan_stats, day)
+        stage["rows"] = int(od_df[day].notna().sum())
+        metrics.models_from_frame(od_df.set_index(od_df.columns[0]), price=day)
+        if save_intermediate:
+            save_csv(od_df, os.path.join(RESULT_DIR, f"{day}_od.csv"), index=False)
+    return od_df
+
+def main():
+    parser = argparse.ArgumentParser(description="单进程执行2.py~8.py的数据处理流程")
+    parser.add_argument("--date", default=date.today().strftime("%Y-%m-%d"), help="处理日期，默认今天")
+    parser.add_argument("--save-intermediate", action=argparse.BooleanOptionalAction, default=True,
+                        help="写出各阶段的中间CSV（默认写出，--no-save-intermediate 关闭；"
+                             "backfill.py --resume 依赖这些文件；IQR统计总是写出）")
+    parser.add_argument("--sale-file", default=SALE_FILE, help="总表路径")
+    parser.add_argument("--jobs", type=int, default=1, help="逐列DBSCAN清洗的并行进程数，<=0使用全部核心")
+    parser.add_argument("--param-cache", nargs="?", const="dbscan_params.json", default=None,
+                        help="沿用前几天的DBSCAN eps参数（ana/下的缓存文件），分布漂移时仍会重新计算")
+    parser.add_argument("--metrics-dir", default=METRICS_DIR, help="运行指标输出目录")
+    args = parser.parse_args()
+    run(args.date, save_intermediate=args.save_intermediate, sale_file=args.sale_file, n_jobs=args.jobs,
+        param_cache=args.param_cache, metrics_dir=args.metrics_dir)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+MAGIC = b"CPUPRICELOG1\n"
+RECORD_DTYPE = np.dtype([
+    ("date", "S10"),
+    ("time", "S8"),
+    ("model", "S16"),
+    ("price", "<f8"),
+    ("listing", "<u8"),     # 商品标识（dedupe.listing_key），0为未知
+])
+
+def log_path(day, data_dir="./data"):
+    return os.path.join(data_dir, f"{day}_prices.bin")
+
+def _read_header(f):
+    if f.read(len(MAGIC)) != MAGIC:
+        raise ValueError(f"{f.name} 不是价格日志文件")
+    header = json.loads(f.readline())
+    header["dtype"] = np.dtype([tuple(field) for field in header["dtype"]])
+    return header
+
+def _check_model(model, dtype):
+    """型号名超过记录中model字段的长度时报错（定长字段会静默截断，前缀相同的型号会被合并）"""
+    size = dtype["model"].itemsize
+    if len(str(model).encode("utf-8")) > size:
+        raise ValueError(f"型号名 {model!r} 超过价格日志model字段的 {size} 字节上限")
+
+class PriceLog:
+    """
+    长格式价格日志的追加写入器（每条样本一条定长二进制记录，只追加）
+    文件结构：MAGIC + 一行JSON文件头（字段定义、型号顺序）+ 连续的定长记录
+    型号名按UTF-8编码后不能超过model字段的长度（16字节），创建写入器与追加时检查
+    :param path: 日志文件路径
+    :param models: 型号顺序（仅新建文件时写入文件头）
+    """
+    def __init__(self, path, models=()):
+        self.path = path
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, 'rb') as f:
+                self.dtype = _read_header(f)["dtype"]
+            for model in models:
+                _check_model(model, self.dtype)
+        else:
+            for model in models:
+                _check_model(model, RECORD_DTYPE)
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self.dtype = RECORD_DTYPE
+            header = {"dtype": RECORD_DTYPE.descr, "models": list(models)}
+            with open(path, 'wb') as f:
+                f.write(MAGIC + json.dumps(header).encode("utf-8") + b"\n")
+
+    def append(self, day, session, model, prices, listings=None):
+        """
+        追加一个型号的全部价格
+        :param listings: 与prices对应的商品标识；旧版日志没有该字段时忽略
+        """
+        if not prices:
+            return 0
+        _check_model(model, self.dtype)
+        records = np.zeros(len(prices), dtype=self.dtype)
+        records["date"] = day
+        records["time"] = session
+        records["model"] = str(model).encode("utf-8")
+        records["price"] = prices
+        if listings is not None and "listing" in self.dtype.names:
+            records["listing"] = listings
+        with open(self.path, 'ab') as f:
+            f.write(records.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        return len(records)
+
+def read_records(path):
+    """
+    读取整份日志的原始记录（不解码字符串）
+    :return: (结构化数组, 文件头中的型号顺序)
+    """
+    with open(path, 'rb') as f:
+        header = _read_header(f)
+        raw = f.read()
+    dtype = header["dtype"]
+    # 崩溃时可能残留半条记录，直接丢弃
+    raw = raw[:len(raw) - len(raw) % dtype.itemsize]
+    return np.frombuffer(raw, dtype=dtype), header["models"]
+
+def read_log(path):
+    """
+    读取整份日志为长表 (date, time, model, price)
+    :return: (长表DataFrame, 文件头中的型号顺序)
+    """
+    records, models = read_records(path)
+    dtype = records.dtype
+    df = pd.DataFrame({
+        name: (np.char.decode(records[name], "utf-8") if records.dtype[name].kind == "S" else records[name])
+        for name in dtype.names
+    })
+    return df, models
+
+def to_wide(long_df, models=()):
+    """
+    转为与 {today}_output.csv 相同的宽表：每个型号一列，每行是各型号同一位置的价格，
+    每次抓取只保留所有型号都有值的前若干行
+    """
+    order = list(models) + sorted(set(long_df["model"]) - set(models))
+    df = long_df.assign(pos=long_df.groupby(["date", "time", "model"], sort=False).cumcount())
+    wide = df.set_index(["date", "time", "pos", "model"])["price"].unstack("model")
+    return wide.reindex(columns=order).dropna().reset_index(drop=True)
@@ -0,0 +1,211 @@
+import argparse
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from history import HistoryStore, history_path, open_history
+
+SALE_FILE = "cpu_sale.csv"
+DATE_PATTERN = re.compile(r"^\s*(\d{4})\D(\d{1,2})\D(\d{1,2})\s*$")
+
+def normalize_date(text):
+    """
+    统一日期格式：2025/5/6、2025-05-06、2025.5.6 -> 2025-05-06
+    :return: 无法识别时返回None
+    """
+    match = DATE_PATTERN.match(str(text))
+    if not match:
+        return None
+    year, month, day = map(int, match.groups())
+    try:
+        return pd.Timestamp(year=year, month=month, day=day).strftime("%Y-%m-%d")
+    except ValueError:
+        return None
+
+def cache_dir(db_path):
+    """查询缓存目录：cpu_sale.db -> cpu_sale.cache/"""
+    return os.path.splitext(db_path)[0] + ".cache"
+
+# ================== 缓存构建 ==================
+def _load_cache(directory):
+    with open(os.path.join(directory, "index.json"), encoding="utf-8") as f:
+        index = json.load(f)
+    dates = np.load(os.path.join(directory, "dates.npy"), mmap_mode="r")
+    prices = np.load(os.path.join(directory, "prices.npy"), mmap_mode="r")
+    return index, dates, prices
+
+def refresh_cache(db_path, directory=None):
+    """
+    按历史库更新查询缓存，只重新读取修订号变化过的日期
+    缓存为 日期 × 型号 的float64矩阵（prices.npy，按日期升序）与日期数组（dates.npy）
+    同一天在总表中以不同格式出现多次时合并为一行，靠后写入的非空值优先；
+    索引中记录每一天由哪些日期id合并而来，某个格式的列被删除或列顺序改变时该天也重新读取
+    :param db_path: 历史库路径
+    :param directory: 缓存目录，缺省为 cache_dir(db_path)
+    :return: 缓存目录
+    """
+    directory = directory or cache_dir(db_path)
+    with HistoryStore(db_path) as store:
+        revision = store.revision()
+        models = store.models()
+        try:
+            index, dates, prices = _load_cache(directory)
+        except (FileNotFoundError, ValueError):
+            index, dates, prices = None, None, None
+        if index is not None and index["revision"] == revision:
+            return directory
+        # 缓存不存在、晚于历史库或型号表对不上时整体重建
+        if (index is None or index["revision"] > revision
+                or models[:len(index["models"])] != index["models"]):
+            index, dates, prices = {"revision": -1, "models": []}, np.array([], dtype="datetime64[D]"), None
+        merged = index.get("days", {})
+
+        raw = store.date_ids()
+        normalized = {}
+        for date_id, day in raw:
+            key = normalize_date(day)
+            if key is not None:
+                normalized.setdefault(key, []).append(date_id)
+        changed = {normalize_date(day) for _, day in store.changed_dates(index["revision"])} - {None}
+        changed |= {key for key, ids in normalized.items() if merged.get(key) != ids}
+
+        # 保留未变化的行（已删除的日期去掉），补齐新增型号的列
+        old = {str(d): row for d, row in zip(dates.astype(str), range(len(dates)))
+               if str(d) not in changed and str(d) in normalized}
+        keys = sorted(set(old) | changed)
+        matrix = np.full((len(keys), len(models)), np.nan)
+        if old:
+            old_rows = [old[k] for k in keys if k in old]
+            matrix[[i for i, k in enumerate(keys) if k in old], :prices.shape[1]] = prices[old_rows]
+        for i, key in enumerate(keys):
+            if key in changed:
+                # 靠后写入的日期覆盖靠前的
+                for column in store.columns(normalized[key]).T:
+                    matrix[i, ~np.isnan(column)] = column[~np.isnan(column)]
+    # 先释放内存映射，Windows下被映射的文件不能覆盖
+    del dates, prices
+
+    os.makedirs(directory, exist_ok=True)
+    for name, array in (("prices", matrix), ("dates", np.array(keys, dtype="datetime64[D]"))):
+        tmp = os.path.join(directory, f"{name}.tmp.npy")
+        np.save(tmp, array)
+        os.replace(tmp, os.path.join(directory, f"{name}.npy"))
+    # 最后写索引：中途失败时修订号不变，下次会重新构建
+    with open(os.path.join(directory, "index.json"), "w", encoding="utf-8") as f:
+        json.dump({"revision": revision, "models": models, "days": normalized}, f, ensure_ascii=False)
+    return directory
+
+# ================== 查询 ==================
+class PriceHistory:
+    """
+    历史价格查询（只读）。价格矩阵以内存映射方式打开，打开耗时与历史天数无关
+    :param db_path: 历史库路径
+    :param refresh: 打开前是否按历史库更新缓存
+    """
+    def __init__(self, db_path, refresh=True):
+        directory = refresh_cache(db_path) if refresh else cache_dir(db_path)
+        index, self.dates, self.prices = _load_cache(directory)
+        self.models = index["models"]
+        self.model_index = {model: i for i, model in enumerate(self.models)}
+
+    def _column(self, model):
+        try:
+            return self.model_index[model]
+        except KeyError:
+            raise KeyError(f"未知型号: {model}") from None
+
+    def _rows(self, start=None, end=None):
+        """日期区间 [start, end] 对应的行范围"""
+        lo = 0 if start is None else np.searchsorted(self.dates, np.datetime64(normalize_date(start), "D"))
+        hi = len(self.dates) if end is None else np.searchsorted(self.dates, np.datetime64(normalize_date(end), "D"),
+                                                                 side="right")
+        return slice(lo, hi)
+
+    def range(self, model, start=None, end=None, dropna=True):
+        """
+        单个型号在 [start, end] 内的每日价格
+        :return: 以日期为索引的Series
+        """
+        rows = self._rows(start, end)
+        series = pd.Series(np.array(self.prices[rows, self._column(model)]),
+                           index=pd.DatetimeIndex(self.dates[rows], name="date"), name=model)
+        return series.dropna() if dropna else series
+
+    def trend(self, model, days=90, end=None):
+        """型号最近days天的价格（截止到end，缺省为历史中的最后一天；历史为空时返回空Series）"""
+        if end is None and not len(self.dates):
+            return self.range(model)
+        end = np.datetime64(normalize_date(end), "D") if end is not None else self.dates[-1]
+        return self.range(model, str(end - np.timedelta64(days - 1, "D")), str(end))
+
+    def latest(self, model, end=None):
+        """
+        型号最近一次有效价格
+        :return: (日期, 价格)，没有有效价格时为 (None, nan)
+        """
+        column = np.array(self.prices[self._rows(None, end), self._column(model)])
+        valid = np.flatnonzero(~np.isnan(column))
+        if not len(valid):
+            return None, np.nan
+        return pd.Timestamp(self.dates[valid[-1]]), column[valid[-1]]
+
+    def latest_prices(self, models=None, end=None):
+        """多个型号（缺省全部）各自最近一次有效价格的Series"""
+        models = self.models if models is None else list(models)
+        columns = np.array([self._column(m) for m in models], dtype=np.int64)
+        values = np.full(len(models), np.nan)
+        missing = np.arange(len(models))
+        # 从最后一天向前分块扫描，大多数型号在最近几天内就能找到有效价格
+        hi, step = self._rows(None, end).stop, 8
+        while hi > 0 and len(missing):
+            lo = max(0, hi - step)
+            block = np.array(self.prices[lo:hi][:, columns[missing]])
+            valid = ~np.isnan(block)
+            found = valid.any(axis=0)
+            last = len(block) - 1 - np.argmax(valid[::-1], axis=0)
+            values[missing[found]] = block[last[found], np.flatnonzero(found)]
+            missing = missing[~found]
+            hi, step = lo, step * 4
+        return pd.Series(values, index=pd.Index(models, name="name"))
+
+    def slice(self, models, start=None, end=None):
+        """
+        多个型号在 [start, end] 内的价格
+        :return: DataFrame，行为日期，列为型号
+        """
+        rows = self._rows(start, end)
+        block = np.array(self.prices[rows][:, [self._column(m) for m in models]])
+        return pd.DataFrame(block, index=pd.DatetimeIndex(self.dates[rows], name="date"), columns=list(models))
+
+def open_query(sale_file=SALE_FILE):
+    """打开总表对应历史库的查询接口（历史库不存在时先由总表导入）"""
+    open_history(sale_file).close()
+    return PriceHistory(history_path(sale_file))
+
+def main():
+    parser = argparse.ArgumentParser(description="查询历史价格")
+    parser.add_argument("models", nargs="+", help="型号")
+    parser.add_argument("--sale-file", default=SALE_FILE, help="总表路径（历史库与之同名）")
+    parser.add_argument("--days", type=int, default=90, help="最近天数")
+    parser.add_argument("--start", help="开始日期，指定后忽略 --days")
+    parser.add_argument("--end", help="结束日期，缺省为最后一天")
+    parser.add_argument("--latest", action="store_true", help="只输出最近一次有效价格")
+    args = parser.parse_args()
+
+    history = open_query(args.sale_file)
+    if not len(history.dates):
+        print(f"{args.sale_file} 没有历史数据")
+    elif args.latest:
+        print(history.latest_prices(args.models, args.end).to_string())
+    elif args.start:
+        print(history.slice(args.models, args.start, args.end).to_string())
+    else:
+        end = args.end or str(history.dates[-1])
+        start = np.datetime64(normalize_date(end), "D") - np.timedelta64(args.days - 1, "D")
+        print(history.slice(args.models, str(start), end).dropna(how="all").to_string())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from history import HistoryStore, history_path, open_history
+from query import normalize_date
+
+# ================== 配置区 ==================
+SALE_FILE = "cpu_sale.csv"
+WINDOWS = (7, 30)           # 滚动窗口（自然日）
+
+def rolling_path(db_path):
+    """滚动统计状态文件：cpu_sale.db -> cpu_sale.rolling.npz"""
+    return os.path.splitext(db_path)[0] + ".rolling.npz"
+
+def _day_number(day):
+    """日期 -> 自1970-01-01起的天数，无法识别的日期为None"""
+    day = normalize_date(day)
+    return None if day is None else int(np.datetime64(day, "D").astype(np.int64))
+
+# ================== 滚动统计 ==================
+class RollingStats:
+    """
+    各型号最近若干自然日的滚动统计，每追加一天只更新 O(型号数) 的累加量
+    - ring：最近 max(windows)+1 天的 型号 × 日期 价格环形缓冲（按天数取模定位），不随历史天数增长
+    - 每个窗口维护有效价格的和、平方和与个数，追加一天时加上新的一天、减去移出窗口的一天
+    - 缺失的日期与5.py输出的空价格不插值、不填补，只是不计入窗口；涨跌幅用截至窗口起点的最近有效价格
+    统计结果在每次更新后算好，查询全部型号时直接返回数组
+    :param models: 型号列表（行顺序，之后出现的新型号追加在末尾）
+    :param windows: 窗口天数
+    """
+    def __init__(self, models=(), windows=WINDOWS):
+        self.windows = tuple(sorted(int(w) for w in windows))
+        self.size = self.windows[-1] + 1
+        self.models = []
+        self.model_index = {}
+        n = len(self.windows)
+        self.ring = np.full((0, self.size), np.nan)
+        self.filled = np.full((0, self.size), np.nan)     # 截至各天的最近有效价格
+        self.sums = np.zeros((n, 0))
+        self.squares = np.zeros((n, 0))
+        self.counts = np.zeros((n, 0), dtype=np.int32)
+        self.last_day = None        # 最后一天（天数）
+        self.last_label = None      # 最后一天在总表中的列名
+        self.appended = 0
+        self.revision = -1          # 对应的历史库修订号
+        self.stats = {}
+        self._add_models(models)
+
+    def _add_models(self, models):
+        new = [str(m) for m in models if str(m) not in self.model_index]
+        if not new:
+            return
+        for model in new:
+            self.model_index[model] = len(self.models)
+            self.models.append(model)
+        k = len(new)
+        self.ring = np.vstack([self.ring, np.full((k, self.size), np.nan)])
+        self.filled = np.vstack([self.filled, np.full((k, self.size), np.nan)])
+        self.sums = np.hstack([self.sums, np.zeros((len(self.windows), k))])
+        self.squares = np.hstack([self.squares, np.zeros((len(self.windows), k))])
+        self.counts = np.hstack([self.counts, np.zeros((len(self.windows), k), dtype=np.int32)])
+
+    def _column(self, prices):
+        """以型号为索引的价格Series -> 按行顺序的价格数组（未出现的型号为NaN）"""
+        prices = pd.Series(prices)
+        self._add_models(prices.index)
+        values = np.full(len(self.models), np.nan)
+        rows = np.array([self.model_index[str(m)] for m in prices.index], dtype=np.int64)
+        values[rows] = pd.to_numeric(prices, errors="coerce").to_numpy(dtype=np.float64)
+        return values
+
+    # ================== 更新 ==================
+    def append(self, day, prices):
+        """
+        追加（或覆盖最后一天的）一天价格
+        :param day: 日期（总表列名，任意可识别的格式）
+        :param prices: 以型号为索引的价格Series，空值表示当天无有效数据
+        :return: 早于最后一天、或同一天以不同列名写入时返回False，需由历史库重新构建
+        """
+        number = _day_number(day)
+        if number is None:
+            return True     # 无法识别的列名不参与统计
+        if self.last_day is not None and (number < self.last_day
+                                          or (number == self.last_day and str(day) != self.last_label)):
+            return False
+        values = self._column(prices)
+        if number == self.last_day:
+            self._replace(number, values)
+        else:
+            if self.last_day is not None and number - self.last_day >= self.size:
+                self._reset()
+            elif self.last_day is not None:
+                # 中间缺失的日期按空值推进
+                for empty in range(self.last_day + 1, number):
+                    self._advance(empty, np.full(len(self.models), np.nan))
+            self._advance(number, values)
+        self.last_label = str(day)
+        self._compute()
+        return True
+
+    def _advance(self, number, values):
+        slot = number % self.size
+        present = ~np.isnan(values)
+        new = np.where(present, values, 0.0)
+        for k, window in enumerate(self.windows):
+            out = self.ring[:, (number - window) % self.size]
+            gone = ~np.isnan(out)
+            old = np.where(gone, out, 0.0)
+            self.sums[k] += new - old
+            self.squares[k] += new * new - old * old
+            self.counts[k] += present.astype(np.int32) - gone
+        previous = self.filled[:, (number - 1) % self.size]
+        self.ring[:, slot] = values
+        self.filled[:, slot] = np.where(present, values, previous)
+        self.last_day = number
+        self.appended += 1
+        if self.appended % self.size == 0:
+            self._rebase()
+
+    def _reset(self):
+        """间隔超过缓冲长度：窗口内全部移出，只保留最近有效价格"""
+        last = self.filled[:, self.last_day % self.size].copy()
+        self.ring[:] = np.nan
+        self.filled[:] = last[:, None]
+        self.sums[:] = 0.0
+        self.squares[:] = 0.0
+        self.counts[:] = 0
+
+    def _replace(self, number, values):
+        """覆盖最后一天：减去原来的值、加上新的值"""
+        slot = number % self.size
+        out = self.ring[:, slot]
+        present, gone = ~np.isnan(values), ~np.isnan(out)
+        new, old = np.where(present, values, 0.0), np.where(gone, out, 0.0)
+        self.sums += new - old
+        self.squares += new * new - old * old
+        self.counts += present.astype(np.int32) - gone
+        previous = self.filled[:, (number - 1) % self.size]
+        self.ring[:, slot] = values
+        self.filled[:, slot] = np.where(present, values, previous)
+
+    def _rebase(self):
+        """由环形缓冲重新求和，消除长期加减累积的舍入误差（每size次追加一次，均摊O(型号数)）"""
+        for k, window in enumerate(self.windows):
+            block = self.ring[:, [(self.last_day - i) % self.size for i in range(window)]]
+            self.sums[k] = np.nansum(block, axis=1)
+            self.squares[k] = np.nansum(block * block, axis=1)
+            self.counts[k] = (~np.isnan(block)).sum(axis=1)
+
+    def _compute(self):
+        last = self.filled[:, self.last_day % self.size]
+        stats = {"last": last.copy()}
+        for k, window in enumerate(self.windows):
+            n = self.counts[k].astype(np.float64)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                mean = self.sums[k] / n
+                var = (self.squares[k] - self.sums[k] * mean) / (n - 1)
+                start = self.filled[:, (self.last_day - window) % self.size]
+                stats[f"ma{window}"] = np.where(n > 0, mean, np.nan)
+                stats[f"std{window}"] = np.where(n > 1, np.sqrt(np.maximum(var, 0.0)), np.nan)
+                stats[f"change{window}"] = last / start - 1
+            stats[f"n{window}"] = self.counts[k].copy()
+        self.stats = stats
+
+    # ================== 构建与保存 ==================
+    @classmethod
+    def from_history(cls, store, windows=WINDOWS):
+        """
+        由历史库整体重新构建（O(型号数 × 天数)）：同一天以不同格式出现多次时，靠后写入的非空值优先（与query.py一致）
+        """
+        models, days, values = store.matrix()
+        rolling = cls(models, windows)
+        merged = {}
+        for j, day in enumerate(days):
+            number = _day_number(day)
+            if number is None:
+                continue
+            if number in merged:
+                label, column = merged[number]
+                merged[number] = (day, np.where(np.isnan(values[:, j]), column, values[:, j]))
+            else:
+                merged[number] = (day, values[:, j])
+        for number in sorted(merged):
+            label, column = merged[number]
+            rolling.append(label, pd.Series(column, index=models))
+        rolling.revision = store.revision()
+        return rolling
+
+    def save(self, path):
+        meta = {"windows": list(self.windows), "models": self.models, "last_day": self.last_day,
+                "last_label": self.last_label, "appended": self.appended, "revision": self.revision}
+        tmp = f"{path}.tmp.npz"
+        np.savez(tmp, ring=self.ring, filled=self.filled, sums=self.sums, squares=self.squares,
+                 counts=self.counts, meta=np.array(json.dumps(meta, ensure_ascii=False)))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            rolling = cls(meta["models"], meta["windows"])
+            for name in ("ring", "filled", "sums", "squares", "counts"):
+                setattr(rolling, name, data[name])
+        rolling.last_day, rolling.last_label = meta["last_day"], meta["last_label"]
+        rolling.appended, rolling.revision = meta["appended"], meta["revision"]
+        if rolling.last_day is not None:
+            rolling._compute()
+        return rolling
+
+    # ================== 查询 ==================
+    def stat(self, name):
+        """单项统计的全部型号数组（按 models 顺序），如 ma7、std30、change7、n30、last"""
+        return self.stats[name]
+
+    def frame(self, models=None):
+        """全部（或指定）型号的各项统计，以型号为索引的DataFrame"""
+        df = pd.DataFrame(self.stats, index=pd.Index(self.models, name="name"))
+        return df if models is None else df.loc[list(models)]
+
+# ================== 与历史库同步 ==================
+def _load_state(path, windows):
+    try:
+        rolling = RollingStats.load(path)
+    except (FileNotFoundError, KeyError, ValueError):
+        return None
+    return rolling if rolling.windows == tuple(sorted(windows)) else None
+
+def update(store, day, prices, windows=WINDOWS):
+    """
+    6.py 写入一天后更新滚动统计：状态与写入前的历史库一致时只追加这一天（O(型号数)），
+    否则（首次使用、补跑了更早的日期、总表被整体导入等）由历史库重新构建
+    :param store: 已写入当天的 HistoryStore
+    """
+    path = rolling_path(store.path)
+    revision = store.revision()
+    rolling = _load_state(path, windows)
+    if (rolling is None or rolling.revision != revision - 1 or rolling.models != store.models()[:len(rolling.models)]
+            or not rolling.append(day, prices)):
+        rolling = RollingStats.from_history(store, windows)
+    rolling.revision = revision
+    rolling.save(path)
+    return rolling
+
+def open_rolling(sale_file=SALE_FILE, windows=WINDOWS):
+    """打开总表的滚动统计，与历史库不一致时重新构建"""
+    open_history(sale_file).close()
+    db_path = history_path(sale_file)
+    rolling = _load_state(rolling_path(db_path), windows)
+    with HistoryStore(db_path) as store:
+        if rolling is None or rolling.revision != store.revision():
+            rolling = RollingStats.from_history(store, windows)
+            rolling.save(rolling_path(db_path))
+    return rolling
+
+def main():
+    parser = argparse.ArgumentParser(description="各型号的滚动均价、波动与涨跌幅")
+    parser.add_argument("models", nargs="*", help="型号，缺省为全部")
+    parser.add_argument("--sale-file", default=SALE_FILE, help="总表路径（历史库与之同名）")
+    parser.add_argument("--sort", default=None, help="按某项统计排序，如 change7、std30")
+    parser.add_argument("--top", type=int, default=None, help="只输出前N个")
+    args = parser.parse_args()
+
+    rolling = open_rolling(args.sale_file)
+    df = rolling.frame(args.models or None)
+    if args.sort:
+        df = df.sort_values(args.sort, ascending=False)
+    if args.top:
+        df = df.head(args.top)
+    print(f"截至 {rolling.last_label}")
+    print(df.to_string(float_format=lambda v: f"{v:.4g}"))
+
+if __name__ == "__main__":
+    main()
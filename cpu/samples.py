@@ -0,0 +1,175 @@
+import numpy as np
+import pandas as pd
+
+from dedupe import duplicate_mask
+from price_log import read_records
+
+CENTS = 100
+
+def compact_prices(values):
+    """
+    选择能无损还原的最紧凑存储
+    - float32：整数价格（及x.5等二进制可精确表示的小数）
+    - int32 分：含8.8这类小数但都精确到分；分/100 为正确舍入的除法，与解析原文本得到的float64完全相同
+    - float64：其它情况
+    :return: (存储数组, 除数)，还原为 存储数组 / 除数
+    """
+    values = np.asarray(values, dtype=np.float64)
+    narrow = values.astype(np.float32)
+    if np.array_equal(narrow, values, equal_nan=True):
+        return narrow, 1
+    with np.errstate(invalid="ignore"):
+        cents = np.round(values * CENTS)
+    if np.all(np.abs(cents) < 2**31) and np.array_equal(cents / CENTS, values):
+        return cents.astype(np.int32), CENTS
+    return values, 1
+
+class DaySamples:
+    """
+    一天的价格样本（紧凑的列式存储），在2.py读入时构建一次，供后续各阶段直接使用
+    - data：按型号连续存放的价格数组（float32，含小数时为int32的分，都无法无损表示时为float64），
+      prices 为还原后的价格
+    - model_ids：每条样本的型号id（int32，由各型号的起止偏移offsets得到）
+    - models：型号字典，id即下标，顺序与原宽表的列顺序一致
+    - duplicates：构建时按商品标识去掉的重复样本数
+    同一型号的样本保持抓取顺序；各型号样本数相同且按元存放时 matrix() 是 data 的视图，不复制数据
+    :param prices: 一维价格数组
+    :param model_ids: 与prices等长的型号id，未按型号排序时会稳定排序
+    :param models: 型号名列表
+    """
+    duplicates = 0
+
+    def __init__(self, prices, model_ids, models):
+        data, self.divisor = compact_prices(prices)
+        model_ids = np.asarray(model_ids, dtype=np.int32)
+        if len(model_ids) and np.any(np.diff(model_ids) < 0):
+            order = np.argsort(model_ids, kind="stable")
+            data, model_ids = data[order], model_ids[order]
+        self.data = data
+        self.models = list(models)
+        counts = np.bincount(model_ids, minlength=len(self.models))
+        self.offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+
+    @property
+    def prices(self):
+        """一维价格数组：按元存放时为data本身（不复制），按分存放时换算为float64"""
+        return self.data if self.divisor == 1 else self.data / self.divisor
+
+    @property
+    def model_ids(self):
+        """每条样本的型号id（int32）；样本已按型号连续存放，由offsets展开，不常驻内存"""
+        return np.repeat(np.arange(self.n_models, dtype=np.int32), np.diff(self.offsets))
+
+    @classmethod
+    def from_matrix(cls, values, models):
+        """由 样本 × 型号 的矩阵构建（NaN视为缺失，只在各列末尾时保持为矩形）"""
+        values = np.asarray(values)
+        n_rows, n_models = values.shape
+        by_model = values.T.ravel()     # C连续的 型号 × 样本 矩阵（如2.py的展开结果）不复制
+        ids = np.repeat(np.arange(n_models, dtype=np.int32), n_rows)
+        keep = ~np.isnan(by_model)
+        if keep.all():
+            return cls(by_model, ids, models)
+        return cls(by_model[keep], ids[keep], models)
+
+    @classmethod
+    def from_frame(cls, df):
+        """由与 {date}_output.csv 同格式的宽表构建"""
+        return cls.from_matrix(df.to_numpy(dtype=np.float64), [str(c) for c in df.columns])
+
+    @classmethod
+    def from_log(cls, path):
+        """
+        由长格式价格日志构建，先按商品标识去掉同一次抓取同一型号内重复的样本（保留第一次出现），
+        其余与 price_log.to_wide(*read_log(path)) 的结果相同：
+        每次抓取（date, time）只保留所有型号都有值的前若干条，按 (date, time, 位置) 排序
+        """
+        records, header_models = read_records(path)
+        duplicates = 0
+        if "listing" in records.dtype.names:
+            _, group = np.unique(records[["date", "time", "model"]], return_inverse=True)
+            duplicate = duplicate_mask(records["listing"], group)
+            duplicates = int(duplicate.sum())
+            if duplicates:
+                records = records[~duplicate]
+        names, model_code = np.unique(records["model"], return_inverse=True)
+        names = [n.decode("utf-8") for n in names.tolist()]
+        order = list(header_models) + sorted(set(names) - set(header_models))
+        column = np.array([order.index(n) for n in names], dtype=np.int64)[model_code]
+        n_models = len(order)
+        if not len(records):
+            return cls(np.array([]), np.array([], dtype=np.int32), order)
+
+        crawls, crawl = np.unique(records[["date", "time"]], return_inverse=True)
+        # 同一次抓取同一型号内的位置（按记录顺序）
+        key = crawl.astype(np.int64) * n_models + column
+        by_key = np.argsort(key, kind="stable")
+        sorted_keys = key[by_key]
+        pos = np.empty(len(key), dtype=np.int64)
+        pos[by_key] = np.arange(len(key)) - np.searchsorted(sorted_keys, sorted_keys, side="left")
+        counts = np.bincount(key, minlength=len(crawls) * n_models).reshape(len(crawls), n_models)
+        keep = counts.min(axis=1)
+        row_start = np.cumsum(keep) - keep
+        selected = pos < keep[crawl]
+        n_rows = int(keep.sum())
+        by_model = np.empty((n_models, n_rows))
+        by_model[column[selected], row_start[crawl[selected]] + pos[selected]] = records["price"][selected]
+        # 与 dropna 一致：任一型号价格为NaN的行整行丢弃
+        rows = ~np.isnan(by_model).any(axis=0)
+        samples = cls.from_matrix(by_model[:, rows].T, order)
+        samples.duplicates = duplicates
+        return samples
+
+    # ================== 访问 ==================
+    @property
+    def n_models(self):
+        return len(self.models)
+
+    @property
+    def n_rows(self):
+        """样本最多的型号的样本数（即宽表行数）"""
+        return int(np.diff(self.offsets).max()) if self.n_models else 0
+
+    @property
+    def nbytes(self):
+        return self.data.nbytes + self.offsets.nbytes
+
+    def is_rectangular(self):
+        return self.n_models == 0 or bool(np.all(np.diff(self.offsets) == self.n_rows))
+
+    def counts(self):
+        """各型号的样本数（以型号为索引的Series）"""
+        return pd.Series(np.diff(self.offsets), index=pd.Index(self.models, name="model"))
+
+    def column(self, model):
+        """单个型号的价格（按元存放时为视图）"""
+        j = model if isinstance(model, (int, np.integer)) else self.models.index(model)
+        column = self.data[self.offsets[j]:self.offsets[j + 1]]
+        return column if self.divisor == 1 else column / self.divisor
+
+    def categorical(self):
+        """每条样本的型号（Categorical，字典为models）"""
+        return pd.Categorical.from_codes(self.model_ids, categories=pd.Index(self.models))
+
+    def matrix(self, dtype=None):
+        """
+        样本 × 型号 的矩阵；各型号样本数相同、按元存放且dtype一致时为data的视图（列连续），
+        否则复制，样本少的型号在末尾补NaN
+        """
+        prices = self.prices
+        dtype = prices.dtype if dtype is None else np.dtype(dtype)
+        if self.is_rectangular():
+            view = prices.reshape(self.n_models, self.n_rows).T
+            return view if view.dtype == dtype else view.astype(dtype)
+        out = np.full((self.n_models, self.n_rows), np.nan, dtype=dtype)
+        ids = self.model_ids
+        out[ids, np.arange(len(prices)) - self.offsets[ids]] = prices
+        return out.T
+
+    def frame(self):
+        """转为与 {date}_output.csv 同格式的float64宽表"""
+        return pd.DataFrame(self.matrix(np.float64), columns=self.models)
+
+    def long(self):
+        """转为 (model, price) 长表，model为categorical"""
+        return pd.DataFrame({"model": self.categorical(), "price": self.prices})
@@ -0,0 +1,157 @@
+import asyncio
+import random
+import time
+
+# ================== 限速 ==================
+class TokenBucket:
+    """
+    按主机共享的令牌桶限速，并按结果自适应调整速率（AIMD）
+    :param rate: 初始速率（请求/秒）
+    :param burst: 桶容量（允许的瞬时并发请求数）
+    :param min_rate: 速率下限
+    :param max_rate: 速率上限，缺省为初始速率的4倍
+    """
+    def __init__(self, rate, burst=1, min_rate=None, max_rate=None):
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate or rate / 8
+        self.max_rate = max_rate or rate * 4
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        """取得一个令牌，不足时只让当前协程等待"""
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def reward(self, step=0.05):
+        """请求成功：加性提升速率"""
+        self.rate = min(self.max_rate, self.rate + step)
+
+    def penalize(self, factor=0.5):
+        """请求失败（疑似被限流）：乘性降低速率"""
+        self.rate = max(self.min_rate, self.rate * factor)
+
+# ================== 调度器 ==================
+class CrawlScheduler:
+    """
+    基于asyncio的型号抓取队列
+    - 每个工作协程独占一个抓取后端（如一个浏览器），阻塞调用放到线程中执行
+    - 所有请求共享一个令牌桶，按成功/失败自适应调整速率
+    - 结果为空的型号按指数退避+抖动延迟后重新入队，优先级低于首次抓取的型号，
+      其它型号在此期间照常抓取，不会阻塞等待
+    - 每个型号有最终结果时立即回调 on_result(型号, 商品列表)，便于落盘
+    - model_stats 记录每个型号的抓取次数与累计耗时，以及后端提供的页面指标（page_stats）的累计值
+    """
+    def __init__(self, backend_factory, workers=1, rate=0.5, burst=2,
+                 max_attempts=3, backoff_base=5.0, backoff_max=120.0, start_delay=(0, 0),
+                 on_result=None):
+        self.backend_factory = backend_factory
+        self.on_result = on_result
+        self.workers = workers
+        self.bucket_args = (rate, burst)
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.start_delay = start_delay
+        self.stats = {"requests": 0, "retries": 0, "failed": 0}
+        self.model_stats = {}   # {型号: {"attempts": 抓取次数, "fetch_seconds": 累计抓取耗时, ...页面指标}}
+
+    def backoff(self, attempt):
+        """第attempt次失败后的等待时间（full jitter）"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+
+    async def _worker(self, worker_id, queue, bucket, results, pending, done):
+        # 错峰启动，避免多个会话同时打开首页
+        await asyncio.sleep(worker_id * random.uniform(*self.start_delay))
+        backend = await asyncio.to_thread(self.backend_factory)
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                _, seq, cpu, attempt = await queue.get()
+                await bucket.acquire()
+                self.stats["requests"] += 1
+                model = self.model_stats.setdefault(cpu, {"attempts": 0, "fetch_seconds": 0.0})
+                model["attempts"] += 1
+                start = time.perf_counter()
+                try:
+                    prices = await asyncio.to_thread(backend.fetch, cpu)
+                except Exception as e:
+                    print(f"[抓取异常] {cpu}: {str(e)}")
+                    prices = []
+                model["fetch_seconds"] += time.perf_counter() - start
+                for key, value in (getattr(backend, "page_stats", None) or {}).items():
+                    model[key] = model.get(key, 0.0) + value
+
+                if prices:
+                    bucket.reward()
+                    results[cpu] = prices
+                elif attempt < self.max_attempts:
+                    bucket.penalize()
+                    delay = self.backoff(attempt)
+                    self.stats["retries"] += 1
+                    print(f"[重试] {cpu} 第{attempt}次未获取到价格，{delay:.1f}秒后重新入队")
+                    # 失败次数作为优先级，重试型号排在未抓取型号之后
+                    loop.call_later(delay, queue.put_nowait, (attempt, seq, cpu, attempt + 1))
+                    continue
+                else:
+                    bucket.penalize()
+                    self.stats["failed"] += 1
+                    results[cpu] = []
+
+                if self.on_result is not None:
+                    try:
+                        self.on_result(cpu, results[cpu])
+                    except Exception as e:
+                        print(f"[回调异常] {cpu}: {str(e)}")
+                pending.discard(cpu)
+                if not pending:
+                    done.set()
+        finally:
+            await asyncio.to_thread(backend.close)
+
+    async def run(self, cpus):
+        """抓取全部型号，返回 {型号: 商品列表}（失败为空列表）"""
+        queue = asyncio.PriorityQueue()
+        for seq, cpu in enumerate(cpus):
+            queue.put_nowait((0, seq, cpu, 1))
+        bucket = TokenBucket(*self.bucket_args)
+        results = {}
+        pending = set(cpus)
+        done = asyncio.Event()
+        if not pending:
+            return results
+
+        workers = [
+            asyncio.create_task(self._worker(i, queue, bucket, results, pending, done))
+            for i in range(max(1, min(self.workers, len(pending))))
+        ]
+        waiter = asyncio.create_task(done.wait())
+        # 所有工作协程都异常退出时也要结束等待
+        while not done.is_set():
+            alive = [w for w in workers if not w.done()]
+            if not alive:
+                break
+            await asyncio.wait(alive + [waiter], return_when=asyncio.FIRST_COMPLETED)
+        waiter.cancel()
+        for w in workers:
+            w.cancel()
+        for w in await asyncio.gather(*workers, return_exceptions=True):
+            if isinstance(w, Exception):
+                print(f"[工作协程异常] {str(w)}")
+        return results
+
+    def crawl(self, cpus):
+        """同步入口"""
+        return asyncio.run(self.run(cpus))
@@ -0,0 +1,240 @@
+import argparse
+import gzip
+import hashlib
+import importlib
+import json
+import os
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+from dedupe import ListingDeduper
+from fetch import parse_listings, parse_price
+from parallel import parallel_map
+from price_log import PriceLog, log_path, read_records
+
+# ================== 配置区 ==================
+SNAPSHOT_DIR = "./snapshots"        # 快照库目录
+DATA_DIR = "./data"                 # 重新解析结果的默认输出目录（与1.py的SAVE_DIR相同）
+
+# ================== 快照库 ==================
+class SnapshotStore:
+    """
+    搜索结果页快照库（内容寻址）
+    - 页面按内容的SHA-256存放在 objects/哈希前两位/哈希.html.gz，相同的页面只存一份
+    - 每天一个索引 index/{日期}.jsonl，每行一次抓取：date, time（抓取会话）, model, sha256, url, bytes
+    多个浏览器线程可同时写入：对象先写临时文件再替换，索引追加加锁
+    """
+    def __init__(self, root=SNAPSHOT_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+
+    def object_path(self, digest):
+        return os.path.join(self.root, "objects", digest[:2], f"{digest}.html.gz")
+
+    def index_path(self, day):
+        return os.path.join(self.root, "index", f"{day}.jsonl")
+
+    def put(self, html):
+        """保存页面，返回其SHA-256（已存在时不重复写入）"""
+        data = html.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.object_path(digest)
+        if os.path.exists(path):
+            return digest
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        # mtime固定为0，同一页面压缩结果相同
+        with open(tmp, 'wb') as f, gzip.GzipFile(fileobj=f, mode='wb', mtime=0) as gz:
+            gz.write(data)
+        os.replace(tmp, path)
+        return digest
+
+    def get(self, digest):
+        with gzip.open(self.object_path(digest), 'rb') as f:
+            return f.read().decode("utf-8")
+
+    def record(self, day, session, model, digest, url, size):
+        entry = {"date": day, "time": session, "model": model, "sha256": digest, "url": url, "bytes": size,
+                 "saved": datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+        path = self.index_path(day)
+        with self._lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def recorder(self, day, session):
+        """
+        供抓取后端使用的回调 on_page(型号, 页面HTML, URL)，把页面保存到 day 的 session 会话下
+        """
+        def on_page(model, html, url):
+            digest = self.put(html)
+            self.record(day, session, model, digest, url, len(html.encode("utf-8")))
+        return on_page
+
+    def entries(self, day):
+        """某天索引中的全部记录（按保存顺序），没有时为空列表"""
+        path = self.index_path(day)
+        if not os.path.exists(path):
+            return []
+        entries = []
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    pass  # 崩溃时写了一半的行
+        return entries
+
+    def days(self):
+        index_dir = os.path.join(self.root, "index")
+        if not os.path.isdir(index_dir):
+            return []
+        return sorted(name[:-len(".jsonl")] for name in os.listdir(index_dir) if name.endswith(".jsonl"))
+
+# ================== 离线解析 ==================
+def parse_snapshot(digest, root=SNAPSHOT_DIR):
+    """从快照重新提取商品列表（与HTTP后端相同的页面解析）"""
+    return parse_listings(SnapshotStore(root).get(digest))
+
+def reparse_day(day, root=SNAPSHOT_DIR, n_jobs=None):
+    """
+    重新解析某天的全部快照，内容相同的页面只解析一次，各页面在多个进程中并行解析
+    同一会话同一型号有多次抓取（重试）时，取最后一次解析出商品的页面；
+    之后与1.py相同：每个会话内按型号去掉重复出现的商品，逐条识别价格
+    :return: (长表 date, time, model, price, listing, 统计信息)
+    """
+    entries = SnapshotStore(root).entries(day)
+    digests = list(dict.fromkeys(e["sha256"] for e in entries))
+    parsed = dict(zip(digests, parallel_map(parse_snapshot, digests, n_jobs=n_jobs, root=root)))
+
+    chosen = {}
+    for e in entries:
+        key = (e["time"], e["model"])
+        if parsed[e["sha256"]] or key not in chosen:
+            chosen[key] = e
+    dedupers = {}
+    rows, skipped = [], 0
+    for (session, model), e in chosen.items():
+        deduper = dedupers.setdefault(session, ListingDeduper())
+        for listing in deduper.filter(model, parsed[e["sha256"]]):
+            price = parse_price(listing["price"])
+            if price is None:
+                skipped += 1
+            else:
+                rows.append((e["date"], session, model, price, listing["key"]))
+    df = pd.DataFrame(rows, columns=["date", "time", "model", "price", "listing"])
+    stats = {
+        "pages": len(entries),
+        "unique_pages": len(digests),
+        "models": len({model for _, model in chosen}),
+        "empty_models": sum(1 for e in chosen.values() if not parsed[e["sha256"]]),
+        "prices": len(df),
+        "duplicates": sum(d.summary()["duplicates"] for d in dedupers.values()),
+        "skipped_prices": skipped,
+    }
+    return df, stats
+
+def write_day(df, day, out_dir=DATA_DIR, models=None):
+    """
+    把重新解析的价格写成1.py的输出：长格式价格日志 {日期}_prices.bin 与 {日期}_input.csv
+    :param models: 型号列顺序，缺省为快照中出现的顺序
+    :return: (日志路径, input.csv路径)
+    """
+    models = list(dict.fromkeys(df["model"])) if models is None else list(models)
+    log_file = log_path(day, out_dir)
+    input_file = os.path.join(out_dir, f"{day}_input.csv")
+    if os.path.exists(log_file):
+        os.remove(log_file)
+    price_log = PriceLog(log_file, models)
+    rows = []
+    for session, group in df.groupby("time", sort=False):
+        row = {"date": day, "time": session}
+        for model, listings in group.groupby("model", sort=False):
+            row[model] = listings["price"].tolist()
+            price_log.append(day, session, model, row[model], listings["listing"].tolist())
+        rows.append(row)
+    pd.DataFrame(rows).reindex(columns=["date", "time"] + models).to_csv(input_file, index=False)
+    return log_file, input_file
+
+def model_order(day, out_dir=DATA_DIR):
+    """
+    重新解析时写出的型号列顺序，与1.py的输出一致：
+    优先沿用当天原有价格日志的文件头，其次原有 input.csv 的列，都没有时用1.py的CPUS
+    （页面为空的型号也保留为空列）；无法导入1.py时返回None（按快照中出现的顺序）
+    """
+    log_file = log_path(day, out_dir)
+    if os.path.exists(log_file):
+        models = read_records(log_file)[1]
+        if models:
+            return list(models)
+    input_file = os.path.join(out_dir, f"{day}_input.csv")
+    if os.path.exists(input_file):
+        columns = pd.read_csv(input_file, nrows=0).columns.tolist()
+        if columns[:2] == ["date", "time"] and len(columns) > 2:
+            return columns[2:]
+    try:
+        return list(importlib.import_module("1").CPUS)
+    except ImportError:
+        return None
+
+def export_pages(day, out_dir, root=SNAPSHOT_DIR):
+    """把某天每个型号最后一次抓取的页面导出为 {型号}.html（bench.py fetch --pages 可直接使用，无需联网）"""
+    store = SnapshotStore(root)
+    latest = {e["model"]: e["sha256"] for e in store.entries(day)}
+    os.makedirs(out_dir, exist_ok=True)
+    for model, digest in latest.items():
+        with open(os.path.join(out_dir, f"{model}.html"), 'w', encoding='utf-8') as f:
+            f.write(store.get(digest))
+    return len(latest)
+
+# ================== 命令行 ==================
+def main():
+    parser = argparse.ArgumentParser(description="搜索结果页快照：查看、离线重新解析、导出")
+    parser.add_argument("--root", default=SNAPSHOT_DIR, help="快照库目录")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("list", help="列出有快照的日期")
+
+    p = sub.add_parser("reparse", help="从快照重新提取价格，写出价格日志与 input.csv")
+    p.add_argument("days", nargs="+", help="日期（YYYY-MM-DD）")
+    p.add_argument("--jobs", type=int, default=0, help="并行进程数，<=0使用全部核心")
+    p.add_argument("--out", default=DATA_DIR, help="输出目录")
+    p.add_argument("--force", action="store_true", help="覆盖输出目录中已有的当天数据")
+
+    p = sub.add_parser("export", help="导出某天各型号的页面为 {型号}.html")
+    p.add_argument("day", help="日期（YYYY-MM-DD）")
+    p.add_argument("--out", required=True, help="导出目录")
+
+    args = parser.parse_args()
+    store = SnapshotStore(args.root)
+
+    if args.command == "list":
+        for day in store.days():
+            entries = store.entries(day)
+            print(f"{day}  页面 {len(entries)}  型号 {len({e['model'] for e in entries})}"
+                  f"  会话 {len({e['time'] for e in entries})}")
+    elif args.command == "reparse":
+        for day in args.days:
+            targets = [log_path(day, args.out), os.path.join(args.out, f"{day}_input.csv")]
+            existing = [path for path in targets if os.path.exists(path)]
+            if existing and not args.force:
+                print(f"[跳过] {day}: {existing} 已存在，使用 --force 覆盖")
+                continue
+            df, stats = reparse_day(day, args.root, args.jobs)
+            if not stats["pages"]:
+                print(f"[跳过] {day}: 没有快照")
+                continue
+            models = model_order(day, args.out)
+            if models is not None:
+                # 不在型号表中的（如型号表已修改）追加在末尾
+                models += [m for m in dict.fromkeys(df["model"]) if m not in models]
+            log_file, input_file = write_day(df, day, args.out, models)
+            print(f"{day}: {stats}，已写入 {log_file}、{input_file}")
+    elif args.command == "export":
+        n = export_pages(args.day, args.out, args.root)
+        print(f"已导出 {n} 个页面至 {args.out}")
+
+if __name__ == "__main__":
+    main()
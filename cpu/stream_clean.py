@@ -0,0 +1,279 @@
+import glob
+import importlib
+import math
+import os
+from bisect import insort
+
+import pandas as pd
+
+ANA_DIR = "ana"
+RESULT_DIR = "result"
+MULTIPLIER = 1.5          # 与3.py相同的IQR倍数
+WARMUP = 10               # 分位数草图至少积累的样本数，之前使用前一天的边界
+MAX_SEED_AGE = 7          # 最多回溯几天的 *_iqr_stats.csv 作为初始边界
+MODE_SLOTS = 32           # 众数计数器的槽位数（Misra-Gries）
+HISTOGRAM_SLOTS = 64      # 精确分位数直方图最多保存的取值种类，超过后只用P²草图
+
+# ================== 在线统计 ==================
+class P2Quantile:
+    """
+    P²算法的单个分位数估计：只保存5个标记点，内存与样本数无关
+    前5个样本保存原值，分位数与 numpy 线性插值一致
+    """
+    __slots__ = ("p", "n", "heights", "positions", "desired", "increments")
+
+    def __init__(self, p):
+        self.p = p
+        self.n = 0
+        self.heights = []
+        self.positions = [1, 2, 3, 4, 5]
+        self.desired = [1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5]
+        self.increments = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def add(self, x):
+        self.n += 1
+        q = self.heights
+        if self.n <= 5:
+            insort(q, x)
+            return
+        if x < q[0]:
+            q[0], k = x, 0
+        elif x >= q[4]:
+            q[4], k = x, 3
+        else:
+            k = next(i for i in range(4) if q[i] <= x < q[i + 1])
+        n = self.positions
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+        # 调整中间三个标记点的高度
+        for i in (1, 2, 3):
+            d = self.desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                h = q[i] + d / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+                    + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1]))
+                if not q[i - 1] < h < q[i + 1]:
+                    h = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                q[i] = h
+                n[i] += d
+
+    def value(self):
+        if not self.n:
+            return math.nan
+        if self.n <= 5:
+            pos = self.p * (self.n - 1)
+            lo = int(pos)
+            hi = min(lo + 1, self.n - 1)
+            return self.heights[lo] + (self.heights[hi] - self.heights[lo]) * (pos - lo)
+        return self.heights[2]
+
+class ModeCounter:
+    """Misra-Gries 频繁项计数：最多保存slots个取值，重复度高的价格计数是准确的"""
+    __slots__ = ("slots", "counts")
+
+    def __init__(self, slots=MODE_SLOTS):
+        self.slots = slots
+        self.counts = {}
+
+    def add(self, x):
+        if x in self.counts or len(self.counts) < self.slots:
+            self.counts[x] = self.counts.get(x, 0) + 1
+            return
+        for key in list(self.counts):
+            self.counts[key] -= 1
+            if not self.counts[key]:
+                del self.counts[key]
+
+# ================== 单个型号 ==================
+def histogram_quantile(histogram, p):
+    """由 {取值: 次数} 计算分位数，与 numpy 线性插值一致"""
+    values = sorted(histogram)
+    n = sum(histogram.values())
+    pos = p * (n - 1)
+    lo, hi = int(pos), min(int(pos) + 1, n - 1)
+    found, seen = {}, 0
+    for v in values:
+        seen += histogram[v]
+        for rank in (lo, hi):
+            if rank not in found and rank < seen:
+                found[rank] = v
+        if hi in found:
+            break
+    return found[lo] + (found[hi] - found[lo]) * (pos - lo)
+
+class ModelStream:
+    """
+    单个型号的在线清洗状态
+    - 全部样本更新Q1/Q3，边界为 Q1 - k·IQR ~ Q3 + k·IQR（同3.py）。
+      价格取值种类不多时用精确直方图，超过 HISTOGRAM_SLOTS 种后改用P²草图
+    - 样本不足时使用前一天的边界；没有前一天边界的先缓存，积累够了再判定
+    - 保留的样本只更新最小值与众数计数，用于计算当日价格
+    """
+    def __init__(self, seed=None, multiplier=MULTIPLIER, warmup=WARMUP):
+        self.seed = seed
+        self.multiplier = multiplier
+        self.warmup = warmup
+        self.histogram = {}
+        self.q1, self.q3 = P2Quantile(0.25), P2Quantile(0.75)
+        self.n = 0
+        self.kept = 0
+        self.minimum = math.inf
+        self.modes = ModeCounter()
+        self.pending = []
+        self.dropped = 0
+
+    def quartiles(self):
+        if self.histogram is not None:
+            return histogram_quantile(self.histogram, 0.25), histogram_quantile(self.histogram, 0.75)
+        # 两个草图各自独立估计，可能出现交叉
+        q1, q3 = self.q1.value(), self.q3.value()
+        return min(q1, q3), max(q1, q3)
+
+    def bounds(self):
+        """当前的上下界，无法判定时为None"""
+        if self.n >= self.warmup or (self.seed is None and self.n):
+            q1, q3 = self.quartiles()
+            return q1 - self.multiplier * (q3 - q1), q3 + self.multiplier * (q3 - q1)
+        return self.seed
+
+    def _add(self, x):
+        self.q1.add(x)
+        self.q3.add(x)
+        self.n += 1
+        if self.histogram is not None:
+            self.histogram[x] = self.histogram.get(x, 0) + 1
+            if len(self.histogram) > HISTOGRAM_SLOTS:
+                self.histogram = None
+
+    def _judge(self, x, bounds):
+        if bounds[0] <= x <= bounds[1]:
+            self.kept += 1
+            self.minimum = min(self.minimum, x)
+            self.modes.add(x)
+            return True
+        self.dropped += 1
+        return False
+
+    def update(self, samples):
+        """
+        加入一次抓取返回的全部样本，先更新分位数再逐个判定
+        :return: (保留的样本, 剔除的样本)，之前缓存的样本在判定后一并返回
+        """
+        for x in samples:
+            self._add(x)
+        if self.seed is None and self.n < self.warmup:
+            self.pending += samples
+            return [], []
+        return self._flush(samples)
+
+    def finish(self):
+        """抓取结束：用已有样本判定仍在缓存中的样本"""
+        return self._flush([])
+
+    def _flush(self, samples):
+        bounds = self.bounds()
+        samples, self.pending = self.pending + samples, []
+        kept, dropped = [], []
+        for x in samples:
+            (kept if self._judge(x, bounds) else dropped).append(x)
+        return kept, dropped
+
+    def daily_price(self, min_count):
+        """
+        与5.py相同的规则：众数 -> 均值 -> 最小值
+        在线阶段只有IQR一步，相当于4.py没有剔除噪声（scaled_var = 1），所以不会走均值分支
+        """
+        counts = {v: c for v, c in self.modes.counts.items() if c >= min_count}
+        if counts:
+            top = max(counts.values())
+            return float(math.trunc(min(v for v, c in counts.items() if c == top)))
+        if self.kept:
+            return float(round(self.minimum))
+        return math.nan
+
+# ================== 全部型号 ==================
+def seed_bounds(stats_file):
+    """由 {date}_iqr_stats.csv 读取各型号的上下界"""
+    stats = pd.read_csv(stats_file).dropna(subset=["Lower_Bound", "Upper_Bound"])
+    return {str(c): (float(lo), float(hi))
+            for c, lo, hi in zip(stats["Column"], stats["Lower_Bound"], stats["Upper_Bound"])}
+
+def latest_stats_file(day, ana_dir=ANA_DIR, max_age=MAX_SEED_AGE):
+    """day之前最近一天的 *_iqr_stats.csv（不超过max_age天），没有则返回None"""
+    since = (pd.Timestamp(day) - pd.Timedelta(days=max_age)).strftime("%Y-%m-%d")
+    candidates = sorted(
+        path for path in glob.glob(os.path.join(ana_dir, "*_iqr_stats.csv"))
+        if since <= os.path.basename(path)[:10] < day
+    )
+    return candidates[-1] if candidates else None
+
+class StreamCleaner:
+    """
+    抓取过程中的在线异常值剔除：每个型号一份固定大小的状态，
+    抓取结束即可得到与5.py同格式的当日价格，无需再跑一遍批处理
+    :param seeds: {型号: (下界, 上界)}，通常来自前一天的IQR统计
+    """
+    def __init__(self, seeds=None, multiplier=MULTIPLIER, warmup=WARMUP):
+        self.seeds = seeds or {}
+        self.multiplier = multiplier
+        self.warmup = warmup
+        self.models = {}
+        self.min_count = importlib.import_module("5").MODE_MIN_COUNT
+
+    @classmethod
+    def for_day(cls, day, ana_dir=ANA_DIR, **kwargs):
+        """以day之前最近一天的IQR边界为初始值"""
+        stats_file = latest_stats_file(day, ana_dir)
+        if stats_file is None:
+            print("[在线清洗] 未找到前几天的IQR统计，前几个样本将在积累后再判定")
+            return cls(**kwargs)
+        print(f"[在线清洗] 使用 {stats_file} 的边界作为初始值")
+        return cls(seed_bounds(stats_file), **kwargs)
+
+    def _model(self, model):
+        if model not in self.models:
+            self.models[model] = ModelStream(self.seeds.get(model), self.multiplier, self.warmup)
+        return self.models[model]
+
+    def update(self, model, prices):
+        """
+        加入一个型号刚抓到的价格
+        :return: (保留的价格, 剔除的价格)
+        """
+        return self._model(model).update([float(p) for p in prices])
+
+    def finish(self):
+        """判定所有型号仍在缓存中的样本"""
+        for state in self.models.values():
+            state.finish()
+
+    def daily_prices(self, models=None):
+        """各型号的当日价格Series，没有样本的型号为NaN"""
+        models = list(self.models) if models is None else list(models)
+        return pd.Series([
+            self.models[m].daily_price(self.min_count) if m in self.models else math.nan
+            for m in models
+        ], index=models, dtype="float64")
+
+    def write_od(self, path, day, models=None):
+        """写出与 {day}_od.csv 同格式的当日价格"""
+        self.finish()
+        prices = self.daily_prices(models)
+        df = pd.DataFrame({"name": prices.index, day: prices.to_numpy()})
+        if not prices.isna().any():
+            df[day] = df[day].astype("int64")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        df.to_csv(path, index=False)
+        return df
+
+    def summary(self):
+        """保留/剔除的样本数"""
+        kept = sum(s.kept for s in self.models.values())
+        dropped = sum(s.dropped for s in self.models.values())
+        return {"models": len(self.models), "kept": kept, "dropped": dropped}
+
+def stream_od_path(day, result_dir=RESULT_DIR):
+    return os.path.join(result_dir, f"{day}_stream_od.csv")
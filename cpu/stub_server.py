@@ -0,0 +1,55 @@
+import os
+import random
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+# ================== 本地桩服务器 ==================
+IMAGE_BYTES = 30 * 1024         # 合成页商品图大小（模拟图片带宽）
+
+def synthetic_page(cpu, n_listings=60):
+    """生成结构与闲鱼搜索页相近的结果页"""
+    rng = random.Random(cpu)
+    cards = []
+    for i in range(n_listings):
+        price = rng.choice([rng.randint(10, 900), rng.randint(10, 900), 1])
+        cards.append(
+            f'<div class="feeds-item--x"><a href="/item?id={rng.randint(10**11, 10**12)}">'
+            f'<img src="/img/{cpu}_{i}.jpg">'
+            f'<span class="main-title--x">{cpu} 正品 拆机 {i}</span>'
+            f'<div class="price--x"><span class="sign--x">¥</span>'
+            f'<span class="number--NlZ5Jn">{price}</span></div></a></div>'
+        )
+    return f"<html><head><title>{cpu}_闲鱼搜索</title></head><body>{''.join(cards)}</body></html>"
+
+def start_stub_server(pages_dir=None, port=0, n_listings=60):
+    """启动本地桩服务器：优先返回 pages_dir/{型号}.html 录制页，否则返回合成页"""
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path.startswith("/img/"):
+                self.send_response(200)
+                self.send_header("Content-Type", "image/jpeg")
+                self.send_header("Content-Length", str(IMAGE_BYTES))
+                self.end_headers()
+                self.wfile.write(bytes(IMAGE_BYTES))
+                return
+            cpu = parse_qs(url.query).get("q", [""])[0]
+            recorded = os.path.join(pages_dir, f"{cpu}.html") if pages_dir else None
+            if recorded and os.path.exists(recorded):
+                with open(recorded, 'rb') as f:
+                    body = f.read()
+            else:
+                body = synthetic_page(cpu or "home", n_listings).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
@@ -0,0 +1,100 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+# ================== 配置区 ==================
+START_DAY = "2025-01-01"
+CRAWL_SIZE = 30             # 每次抓取每个型号返回的价格数（1.py一页约30条）
+DAILY_DRIFT = 0.01          # 型号基准价每天的对数随机游走幅度
+SPREAD = 0.15               # 正常挂牌价相对基准价的对数标准差
+SKEW = 0.35                 # 正常挂牌价右偏程度（加价挂牌多于低价挂牌）
+ROUND_SHARE = 0.4           # 取整到5/10元的挂牌比例（形成5.py众数）
+OUTLIER_RATE = 0.08         # 异常挂牌比例
+PLACEHOLDERS = [1, 8.8, 99, 666, 999, 9999]   # 占位价（价格面议、引流）
+
+# ================== 生成 ==================
+def model_names(n_models):
+    """符合2.py型号列格式（i[3579]-数字+可选后缀）的合成型号名"""
+    suffixes = ["", "K", "F", "KF", "T"]
+    return [f"i{3 + 2 * (j % 4)}-{1000 + j}{suffixes[j % len(suffixes)]}" for j in range(n_models)]
+
+def day_names(n_days, start=START_DAY):
+    return pd.date_range(start, periods=n_days).strftime("%Y-%m-%d").tolist()
+
+def listing_prices(rng, base, n_samples, outlier_rate=OUTLIER_RATE):
+    """
+    一天内各型号的挂牌价矩阵（样本 × 型号）
+    - 正常挂牌：基准价 × 右偏的对数正态波动，部分卖家取整到5/10元
+    - 异常挂牌：占位价、配件/故障件（0.05~0.4倍）、整机或套装（2~6倍）
+    """
+    n_models = len(base)
+    noise = rng.normal(0, SPREAD, size=(n_samples, n_models))
+    noise = np.where(noise > 0, noise * (1 + SKEW), noise)
+    values = base * np.exp(noise)
+    round_to = rng.choice([5, 10], size=values.shape)
+    rounded = rng.random(values.shape) < ROUND_SHARE
+    values = np.where(rounded, np.round(values / round_to) * round_to, np.round(values))
+
+    kind = rng.random(values.shape)
+    outliers = kind < outlier_rate
+    placeholder = outliers & (kind < outlier_rate / 4)
+    parts = outliers & ~placeholder & (kind < outlier_rate * 0.6)
+    bundle = outliers & ~placeholder & ~parts
+    values[placeholder] = rng.choice(PLACEHOLDERS, size=placeholder.sum())
+    columns = np.nonzero(parts)[1]
+    values[parts] = np.round(base[columns] * rng.uniform(0.05, 0.4, size=len(columns)))
+    columns = np.nonzero(bundle)[1]
+    values[bundle] = np.round(base[columns] * rng.uniform(2, 6, size=len(columns)))
+    return np.maximum(values, 1)
+
+def market(n_models, n_samples, n_days, seed=0, outlier_rate=OUTLIER_RATE, ragged=False, start=START_DAY):
+    """
+    N个型号 × 每天M条挂牌 × D天的合成价格
+    :param ragged: 为True时各型号当天的样本数不同（较少的型号在表尾为NaN），模拟部分型号挂牌少
+    :return: {日期: 与 {date}_output.csv 同格式的宽表}
+    """
+    rng = np.random.default_rng(seed)
+    models = model_names(n_models)
+    base = np.round(rng.lognormal(5, 1, size=n_models), 0) + 10
+    days = {}
+    for day in day_names(n_days, start):
+        base = base * np.exp(rng.normal(0, DAILY_DRIFT, size=n_models))
+        values = listing_prices(rng, base, n_samples, outlier_rate)
+        if ragged:
+            counts = rng.integers(max(1, n_samples // 4), n_samples + 1, size=n_models)
+            values[np.arange(n_samples)[:, None] >= counts] = np.nan
+        days[day] = pd.DataFrame(values, columns=models)
+    return days
+
+def write_input_csv(path, df, day, crawl_size=CRAWL_SIZE):
+    """
+    把一天的宽表写成1.py的 {date}_input.csv 格式：每 crawl_size 条样本为一次抓取（一行），单元格为价格列表
+    各型号每行的价格数相同，2.py展开后得到与df相同的数据（df不能含NaN，即不支持ragged）
+    """
+    n_crawls = -(-len(df) // crawl_size)
+    data = {"date": [day] * n_crawls, "time": [f"{i // 60 % 24:02d}:{i % 60:02d}:00" for i in range(n_crawls)]}
+    for model in df.columns:
+        values = df[model].to_numpy()
+        data[model] = [str(values[i:i + crawl_size].tolist()) for i in range(0, len(values), crawl_size)]
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    pd.DataFrame(data).to_csv(path, index=False)
+
+def main():
+    parser = argparse.ArgumentParser(description="生成合成的二手CPU挂牌价格")
+    parser.add_argument("--models", type=int, default=67, help="型号数")
+    parser.add_argument("--samples", type=int, default=30, help="每个型号每天的挂牌数")
+    parser.add_argument("--days", type=int, default=7, help="天数")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument("--start", default=START_DAY, help="第一天的日期")
+    parser.add_argument("--out", default="synthetic_data", help="输出目录（写出 {date}_input.csv，可作为pipeline.py的data目录）")
+    args = parser.parse_args()
+
+    frames = market(args.models, args.samples, args.days, args.seed, start=args.start)
+    for day, df in frames.items():
+        write_input_csv(os.path.join(args.out, f"{day}_input.csv"), df, day)
+    print(f"已生成 {args.models} 个型号 × {args.samples} 条 × {args.days} 天 至 {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+import os
+import sys
+
+import pytest
+
+# 各脚本以 cpu/ 为工作目录运行、按模块名互相导入
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stub_server import start_stub_server
+
+PAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pages")
+
+@pytest.fixture(scope="session")
+def stub_url():
+    """返回 pages/ 下录制页的本地桩服务器（按搜索词 q 取 {q}.html）"""
+    server, base_url = start_stub_server(PAGES_DIR)
+    yield base_url
+    server.shutdown()
+    server.server_close()
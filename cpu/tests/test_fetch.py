@@ -0,0 +1,110 @@
+import json
+import os
+
+import pytest
+
+from conftest import PAGES_DIR
+from fetch import HttpBackend, parse_listings, parse_price
+from stub_server import start_stub_server
+
+def read_page(name):
+    with open(os.path.join(PAGES_DIR, f"{name}.html"), encoding="utf-8") as f:
+        return f.read()
+
+@pytest.fixture
+def backend(stub_url, tmp_path):
+    with HttpBackend(cookies_path=str(tmp_path / "cookies.json"), base_url=stub_url, timeout=5) as backend:
+        yield backend
+
+# ================== parse_price ==================
+@pytest.mark.parametrize("text, expected", [
+    ("100-200", 100.0),
+    ("1~1.5万", 10000.0),
+    ("1.2 ～ 2万", 12000.0),
+    ("300至400", 300.0),
+    ("5000-1.2万", 5000.0),
+    ("100-1万", 100.0),
+    ("9000~1万", 9000.0),
+    ("1万-1.2万", 10000.0),
+    ("1.5万-2", 15000.0),
+    ("1.2万", 12000.0),
+    ("2万", 20000.0),
+    ("12.50", 12.5),
+    ("8.8", 8.8),
+    ("¥1,299", 1299.0),
+    ("1，299 包邮", 1299.0),
+    ("25", 25.0),
+])
+def test_parse_price(text, expected):
+    assert parse_price(text) == expected
+
+@pytest.mark.parametrize("text", ["", "面议", "¥", None])
+def test_parse_price_unrecognised(text):
+    assert parse_price(text) is None
+
+# ================== parse_listings ==================
+def test_parse_listings_range():
+    listings = parse_listings(read_page("range"))
+    assert [l["price"] for l in listings] == ["100-200", "1~1.5万", "1,299"]
+    assert [parse_price(l["price"]) for l in listings] == [100.0, 10000.0, 1299.0]
+    assert listings[0] == {"id": "880011223301", "title": "i7-920 100-200 多颗可选", "price": "100-200"}
+
+def test_parse_listings_wan():
+    # 小数部分与“万”在紧随其后的兄弟元素中，之后的“包邮”不计入
+    listings = parse_listings(read_page("wan"))
+    assert [l["price"] for l in listings] == ["1.2万", "2万"]
+    assert [parse_price(l["price"]) for l in listings] == [12000.0, 20000.0]
+    assert [l["id"] for l in listings] == ["880022334401", "880022334402"]
+
+def test_parse_listings_decimal():
+    listings = parse_listings(read_page("decimal"))
+    assert [l["price"] for l in listings] == ["12.50", "8.8"]
+    assert [parse_price(l["price"]) for l in listings] == [12.5, 8.8]
+
+def test_parse_listings_without_id():
+    # 链接没有id参数、或价格不在链接内时，ID为None，商品仍然保留
+    listings = parse_listings(read_page("noid"))
+    assert [(l["id"], l["title"], l["price"]) for l in listings] == [
+        (None, "i5-750 广告位", "15"),
+        (None, None, "9"),
+        ("880044556603", "i5-750 正品", "10"),
+    ]
+
+def test_parse_listings_empty():
+    assert parse_listings(read_page("empty")) == []
+    assert parse_listings("") == []
+
+# ================== HttpBackend ==================
+@pytest.mark.parametrize("page", ["range", "wan", "decimal", "noid", "empty"])
+def test_http_backend_matches_parser(backend, page):
+    assert backend.fetch(page) == parse_listings(read_page(page))
+
+def test_http_backend_on_page(stub_url, tmp_path):
+    pages = []
+    with HttpBackend(cookies_path=str(tmp_path / "cookies.json"), base_url=stub_url,
+                     on_page=lambda cpu, html, url: pages.append((cpu, html, url))) as backend:
+        listings = backend.fetch("wan")
+    assert len(listings) == 2
+    cpu, html, url = pages[0]
+    assert cpu == "wan" and html == read_page("wan") and url == f"{stub_url}/search?q=wan"
+
+def test_http_backend_on_page_error(backend, capsys):
+    # 快照回调出错不影响抓取
+    backend.on_page = lambda cpu, html, url: 1 / 0
+    assert len(backend.fetch("decimal")) == 2
+    assert "[快照错误] decimal" in capsys.readouterr().out
+
+def test_http_backend_cookies(stub_url, tmp_path):
+    path = tmp_path / "cookies.json"
+    path.write_text(json.dumps([{"name": "session", "value": "abc", "domain": ".127.0.0.1", "path": "/"}]))
+    with HttpBackend(cookies_path=str(path), base_url=stub_url) as backend:
+        assert backend.session.cookies.get("session") == "abc"
+        assert len(backend.fetch("range")) == 3
+
+def test_http_backend_connection_error(tmp_path, capsys):
+    server, base_url = start_stub_server(PAGES_DIR)
+    server.shutdown()
+    server.server_close()
+    with HttpBackend(cookies_path=str(tmp_path / "cookies.json"), base_url=base_url, timeout=2) as backend:
+        assert backend.fetch("range") == []
+    assert "[HTTP错误] range" in capsys.readouterr().out
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from history import HistoryStore
+from query import PriceHistory, main
+
+MODELS = ["i7-920", "i5-750"]
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "cpu_sale.db")
+
+def write_day(db_path, day, prices):
+    with HistoryStore(db_path) as store:
+        store.append(day, pd.Series(prices, index=MODELS))
+
+def test_range_merges_duplicate_format_columns(db_path):
+    write_day(db_path, "2025/5/6", [20, 10])
+    write_day(db_path, "2025-05-06", [25, np.nan])
+    history = PriceHistory(db_path)
+    # 靠后写入的非空值优先
+    assert history.range("i7-920").tolist() == [25]
+    assert history.range("i5-750").tolist() == [10]
+
+@pytest.mark.parametrize("removed, expected", [("2025-05-06", [20, 10]), ("2025/5/6", [25, None])])
+def test_range_after_removing_duplicate_format_column(db_path, removed, expected):
+    write_day(db_path, "2025/5/6", [20, 10])
+    write_day(db_path, "2025-05-06", [25, np.nan])
+    write_day(db_path, "2025-05-07", [30, 12])
+    PriceHistory(db_path)
+    with HistoryStore(db_path) as store:
+        assert store.remove_dates([removed]) == 1
+    history = PriceHistory(db_path)
+    for model, value in zip(MODELS, expected):
+        series = history.range(model, "2025-05-06", "2025-05-06", dropna=False)
+        assert series.index.tolist() == [pd.Timestamp("2025-05-06")]
+        assert (np.isnan(series.iloc[0]) if value is None else series.iloc[0] == value)
+    assert history.range("i7-920", "2025-05-07").tolist() == [30]
+
+def test_empty_history(db_path):
+    with HistoryStore(db_path) as store:
+        store.append("2025-05-06", pd.Series([20.0], index=["i7-920"]))
+        store.remove_dates(["2025-05-06"])
+    history = PriceHistory(db_path)
+    assert history.trend("i7-920").empty
+    assert history.range("i7-920").empty
+    assert history.latest("i7-920")[0] is None
+
+def test_main_without_date_columns(tmp_path, monkeypatch, capsys):
+    sale_file = tmp_path / "cpu_sale.csv"
+    sale_file.write_text("name\ni7-920\n")
+    monkeypatch.setattr("sys.argv", ["query.py", "i7-920", "--sale-file", str(sale_file)])
+    main()
+    assert "没有历史数据" in capsys.readouterr().out